@@ -1,6 +1,279 @@
 import pandas as pd
 import numpy as np
 
+
+def _as_flags(values):
+    """
+    Wandelt eine Signal-Spalte in ein Boolean-Array um.
+
+    Verhält sich wie die Truthiness im Loop-Backtester: 0/False → False,
+    alles andere (inkl. NaN aus einem unvollständigen Join) → True.
+    """
+    return np.asarray(values, dtype=float) != 0
+
+
+def _shift_down(flags):
+    """Verschiebt Flags um einen Bar nach unten (Signal T-1 → Aktion T)."""
+    out = np.zeros_like(flags)
+    out[1:] = flags[:-1]
+    return out
+
+
+def _last_true_index(flags):
+    """Index des letzten True-Eintrags bis einschliesslich Zeile i (-1 = keiner)."""
+    rows = np.arange(len(flags)).reshape((-1,) + (1,) * (flags.ndim - 1))
+    return np.maximum.accumulate(np.where(flags, rows, -1), axis=0)
+
+
+def _next_true_index(flags):
+    """Index des nächsten True-Eintrags ab einschliesslich Zeile i (n = keiner)."""
+    n = len(flags)
+    idx = np.where(flags, np.arange(n), n)
+    return np.minimum.accumulate(idx[::-1])[::-1]
+
+
+def _cooldown_entries(entry, exit_, open_, fees, slip, bars):
+    """
+    Sperrt Entries für `bars` Bars nach jedem Verlust-Trade.
+
+    Arbeitet auf den bereits verschobenen Aktions-Flags (1D) und springt von
+    Trade zu Trade statt von Bar zu Bar: Der nächste Entry ab einer Position
+    und der erste Exit ab dem Entry kommen aus vorberechneten Index-Arrays.
+
+    Returns:
+        Entry-Flags, die nur noch die tatsächlichen Trade-Starts enthalten
+        (weitere Entries während offener Trades ändern am Ergebnis nichts)
+    """
+    n = len(entry)
+    next_entry = _next_true_index(entry)
+    next_exit = _next_true_index(exit_)
+    allowed = np.zeros(n, dtype=bool)
+    i = 0
+    while i < n:
+        start = next_entry[i]
+        if start == n:
+            break
+        allowed[start] = True
+        end = next_exit[start]
+        if end == n:
+            break
+        loss = open_[end] * (1 - slip - fees) < open_[start] * (1 + slip + fees)
+        i = end + 1 + (bars if loss else 0)
+    return allowed
+
+
+def _long_only_equity(open_, close, entry_long, exit_long, fees, slip, return_position=False,
+                      size=None, cooldown=0):
+    """
+    Vektorisierte Equity-Berechnung für den Long-Only-Backtester.
+
+    Liefert exakt dieselben Werte wie der Loop in SimpleBacktester, ohne
+    Python-Iteration pro Bar. Der Zustand wird aus kumulativen Indizes
+    rekonstruiert: Nach einem Exit-Signal-Bar ist man immer flat, danach
+    eröffnet das erste Entry-Signal die Position.
+
+    Args:
+        open_, close: 1D-Arrays mit Open/Close-Preisen (Länge n)
+        entry_long, exit_long: Boolean-Arrays (n,) oder (n, k) mit den
+            Signalen am Tag T (Ausführung am Tag T+1)
+        fees, slip: Fees und Slippage als Anteil (z.B. 0.002)
+        return_position: Wenn True, zusätzlich die Position (1 = nach Close investiert)
+        size: Optionaler Positions-Anteil pro Signal-Tag (n,) oder (n, k); gilt
+            ab dem Entry für den ganzen Trade, der Rest bleibt in Cash (default: 1)
+        cooldown: Bars ohne neuen Entry nach einem Verlust-Trade (default: 0)
+
+    Returns:
+        Equity-Array mit derselben Form wie entry_long
+        (bzw. Tuple (equity, position) bei return_position=True)
+    """
+    entry = _shift_down(entry_long)
+    exit_ = _shift_down(exit_long)
+    if cooldown > 0:
+        # Zustandsabhängig: Schleife pro Trade (nicht pro Bar), je Spalte
+        if entry.ndim == 1:
+            entry = _cooldown_entries(entry, exit_, open_, fees, slip, cooldown)
+        else:
+            entry = np.column_stack([
+                _cooldown_entries(entry[:, j], exit_[:, j], open_, fees, slip, cooldown)
+                for j in range(entry.shape[1])
+            ])
+    if entry.ndim == 2:
+        open_ = open_[:, None]
+        close = close[:, None]
+
+    # Position nach Bar i offen ⇔ ein Entry seit dem letzten Exit-Signal
+    is_open = _last_true_index(entry) > _last_true_index(exit_)
+    was_open = _shift_down(is_open)
+
+    entry_start = entry & ~was_open
+    exit_event = exit_ & (was_open | entry)
+
+    # Entry-Preis des aktiven Trades per Forward-Fill
+    entry_idx = np.maximum(_last_true_index(entry_start), 0)
+    entry_price = np.take_along_axis(
+        np.broadcast_to(open_ * (1 + slip + fees), entry.shape), entry_idx, axis=0
+    )
+
+    # Positions-Anteil des aktiven Trades (am Entry festgelegt)
+    if size is None:
+        trade_size = 1.0
+    else:
+        size = _shift_down(np.asarray(size, dtype=float))
+        if size.ndim < entry.ndim:
+            size = size[:, None]
+        trade_size = np.take_along_axis(np.broadcast_to(size, entry.shape), entry_idx, axis=0)
+
+    # Realisierte Equity: Produkt der abgeschlossenen Trade-Returns
+    exit_price = open_ * (1 - slip - fees)
+    trade_ret = np.where(exit_event, (1 - trade_size) + trade_size * (exit_price / entry_price), 1.0)
+    realized = np.cumprod(trade_ret, axis=0)
+
+    # Mark-to-Market während offener Positionen
+    equity = np.where(is_open, realized * ((1 - trade_size) + trade_size * (close / entry_price)), realized)
+    if return_position:
+        return equity, is_open.astype(np.int8)
+    return equity
+
+
+def _long_short_equity(open_, close, entry_long, entry_short, fees, slip, return_position=False):
+    """
+    Vektorisierte Equity-Berechnung für den Long/Short-Backtester.
+
+    Bildet die Flip-State-Machine aus LongShortBacktester nach:
+    - nur entry_long  → Long
+    - nur entry_short → Short
+    - beide Signale   → Wechsel (Long → Short, sonst → Long)
+    - kein Signal     → Position halten
+
+    Die Equity zu Beginn jedes Trades ergibt sich als kumulatives Produkt
+    aus Mark-to-Market-Faktor und realisiertem PnL beim Flip, identisch
+    zur Buchhaltung im Loop (bis auf Rundung in der letzten Stelle).
+
+    Args:
+        open_, close: 1D-Arrays mit Open/Close-Preisen (Länge n)
+        entry_long, entry_short: Boolean-Arrays (n,) oder (n, k)
+        fees, slip: Fees und Slippage als Anteil (z.B. 0.002)
+        return_position: Wenn True, zusätzlich die Position (1 = Long, -1 = Short, 0 = Flat)
+
+    Returns:
+        Equity-Array mit derselben Form wie entry_long
+        (bzw. Tuple (equity, position) bei return_position=True)
+    """
+    go_long = _shift_down(entry_long)
+    go_short = _shift_down(entry_short)
+    if go_long.ndim == 2:
+        open_ = open_[:, None]
+        close = close[:, None]
+
+    # Eindeutige Signale setzen die Position absolut, doppelte Signale wechseln sie
+    absolute = go_long ^ go_short
+    both = go_long & go_short
+    last_abs = _last_true_index(absolute)
+    base = np.take_along_axis(np.where(go_long, 1, -1), np.maximum(last_abs, 0), axis=0)
+    base = np.where(last_abs >= 0, base, 0)
+
+    n_both = np.cumsum(both, axis=0)
+    n_both_before = np.take_along_axis(n_both, np.maximum(last_abs, 0), axis=0)
+    n_toggles = n_both - np.where(last_abs >= 0, n_both_before, 0)
+    odd = n_toggles % 2 == 1
+    toggled = np.where(base == 1, np.where(odd, -1, 1), np.where(odd, 1, -1))
+    position = np.where(n_toggles == 0, base, toggled)
+
+    prev_position = _shift_down(position)
+    change = position != prev_position
+
+    # Entry-Preis des aktiven Trades per Forward-Fill
+    long_entry = open_ * (1 + slip + fees)
+    short_entry = open_ * (1 - slip - fees)
+    raw_entry = np.where(position == 1, long_entry, short_entry)
+    entry_price = np.take_along_axis(
+        raw_entry, np.maximum(_last_true_index(change), 0), axis=0
+    )
+    prev_entry = _shift_down(entry_price)
+    prev_close = _shift_down(np.broadcast_to(close, position.shape))
+
+    # Beim Flip: Mark-to-Market des Vortags × realisierter PnL des alten Trades
+    with np.errstate(divide="ignore", invalid="ignore"):
+        long_factor = (prev_close / prev_entry) * (
+            1 + (short_entry - prev_entry) / prev_entry
+        )
+        short_factor = (1 + (prev_entry - prev_close) / prev_entry) * (
+            1 + (prev_entry - long_entry) / prev_entry
+        )
+    flip = change & (prev_position != 0)
+    factor = np.where(flip & (prev_position == 1), long_factor, 1.0)
+    factor = np.where(flip & (prev_position == -1), short_factor, factor)
+    equity_start = np.cumprod(factor, axis=0)
+
+    # Mark-to-Market während offener Positionen
+    long_equity = equity_start * (close / entry_price)
+    short_equity = equity_start * (1 + (entry_price - close) / entry_price)
+    equity = np.where(position == 1, long_equity, equity_start)
+    equity = np.where(position == -1, short_equity, equity)
+    if return_position:
+        return equity, position.astype(np.int8)
+    return equity
+
+
+def _signal_matrix(values, index):
+    """
+    Bringt eine Signal-Matrix (n_bars × n_configs) in Array-Form.
+
+    DataFrames werden am Preis-Index ausgerichtet, Arrays müssen bereits
+    dieselbe Länge wie der Preis-Frame haben.
+    """
+    if isinstance(values, pd.DataFrame):
+        values = values.reindex(index)
+    flags = _as_flags(values)
+    if flags.ndim == 1:
+        flags = flags[:, None]
+    if flags.ndim != 2 or flags.shape[0] != len(index):
+        raise ValueError(
+            f"Signal-Matrix muss die Form (n_bars={len(index)}, n_configs) haben, "
+            f"erhalten: {flags.shape}"
+        )
+    return flags
+
+
+def _prices_and_signals(data, signals, names):
+    """
+    Liefert Index, Open, Close und die Signal-Flags als Arrays.
+
+    DataFrames werden wie bisher per Join am Preis-Index ausgerichtet. Bei
+    Array-Daten (z.B. OhlcvArrays) müssen die Signale bereits dieselbe Länge
+    haben; so wird keine DataFrame-Kopie der Preise angelegt.
+    """
+    if isinstance(data, pd.DataFrame):
+        d = data.join(signals)
+        return (d.index, d["Open"].to_numpy(dtype=float), d["Close"].to_numpy(dtype=float),
+                [_as_flags(d[name]) for name in names])
+
+    flags = [_as_flags(signals[name]) for name in names]
+    for name, values in zip(names, flags):
+        if len(values) != len(data):
+            raise ValueError(f"Signal {name} hat {len(values)} statt {len(data)} Werte")
+    return (data.index, np.asarray(data["Open"], dtype=float), np.asarray(data["Close"], dtype=float),
+            flags)
+
+
+def _size_array(size, index):
+    """Positions-Anteile als float-Array (Series werden am Preis-Index ausgerichtet)."""
+    if size is None:
+        return None
+    if isinstance(size, (pd.Series, pd.DataFrame)):
+        size = size.reindex(index)
+    size = np.asarray(size, dtype=float)
+    if len(size) != len(index):
+        raise ValueError(f"size hat {len(size)} statt {len(index)} Werte")
+    return size
+
+
+def _batch_columns(signals, n_configs):
+    if isinstance(signals, pd.DataFrame):
+        return signals.columns
+    return pd.RangeIndex(n_configs)
+
+
 class SimpleBacktester:
     """
     Einfacher Backtester für Long-Only-Strategien mit Fees und Slippage.
@@ -11,33 +284,105 @@ class SimpleBacktester:
     - Fees und Slippage werden bei Entry und Exit berücksichtigt
     """
     def __init__(self, df, fees_bps=20, slippage_bps=5):
-        self.df = df.copy()
+        # OhlcvArrays (Memory-mapped) werden nicht kopiert
+        self.df = df.copy() if isinstance(df, pd.DataFrame) else df
         self.fees = fees_bps / 10000
         self.slip = slippage_bps / 10000
 
-    def run(self, signals: pd.DataFrame):
+    def run(self, signals: pd.DataFrame, engine="numpy", size=None, cooldown=0):
+        """
+        Args:
+            signals: DataFrame mit entry_long, exit_long
+                     (bei Array-Daten wie OhlcvArrays auch ein Dict von Arrays)
+            engine: "numpy" (vektorisiert, default) oder "loop" (Referenz-Implementierung)
+            size: Optionaler Positions-Anteil pro Signal-Tag (Series oder Array, z.B.
+                  aus rules.CompiledRules); gilt ab dem Entry für den ganzen Trade
+            cooldown: Bars ohne neuen Entry nach einem Verlust-Trade (default: 0)
+
+        Returns:
+            Series mit Equity-Kurve
+        """
+        if engine == "loop":
+            return self._run_loop(signals, size=size, cooldown=cooldown)
+        if engine != "numpy":
+            raise ValueError(f"Unbekannte Engine: {engine}")
+
+        index, open_, close, (entry_long, exit_long) = _prices_and_signals(
+            self.df, signals, ["entry_long", "exit_long"]
+        )
+        equity = _long_only_equity(
+            open_, close, entry_long, exit_long, self.fees, self.slip,
+            size=_size_array(size, index), cooldown=cooldown
+        )
+        return pd.Series(equity, index=index, name="equity")
+
+    def run_batch(self, entry_long, exit_long, return_positions=False, size=None, cooldown=0):
+        """
+        Backtestet viele Signal-Konfigurationen in einem Durchlauf.
+
+        Args:
+            entry_long: Matrix (n_bars × n_configs) als DataFrame oder Array
+            exit_long: Matrix mit derselben Form wie entry_long
+            return_positions: Wenn True, zusätzlich die Positions-Matrix zurückgeben
+            size: Optionaler Positions-Anteil pro Signal-Tag, (n_bars,) für alle
+                  Konfigurationen oder dieselbe Form wie entry_long
+            cooldown: Bars ohne neuen Entry nach einem Verlust-Trade (default: 0)
+
+        Returns:
+            DataFrame (n_bars × n_configs) mit einer Equity-Kurve pro Spalte
+            (bzw. Tuple (equity, positions) bei return_positions=True)
+        """
+        entry = _signal_matrix(entry_long, self.df.index)
+        exit_ = _signal_matrix(exit_long, self.df.index)
+        if entry.shape != exit_.shape:
+            raise ValueError(f"Formen passen nicht: {entry.shape} vs {exit_.shape}")
+
+        equity, position = _long_only_equity(
+            np.asarray(self.df["Open"], dtype=float),
+            np.asarray(self.df["Close"], dtype=float),
+            entry,
+            exit_,
+            self.fees,
+            self.slip,
+            return_position=True,
+            size=_size_array(size, self.df.index),
+            cooldown=cooldown,
+        )
+        columns = _batch_columns(entry_long, entry.shape[1])
+        equity = pd.DataFrame(equity, index=self.df.index, columns=columns)
+        if return_positions:
+            return equity, pd.DataFrame(position, index=self.df.index, columns=columns)
+        return equity
+
+    def _run_loop(self, signals: pd.DataFrame, size=None, cooldown=0):
         d = self.df.join(signals)
+        sizes = _size_array(size, d.index)
         position = 0
         entry_price = None
         equity_start = None
+        trade_size = 1.0
+        blocked_until = 0   # erster Bar, an dem nach einem Verlust wieder ein Entry erlaubt ist
         equity = [1.0]
 
         for i in range(1, len(d)):
             row_prev = d.iloc[i-1]
             row = d.iloc[i]
 
-            if position == 0 and row_prev["entry_long"]:
+            if position == 0 and row_prev["entry_long"] and i >= blocked_until:
                 position = 1
                 entry_price = row["Open"] * (1 + self.slip + self.fees)
                 equity_start = equity[-1]
+                trade_size = 1.0 if sizes is None else sizes[i-1]
 
             if position == 1:
                 # Mark-to-Market: aktuelle Equity basierend auf Close-Preis
-                current_equity = equity_start * (row["Close"] / entry_price)
+                current_equity = equity_start * ((1 - trade_size) + trade_size * (row["Close"] / entry_price))
 
                 if row_prev["exit_long"]:
                     exit_price = row["Open"] * (1 - self.slip - self.fees)
-                    equity.append(equity_start * (exit_price / entry_price))
+                    equity.append(equity_start * ((1 - trade_size) + trade_size * (exit_price / entry_price)))
+                    if exit_price < entry_price:
+                        blocked_until = i + 1 + cooldown
                     position = 0
                     entry_price = None
                     equity_start = None
@@ -61,18 +406,68 @@ class LongShortBacktester:
     - Fees und Slippage bei jedem Trade (auch bei Wechsel Long<->Short)
     """
     def __init__(self, df, fees_bps=20, slippage_bps=5):
-        self.df = df.copy()
+        # OhlcvArrays (Memory-mapped) werden nicht kopiert
+        self.df = df.copy() if isinstance(df, pd.DataFrame) else df
         self.fees = fees_bps / 10000
         self.slip = slippage_bps / 10000
 
-    def run(self, signals: pd.DataFrame):
+    def run(self, signals: pd.DataFrame, engine="numpy"):
         """
         Args:
             signals: DataFrame mit entry_long, entry_short, exit_long, exit_short
+                     (bei Array-Daten wie OhlcvArrays auch ein Dict von Arrays)
+            engine: "numpy" (vektorisiert, default) oder "loop" (Referenz-Implementierung)
 
         Returns:
             Series mit Equity-Kurve
         """
+        if engine == "loop":
+            return self._run_loop(signals)
+        if engine != "numpy":
+            raise ValueError(f"Unbekannte Engine: {engine}")
+
+        index, open_, close, (entry_long, entry_short) = _prices_and_signals(
+            self.df, signals, ["entry_long", "entry_short"]
+        )
+        equity = _long_short_equity(
+            open_, close, entry_long, entry_short, self.fees, self.slip
+        )
+        return pd.Series(equity, index=index, name="equity")
+
+    def run_batch(self, entry_long, entry_short, return_positions=False):
+        """
+        Backtestet viele Signal-Konfigurationen in einem Durchlauf.
+
+        Args:
+            entry_long: Matrix (n_bars × n_configs) als DataFrame oder Array
+            entry_short: Matrix mit derselben Form wie entry_long
+            return_positions: Wenn True, zusätzlich die Positions-Matrix zurückgeben
+
+        Returns:
+            DataFrame (n_bars × n_configs) mit einer Equity-Kurve pro Spalte
+            (bzw. Tuple (equity, positions) bei return_positions=True)
+        """
+        go_long = _signal_matrix(entry_long, self.df.index)
+        go_short = _signal_matrix(entry_short, self.df.index)
+        if go_long.shape != go_short.shape:
+            raise ValueError(f"Formen passen nicht: {go_long.shape} vs {go_short.shape}")
+
+        equity, position = _long_short_equity(
+            np.asarray(self.df["Open"], dtype=float),
+            np.asarray(self.df["Close"], dtype=float),
+            go_long,
+            go_short,
+            self.fees,
+            self.slip,
+            return_position=True,
+        )
+        columns = _batch_columns(entry_long, go_long.shape[1])
+        equity = pd.DataFrame(equity, index=self.df.index, columns=columns)
+        if return_positions:
+            return equity, pd.DataFrame(position, index=self.df.index, columns=columns)
+        return equity
+
+    def _run_loop(self, signals: pd.DataFrame):
         d = self.df.join(signals)
         position = 0  # 0=flat, 1=long, -1=short
         entry_price = None
@@ -0,0 +1,318 @@
+"""
+Inhalts-adressierter Disk-Cache für Features und Labels.
+
+Der Schlüssel ist ein Hash der OHLCV-Bars plus der Feature-/Label-Parameter.
+Einträge werden spaltenweise als .npz gespeichert. Wurden seit dem letzten
+Lauf nur neue Bars angehängt (oder der letzte, unvollständige Bar revidiert),
+wird der gecachte Frame inkrementell mit dem OnlineFeatureEngine erweitert.
+Das Bar-Intervall (timeframe) ist Teil des Schlüssels.
+Einträge werden nach LRU verdrängt, sobald Grösse oder Anzahl das Limit
+überschreiten; die letzte Nutzung ist die mtime der .npz-Datei, sodass Lesen
+das Manifest nicht verändert. Änderungen am Manifest laufen unter einem
+Datei-Lock (manifest.lock), damit parallele Prozesse keine Einträge verlieren.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src.features import add_features, resolve_features, ALL_FEATURES, VOLUME_FEATURES
+from src.label import make_label
+from src.online import OnlineFeatureEngine
+from src.timeframe import get_timeframe
+
+try:
+    import fcntl
+except ImportError:   # Windows
+    fcntl = None
+    import msvcrt
+
+BAR_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def hash_bars(df: pd.DataFrame, n_rows=None) -> str:
+    """SHA-256 über Index und OHLCV-Werte der ersten n_rows Bars (default: alle)."""
+    d = df if n_rows is None else df.iloc[:n_rows]
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(d.index.asi8).tobytes())
+    for col in BAR_COLUMNS:
+        if col in d.columns:
+            h.update(col.encode())
+            h.update(np.ascontiguousarray(d[col].to_numpy(dtype=float)).tobytes())
+    return h.hexdigest()
+
+
+def _params_key(params: dict) -> str:
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def _write_atomic(path: Path, write):
+    """Schreibt über eine temporäre Datei und benennt atomar um."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+@contextmanager
+def _file_lock(path: Path):
+    """Exklusiver Lock auf eine Datei (blockiert, bis der Lock frei ist)."""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class FeatureCache:
+    """
+    Disk-Cache für add_features/make_label.
+
+    Args:
+        root: Cache-Verzeichnis (default: ".cache/features")
+        max_bytes: Maximale Gesamtgrösse aller Einträge (default: 512 MB)
+        max_entries: Maximale Anzahl Einträge (default: 64)
+    """
+
+    def __init__(self, root=".cache/features", max_bytes=512 * 2**20, max_entries=64):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._manifest_path = self.root / "manifest.json"
+        self._lock_path = self.root / "manifest.lock"
+
+    # ------------------------------------------------------------------
+    # Öffentliche API
+    # ------------------------------------------------------------------
+
+    def features(self, df: pd.DataFrame, include_volume=True, columns=None, timeframe=None) -> pd.DataFrame:
+        """
+        Gecachte Variante von add_features (NumPy-Engine).
+
+        Args:
+            df: DataFrame mit OHLCV-Daten
+            include_volume, columns, timeframe: wie bei add_features
+
+        Returns:
+            DataFrame wie add_features(df, include_volume, columns=columns, timeframe=timeframe)
+        """
+        if columns is None:
+            columns = [c for c in ALL_FEATURES if include_volume or c not in VOLUME_FEATURES]
+            if "Volume" not in df.columns:
+                columns = [c for c in columns if c not in VOLUME_FEATURES]
+        params = {"kind": "features", "columns": sorted(set(columns)),
+                  "timeframe": str(get_timeframe(timeframe).bar)}
+        pkey = _params_key(params)
+        key = f"{hash_bars(df)}-{pkey}"
+
+        cached = self._load(key)
+        if cached is not None:
+            return cached
+
+        feat, engine = self._extend_from_prefix(df, pkey, columns, timeframe)
+        if feat is None:
+            feat = add_features(df, columns=columns, timeframe=timeframe)
+        self._store(key, feat, params=pkey, n_bars=len(df),
+                    prefix_hash=hash_bars(df, len(df) - 1), engine=engine)
+        return feat
+
+    def labeled(self, df: pd.DataFrame, fee_buffer=0.0025, forward_days=1,
+                include_volume=True, columns=None, timeframe=None) -> pd.DataFrame:
+        """
+        Gecachte Variante von make_label(add_features(df, ...), fee_buffer, forward_days, timeframe).
+
+        Returns:
+            DataFrame mit Features, ret_fwd und y
+        """
+        feat = self.features(df, include_volume=include_volume, columns=columns, timeframe=timeframe)
+        params = {
+            "kind": "labeled",
+            "columns": sorted(set(feat.columns)),
+            "fee_buffer": fee_buffer,
+            "forward_days": forward_days,
+            "timeframe": str(get_timeframe(timeframe).bar),
+        }
+        key = f"{hash_bars(df)}-{_params_key(params)}"
+        cached = self._load(key)
+        if cached is not None:
+            return cached
+
+        lab = make_label(feat, fee_buffer=fee_buffer, forward_days=forward_days, timeframe=timeframe)
+        self._store(key, lab, params=_params_key(params), n_bars=len(df))
+        return lab
+
+    def clear(self):
+        """Löscht alle Einträge."""
+        with self._locked_manifest() as manifest:
+            for key in list(manifest):
+                self._remove(manifest, key)
+
+    # ------------------------------------------------------------------
+    # Inkrementelle Erweiterung
+    # ------------------------------------------------------------------
+
+    def _extend_from_prefix(self, df, pkey, columns, timeframe=None):
+        """
+        Sucht einen Eintrag, dessen Bars (ohne den letzten) ein Präfix von df sind,
+        und berechnet nur die Zeilen ab diesem Bar neu. Ohne gespeicherten
+        Engine-Zustand wird er vektorisiert aus dem Präfix aufgebaut.
+        """
+        manifest = self._read_manifest()
+        candidates = sorted(
+            (e for e in manifest.values()
+             if e["params"] == pkey and 1 < e["n_bars"] <= len(df)),
+            key=lambda e: e["n_bars"], reverse=True
+        )
+        for entry in candidates:
+            n_done = entry["n_bars"] - 1   # letzter Bar kann revidiert worden sein
+            if entry.get("prefix_hash") != hash_bars(df, n_done):
+                continue
+            old = self._load(entry["key"])
+            if old is None:
+                continue
+
+            engine = self._load_engine(entry)
+            if engine is None:
+                engine = OnlineFeatureEngine.from_frame(df.iloc[:n_done], timeframe=timeframe)
+
+            # Neue abgeschlossene Bars in den Zustand, den letzten Bar nur als Vorschau
+            new_rows = engine.extend(df.iloc[:-1])
+            last = pd.DataFrame([engine.preview(df.iloc[-1])], index=df.index[-1:])
+            tail = pd.concat([new_rows, last])
+
+            out_cols = list(df.columns) + [n for n in resolve_features(columns) if not n.startswith("_")]
+            tail = tail[out_cols].dropna().astype(old.dtypes.to_dict())
+            feat = pd.concat([old.loc[old.index < df.index[n_done]], tail])
+            return feat, engine
+        return None, None
+
+    # ------------------------------------------------------------------
+    # Speicher-Verwaltung
+    # ------------------------------------------------------------------
+
+    def _read_manifest(self) -> dict:
+        if not self._manifest_path.exists():
+            return {}
+        with open(self._manifest_path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest: dict):
+        def write(tmp):
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=1)
+        _write_atomic(self._manifest_path, write)
+
+    @contextmanager
+    def _locked_manifest(self):
+        """Liest das Manifest unter Lock und schreibt es am Ende zurück."""
+        with _file_lock(self._lock_path):
+            manifest = self._read_manifest()
+            yield manifest
+            self._write_manifest(manifest)
+
+    def _load(self, key):
+        entry = self._read_manifest().get(key)
+        path = self.root / f"{key}.npz"
+        if entry is None or not path.exists():
+            return None
+
+        with np.load(path, allow_pickle=False) as data:
+            index = pd.DatetimeIndex(data["__index__"], name=entry["index_name"])
+            if entry.get("tz"):
+                index = index.tz_localize("UTC").tz_convert(entry["tz"])
+            frame = pd.DataFrame({col: data[col] for col in entry["columns"]}, index=index)
+
+        # Letzte Nutzung für LRU = mtime, das Manifest bleibt unverändert
+        os.utime(path)
+        return frame
+
+    def _load_engine(self, entry):
+        if not entry.get("state"):
+            return None
+        path = self.root / entry["state"]
+        return joblib.load(path) if path.exists() else None
+
+    def _store(self, key, frame: pd.DataFrame, params, n_bars, prefix_hash=None, engine=None):
+        path = self.root / f"{key}.npz"
+        arrays = {col: frame[col].to_numpy() for col in frame.columns}
+        tz = frame.index.tz
+        index = frame.index.tz_convert("UTC").tz_localize(None) if tz is not None else frame.index
+        arrays["__index__"] = index.to_numpy()
+
+        def write(tmp):
+            with open(tmp, "wb") as f:
+                np.savez(f, **arrays)
+        _write_atomic(path, write)
+        size = path.stat().st_size
+
+        state = None
+        if engine is not None:
+            state = f"{key}.state"
+            _write_atomic(self.root / state, lambda tmp: joblib.dump(engine, tmp))
+            size += (self.root / state).stat().st_size
+
+        with self._locked_manifest() as manifest:
+            manifest[key] = {
+                "key": key,
+                "params": params,
+                "n_bars": n_bars,
+                "prefix_hash": prefix_hash,
+                "columns": list(frame.columns),
+                "index_name": frame.index.name,
+                "tz": str(tz) if tz is not None else None,
+                "state": state,
+                "bytes": size,
+            }
+            self._evict(manifest)
+
+    def _last_access(self, entry):
+        path = self.root / f"{entry['key']}.npz"
+        return path.stat().st_mtime if path.exists() else 0.0
+
+    def _remove(self, manifest: dict, key):
+        """Entfernt einen Eintrag aus dem (gelockten) Manifest und löscht seine Dateien."""
+        entry = manifest.pop(key, None)
+        for name in [f"{key}.npz", entry.get("state") if entry else None]:
+            if name and (self.root / name).exists():
+                (self.root / name).unlink()
+
+    def _evict(self, manifest: dict):
+        """Verdrängt die am längsten nicht genutzten Einträge (LRU, im gelockten Manifest)."""
+        entries = sorted(manifest.values(), key=self._last_access)
+        total = sum(e["bytes"] for e in entries)
+        while entries and (total > self.max_bytes or len(entries) > self.max_entries):
+            oldest = entries.pop(0)
+            total -= oldest["bytes"]
+            self._remove(manifest, oldest["key"])
+
+
+_default_cache = None
+
+
+def get_cache() -> FeatureCache:
+    """Gemeinsamer Cache im Standard-Verzeichnis (lazy erstellt)."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = FeatureCache()
+    return _default_cache
@@ -3,13 +3,13 @@ Vergleicht ML Trading Bot mit einfachem Buy & Hold.
 """
 
 from src.data import download_eth_1d
-from src.features import add_features
-from src.label import make_label
-from src.model import train_logreg, infer_proba
+from src.cache import get_cache
+from src.model import infer_proba
+from src.registry import get_registry
 from src.policy import ml_policy
 from src.backtest import SimpleBacktester
-from src.eval import returns_from_equity, sharpe, max_drawdown, cagr
-from src.config import P_ENTRY_THR, P_EXIT_THR
+from src.eval import equity_metrics
+from src.config import P_ENTRY_THR, P_EXIT_THR, FEATURES, POLICY_COLUMNS
 import pandas as pd
 
 
@@ -21,8 +21,7 @@ def main():
     # Daten laden
     print("\nLade Daten...")
     df = download_eth_1d(start="2019-01-01")
-    feat = add_features(df)
-    lab = make_label(feat, fee_buffer=0.0025)
+    lab = get_cache().labeled(df, fee_buffer=0.0025, columns=FEATURES + POLICY_COLUMNS)
 
     # Split
     split_date = "2023-01-01"
@@ -49,10 +48,10 @@ def main():
 
     # Berechne CAGR und MaxDD für Buy & Hold
     bh_equity_series = test["Close"] / buy_price
-    bh_ret = returns_from_equity(bh_equity_series)
-    bh_sharpe = sharpe(bh_ret, periods=252)
-    bh_cagr = cagr(bh_equity_series) * 100
-    bh_maxdd = max_drawdown(bh_equity_series) * 100
+    bh_metrics = equity_metrics(bh_equity_series).iloc[0]
+    bh_sharpe = bh_metrics["sharpe"]
+    bh_cagr = bh_metrics["cagr"] * 100
+    bh_maxdd = bh_metrics["maxdd"] * 100
 
     print(f"Return: {bh_return:.2f}%")
     print(f"Sharpe: {bh_sharpe:.3f}")
@@ -65,19 +64,19 @@ def main():
     print("STRATEGIE 2: ML TRADING BOT")
     print("-" * 70)
 
-    model = train_logreg(train)
+    model = get_registry().get_or_train("logreg", train)
     test_pred = infer_proba(model, test)
     signals_df = ml_policy(test_pred, p_entry_thr=P_ENTRY_THR, p_exit_thr=P_EXIT_THR)
     signals = signals_df[["entry_long", "exit_long"]].astype(int)
 
     bt = SimpleBacktester(test_pred)
     ml_equity = bt.run(signals)
-    ml_ret = returns_from_equity(ml_equity)
+    ml_metrics = equity_metrics(ml_equity).iloc[0]
 
     ml_return = (ml_equity.iloc[-1] - 1) * 100
-    ml_sharpe = sharpe(ml_ret, periods=252)
-    ml_cagr = cagr(ml_equity) * 100
-    ml_maxdd = max_drawdown(ml_equity) * 100
+    ml_sharpe = ml_metrics["sharpe"]
+    ml_cagr = ml_metrics["cagr"] * 100
+    ml_maxdd = ml_metrics["maxdd"] * 100
     n_trades = int(signals["entry_long"].sum())
 
     print(f"Return: {ml_return:.2f}%")
@@ -1,17 +1,18 @@
 """
 Vergleicht Performance mit/ohne Volumen-Features.
+
+Für eine Suche über alle Feature-Teilmengen siehe src.feature_search.
 """
 
 from src.data import download_eth_1d
-from src.features import add_features
-from src.label import make_label
-from src.config import FEATURES_BASE, FEATURES_WITH_VOLUME, P_ENTRY_THR, P_EXIT_THR
+from src.cache import get_cache
+from src.config import FEATURES_BASE, FEATURES_WITH_VOLUME, POLICY_COLUMNS, P_ENTRY_THR, P_EXIT_THR
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
 from src.policy import ml_policy
 from src.backtest import SimpleBacktester
-from src.eval import returns_from_equity, sharpe, max_drawdown, cagr
+from src.eval import equity_metrics
 import pandas as pd
 
 
@@ -38,15 +39,15 @@ def train_and_test(train_df, test_df, features, feature_set_name):
 
     bt = SimpleBacktester(test_pred)
     equity = bt.run(signals)
-    ret = returns_from_equity(equity)
+    metrics = equity_metrics(equity).iloc[0]
 
     return {
         "Feature_Set": feature_set_name,
         "Num_Features": len(features),
         "Entries": int(signals["entry_long"].sum()),
-        "Sharpe": round(sharpe(ret, periods=252), 3),
-        "CAGR%": round(cagr(equity) * 100, 2),
-        "MaxDD%": round(max_drawdown(equity) * 100, 2),
+        "Sharpe": round(metrics["sharpe"], 3),
+        "CAGR%": round(metrics["cagr"] * 100, 2),
+        "MaxDD%": round(metrics["maxdd"] * 100, 2),
         "Final_Equity": round(equity.iloc[-1], 3)
     }
 
@@ -62,13 +63,11 @@ def main():
 
     # 2) Features MIT Volumen
     print("[2/4] Berechne Features mit Volumen...")
-    feat_with_vol = add_features(df, include_volume=True)
-    lab_with_vol = make_label(feat_with_vol, fee_buffer=0.0025)
+    lab_with_vol = get_cache().labeled(df, fee_buffer=0.0025, columns=FEATURES_WITH_VOLUME + POLICY_COLUMNS)
 
     # 3) Features OHNE Volumen
     print("[3/4] Berechne Features ohne Volumen...")
-    feat_no_vol = add_features(df, include_volume=False)
-    lab_no_vol = make_label(feat_no_vol, fee_buffer=0.0025)
+    lab_no_vol = get_cache().labeled(df, fee_buffer=0.0025, columns=FEATURES_BASE + POLICY_COLUMNS)
 
     # 4) Split
     split_date = "2023-01-01"
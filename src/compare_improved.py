@@ -8,13 +8,14 @@ Testet:
 """
 
 from src.data import download_eth_1d
-from src.features import add_features
-from src.label import make_label
-from src.model import train_logreg, infer_proba
+from src.cache import get_cache
+from src.label import make_label_matrix, apply_label
+from src.model import infer_proba
+from src.registry import get_registry
 from src.policy import ml_policy, ml_policy_longshort
 from src.backtest import SimpleBacktester, LongShortBacktester
-from src.eval import returns_from_equity, sharpe, max_drawdown, cagr
-from src.config import P_ENTRY_THR, P_EXIT_THR
+from src.eval import equity_metrics
+from src.config import P_ENTRY_THR, P_EXIT_THR, FEATURES, POLICY_COLUMNS
 import pandas as pd
 
 
@@ -26,7 +27,8 @@ def main():
     # Daten laden
     print("\nLade Daten...")
     df = download_eth_1d(start="2019-01-01")
-    feat = add_features(df)
+    feat = get_cache().features(df, columns=FEATURES + POLICY_COLUMNS)
+    labels = make_label_matrix(feat, horizons=(1, 5), fee_buffer=0.0025)  # 1-Day und 5-Day in einem Durchlauf
 
     # Split
     split_date = "2023-01-01"
@@ -49,11 +51,11 @@ def main():
     buy_price = start_price * 1.0025
 
     bh_equity_series = test["Close"] / buy_price
-    bh_ret = returns_from_equity(bh_equity_series)
+    bh_metrics = equity_metrics(bh_equity_series).iloc[0]
     bh_return = (end_price / buy_price - 1) * 100
-    bh_sharpe = sharpe(bh_ret, periods=252)
-    bh_cagr = cagr(bh_equity_series) * 100
-    bh_maxdd = max_drawdown(bh_equity_series) * 100
+    bh_sharpe = bh_metrics["sharpe"]
+    bh_cagr = bh_metrics["cagr"] * 100
+    bh_maxdd = bh_metrics["maxdd"] * 100
 
     print(f"Return: {bh_return:.2f}%")
     print(f"Sharpe: {bh_sharpe:.3f}")
@@ -69,21 +71,21 @@ def main():
     print("-" * 70)
 
     # 1-Day Labels
-    lab_1d = make_label(train_full, fee_buffer=0.0025, forward_days=1)
-    model_1d = train_logreg(lab_1d)
+    lab_1d = apply_label(train_full, labels, forward_days=1)
+    model_1d = get_registry().get_or_train("logreg", lab_1d)
 
-    test_1d = make_label(test, fee_buffer=0.0025, forward_days=1)
+    test_1d = apply_label(test, labels, forward_days=1)
     test_pred_1d = infer_proba(model_1d, test_1d)
     signals_longonly = ml_policy(test_pred_1d, p_entry_thr=P_ENTRY_THR, p_exit_thr=P_EXIT_THR)
 
     bt_longonly = SimpleBacktester(test_pred_1d)
     equity_longonly = bt_longonly.run(signals_longonly[["entry_long", "exit_long"]].astype(int))
-    ret_longonly = returns_from_equity(equity_longonly)
+    longonly_metrics = equity_metrics(equity_longonly).iloc[0]
 
     longonly_return = (equity_longonly.iloc[-1] - 1) * 100
-    longonly_sharpe = sharpe(ret_longonly, periods=252)
-    longonly_cagr = cagr(equity_longonly) * 100
-    longonly_maxdd = max_drawdown(equity_longonly) * 100
+    longonly_sharpe = longonly_metrics["sharpe"]
+    longonly_cagr = longonly_metrics["cagr"] * 100
+    longonly_maxdd = longonly_metrics["maxdd"] * 100
     longonly_trades = int(signals_longonly["entry_long"].sum())
 
     print(f"Return: {longonly_return:.2f}%")
@@ -101,10 +103,10 @@ def main():
     print("-" * 70)
 
     # 5-Day Labels
-    lab_5d = make_label(train_full, fee_buffer=0.0025, forward_days=5)
-    model_5d = train_logreg(lab_5d)
+    lab_5d = apply_label(train_full, labels, forward_days=5)
+    model_5d = get_registry().get_or_train("logreg", lab_5d)
 
-    test_5d = make_label(test, fee_buffer=0.0025, forward_days=5)
+    test_5d = apply_label(test, labels, forward_days=5)
     test_pred_5d = infer_proba(model_5d, test_5d)
 
     # Long/Short Policy (ohne Filter = aggressiv)
@@ -117,12 +119,12 @@ def main():
 
     bt_longshort = LongShortBacktester(test_pred_5d)
     equity_longshort = bt_longshort.run(signals_longshort)
-    ret_longshort = returns_from_equity(equity_longshort)
+    longshort_metrics = equity_metrics(equity_longshort).iloc[0]
 
     longshort_return = (equity_longshort.iloc[-1] - 1) * 100
-    longshort_sharpe = sharpe(ret_longshort, periods=252)
-    longshort_cagr = cagr(equity_longshort) * 100
-    longshort_maxdd = max_drawdown(equity_longshort) * 100
+    longshort_sharpe = longshort_metrics["sharpe"]
+    longshort_cagr = longshort_metrics["cagr"] * 100
+    longshort_maxdd = longshort_metrics["maxdd"] * 100
     n_longs = int(signals_longshort["entry_long"].sum())
     n_shorts = int(signals_longshort["entry_short"].sum())
 
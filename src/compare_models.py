@@ -5,20 +5,21 @@ Testet:
 1. Logistic Regression (Baseline)
 2. Random Forest
 3. Gradient Boosting (ähnlich XGBoost)
+4. Ensemble (Mittel der drei Wahrscheinlichkeiten)
 """
 
-from src.data import download_eth_1d
-from src.features import add_features
-from src.label import make_label
-from src.model import train_logreg, train_random_forest, train_gradient_boosting, infer_proba
+from src.data import download_ohlcv
+from src.cache import get_cache
+from src.model import infer_proba_multi
+from src.registry import get_registry
 from src.policy import ml_policy
 from src.backtest import SimpleBacktester
-from src.eval import returns_from_equity, sharpe, max_drawdown, cagr
-from src.config import P_ENTRY_THR, P_EXIT_THR
+from src.eval import equity_metrics
+from src.config import P_ENTRY_THR, P_EXIT_THR, FEATURES, POLICY_COLUMNS, TIMEFRAME
 import pandas as pd
 
 
-def test_model(model, model_name, test_pred):
+def test_model(model_name, test_pred):
     """Testet ein Modell und gibt Metriken zurück."""
     signals_df = ml_policy(
         test_pred,
@@ -29,15 +30,15 @@ def test_model(model, model_name, test_pred):
 
     bt = SimpleBacktester(test_pred)
     equity = bt.run(signals)
-    ret = returns_from_equity(equity)
+    metrics = equity_metrics(equity, timeframe=TIMEFRAME).iloc[0]
 
     return {
         "Model": model_name,
         "Entries": int(signals["entry_long"].sum()),
         "Exits": int(signals["exit_long"].sum()),
-        "Sharpe": round(sharpe(ret, periods=252), 3),
-        "CAGR%": round(cagr(equity) * 100, 2),
-        "MaxDD%": round(max_drawdown(equity) * 100, 2),
+        "Sharpe": round(metrics["sharpe"], 3),
+        "CAGR%": round(metrics["cagr"] * 100, 2),
+        "MaxDD%": round(metrics["maxdd"] * 100, 2),
         "Final_Equity": round(equity.iloc[-1], 3)
     }
 
@@ -49,9 +50,8 @@ def main():
 
     # 1) Daten laden
     print("\n[1/5] Lade Daten...")
-    df = download_eth_1d(start="2019-01-01")
-    feat = add_features(df)
-    lab = make_label(feat, fee_buffer=0.0025)
+    df = download_ohlcv("ETH-USD", timeframe=TIMEFRAME, start="2019-01-01")
+    lab = get_cache().labeled(df, fee_buffer=0.0025, columns=FEATURES + POLICY_COLUMNS, timeframe=TIMEFRAME)
 
     # 2) Train/Test-Split
     print("[2/5] Erstelle Train/Test-Split...")
@@ -59,30 +59,29 @@ def main():
     train = lab.loc[:split_date]
     test = lab.loc[split_date:]
 
-    print(f"  Train: {train.index[0]} bis {train.index[-1]} ({len(train)} Tage)")
-    print(f"  Test:  {test.index[0]} bis {test.index[-1]} ({len(test)} Tage)")
-
-    results = []
-
-    # 3) Logistic Regression (Baseline)
-    print("\n[3/5] Trainiere Logistic Regression...")
-    model_lr = train_logreg(train)
-    test_pred_lr = infer_proba(model_lr, test)
-    results.append(test_model(model_lr, "Logistic Regression", test_pred_lr))
+    print(f"  Train: {train.index[0]} bis {train.index[-1]} ({len(train)} Bars)")
+    print(f"  Test:  {test.index[0]} bis {test.index[-1]} ({len(test)} Bars)")
+
+    # 3) Modelle laden bzw. trainieren
+    print("\n[3/5] Trainiere Logistic Regression, Random Forest, Gradient Boosting...")
+    models = {
+        "Logistic Regression": get_registry().get_or_train("logreg", train),
+        "Random Forest": get_registry().get_or_train("random_forest", train, n_estimators=100, max_depth=10),
+        "Gradient Boosting": get_registry().get_or_train(
+            "gradient_boosting", train, n_estimators=100, max_depth=5, learning_rate=0.1
+        ),
+    }
     print("  -> Fertig")
 
-    # 4) Random Forest
-    print("\n[4/5] Trainiere Random Forest...")
-    model_rf = train_random_forest(train, n_estimators=100, max_depth=10)
-    test_pred_rf = infer_proba(model_rf, test)
-    results.append(test_model(model_rf, "Random Forest", test_pred_rf))
+    # 4) Prognosen für alle Modelle auf einer Feature-Matrix (plus Ensemble-Mittel)
+    print("\n[4/5] Berechne Prognosen...")
+    proba = infer_proba_multi(models, test, ensemble=True).rename(columns={"ensemble": "Ensemble (Mittel)"})
     print("  -> Fertig")
 
-    # 5) Gradient Boosting
-    print("\n[5/5] Trainiere Gradient Boosting...")
-    model_gb = train_gradient_boosting(train, n_estimators=100, max_depth=5, learning_rate=0.1)
-    test_pred_gb = infer_proba(model_gb, test)
-    results.append(test_model(model_gb, "Gradient Boosting", test_pred_gb))
+    # 5) Backtest pro Modell; nur die Spalten für Policy und Backtest werden kopiert
+    print("\n[5/5] Backtest...")
+    base = test[["Open", "Close"] + POLICY_COLUMNS]
+    results = [test_model(name, base.assign(p_up=proba[name])) for name in proba.columns]
     print("  -> Fertig")
 
     # Ergebnisse anzeigen
@@ -0,0 +1,379 @@
+"""
+Kompilierte Modelle für Inferenz mit niedriger Latenz.
+
+Aus einer trainierten Sklearn-Pipeline (StandardScaler + Classifier) werden
+die Parameter in einfache, zusammenhängende NumPy-Arrays übernommen:
+
+- Lineare Modelle: der Scaler wird in Gewichte und Intercept gefaltet, die
+  Prognose ist ein Skalarprodukt plus Sigmoid.
+- Baum-Ensembles (Random Forest, Gradient Boosting): alle Bäume werden zu
+  flachen Knoten-Arrays (Feature, Threshold, linkes/rechtes Kind,
+  Blatt-Wert) zusammengelegt und für alle Zeilen und Bäume gleichzeitig
+  Ebene für Ebene traversiert. Der Gewinn liegt bei kleinen Batches und
+  vielen Modellen (kein Overhead pro Aufruf); sehr grosse Batches sind mit
+  sklearns Cython-Traversierung weiterhin schneller.
+
+Einzelne Zeilen (dict/Series) oder Batches (NumPy-Array) werden direkt
+bewertet, ohne DataFrame-Kopien wie in infer_proba. Kompilierte Modelle
+lassen sich als .npz speichern und ohne sklearn wieder laden (Sklearn wird
+nur beim Kompilieren importiert).
+
+Microbenchmark (Latenz pro Aufruf):
+    python -m src.compiled
+"""
+
+import math
+import time
+
+import numpy as np
+
+from src.config import FEATURES
+
+
+def _sigmoid(z):
+    if z >= 0:
+        return 1.0 / (1.0 + math.exp(-z))
+    e = math.exp(z)
+    return e / (1.0 + e)
+
+
+def _sigmoid_array(z):
+    # Numerisch stabile Sigmoid-Funktion
+    e = np.exp(-np.abs(z))
+    return np.where(z >= 0, 1 / (1 + e), e / (1 + e))
+
+
+def _split_pipeline(model):
+    """Zerlegt eine Pipeline in (mean, scale, classifier); ohne Scaler sind mean/scale None."""
+    steps = [step for _, step in model.steps] if hasattr(model, "steps") else [model]
+    *transforms, clf = steps
+    if len(transforms) > 1:
+        raise TypeError("Nur Pipelines mit höchstens einem Scaler werden unterstützt")
+    if not transforms:
+        return None, None, clf
+    scaler = transforms[0]
+    if not hasattr(scaler, "mean_") or not hasattr(scaler, "scale_"):
+        raise TypeError(f"Nicht unterstützter Pipeline-Schritt: {type(scaler).__name__}")
+    n = clf.n_features_in_
+    mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(n)
+    scale = scaler.scale_ if scaler.scale_ is not None else np.ones(n)
+    return np.asarray(mean, dtype=float), np.asarray(scale, dtype=float), clf
+
+
+class _Predictor:
+    """Gemeinsame Schnittstelle: predict_proba(X), predict_row(row), save(path)."""
+
+    kind = None
+
+    def predict_proba(self, X):
+        """
+        Wahrscheinlichkeit für y=1.
+
+        Args:
+            X: NumPy-Array (n_features,) oder (n, n_features) in Feature-Reihenfolge
+
+        Returns:
+            float bei einer Zeile, sonst Array der Länge n
+        """
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            return float(self._proba(X[None, :])[0])
+        return self._proba(X)
+
+    def predict_row(self, row):
+        """Wahrscheinlichkeit für y=1 aus einer Zeile (dict oder Series mit Feature-Namen)."""
+        return self.predict_proba(np.array([row[name] for name in self.features], dtype=float))
+
+    def save(self, path):
+        """Speichert das kompilierte Modell als .npz (ohne Pickle)."""
+        np.savez(path, kind=np.array(self.kind), features=np.array(self.features), **self._arrays())
+
+
+class LinearPredictor(_Predictor):
+    """
+    Lineares Modell als Gewichts-Vektor: p_up = sigmoid(x · w + b).
+
+    Args:
+        weights: Gewichte pro Feature (Scaler bereits eingerechnet)
+        intercept: Achsenabschnitt
+        features: Feature-Namen in der Reihenfolge der Gewichte
+    """
+
+    kind = "linear"
+
+    def __init__(self, weights, intercept, features=FEATURES):
+        self.weights = np.ascontiguousarray(weights, dtype=float)
+        self.intercept = float(intercept)
+        self.features = list(features)
+        if len(self.weights) != len(self.features):
+            raise ValueError("Anzahl Gewichte passt nicht zur Feature-Liste")
+
+    @classmethod
+    def from_pipeline(cls, model, features=FEATURES):
+        """
+        Übernimmt Scaler und Classifier aus einer trainierten Pipeline.
+
+        Args:
+            model: Pipeline aus optionalem StandardScaler und linearem
+                   Classifier mit coef_/intercept_ (z.B. aus train_logreg)
+            features: Feature-Liste des Trainers (default: FEATURES)
+
+        Returns:
+            LinearPredictor
+        """
+        mean, scale, clf = _split_pipeline(model)
+        if not hasattr(clf, "coef_") or not hasattr(clf, "predict_proba") or clf.coef_.shape[0] != 1:
+            raise TypeError(f"Kein binärer linearer Classifier: {type(clf).__name__}")
+
+        weights = clf.coef_[0].astype(float)
+        intercept = float(clf.intercept_[0])
+        if mean is not None:
+            # Scaler einfalten: w · (x - mean) / scale = (w / scale) · x - w · mean / scale
+            weights = weights / scale
+            intercept -= float(weights @ mean)
+        return cls(weights, intercept, features)
+
+    def decision(self, X):
+        """Lineare Scores für ein Array (n_features,) oder (n, n_features)."""
+        return np.asarray(X, dtype=float) @ self.weights + self.intercept
+
+    def predict_proba(self, X):
+        """Wie _Predictor.predict_proba, einzelne Zeilen ohne Umweg über ein 2D-Array."""
+        z = self.decision(X)
+        if np.ndim(z) == 0:
+            return _sigmoid(float(z))
+        return _sigmoid_array(z)
+
+    def predict_row(self, row):
+        """Wie _Predictor.predict_row, als Skalarprodukt in reinem Python."""
+        z = self.intercept
+        for w, name in zip(self.weights, self.features):
+            z += w * row[name]
+        return _sigmoid(z)
+
+    def _arrays(self):
+        return {"weights": self.weights, "intercept": np.array(self.intercept)}
+
+    @classmethod
+    def _from_arrays(cls, arrays, features):
+        return cls(arrays["weights"], float(arrays["intercept"]), features)
+
+
+class TreeEnsemblePredictor(_Predictor):
+    """
+    Baum-Ensemble als flache Knoten-Arrays.
+
+    Alle Bäume liegen hintereinander in denselben Arrays; roots enthält den
+    Start-Knoten jedes Baums. Blätter zeigen mit left/right auf sich selbst,
+    damit die Traversierung nach max_depth Schritten für alle Zeilen endet.
+
+    Args:
+        feature, threshold, left, right, value: Knoten-Arrays
+        roots: Index des Wurzelknotens pro Baum
+        max_depth: Maximale Baumtiefe
+        mode: "mean" (Random Forest: Mittel der Blatt-Wahrscheinlichkeiten) oder
+              "logit" (Gradient Boosting: sigmoid(base + Summe der Blatt-Werte))
+        base: Start-Score für mode="logit"
+        mean, scale: StandardScaler-Parameter (None = kein Scaler)
+        features: Feature-Namen in Spalten-Reihenfolge
+    """
+
+    kind = "trees"
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, mode,
+                 base=0.0, mean=None, scale=None, features=FEATURES):
+        if mode not in ("mean", "logit"):
+            raise ValueError(f"Unbekannter Modus: {mode}")
+        self.feature = np.ascontiguousarray(feature, dtype=np.intp)
+        self.threshold = np.ascontiguousarray(threshold, dtype=float)
+        self.left = np.ascontiguousarray(left, dtype=np.intp)
+        self.right = np.ascontiguousarray(right, dtype=np.intp)
+        self.value = np.ascontiguousarray(value, dtype=float)
+        self.roots = np.ascontiguousarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.mode = mode
+        self.base = float(base)
+        self.mean = None if mean is None else np.asarray(mean, dtype=float)
+        self.scale = None if scale is None else np.asarray(scale, dtype=float)
+        self.features = list(features)
+
+    @classmethod
+    def from_pipeline(cls, model, features=FEATURES):
+        """
+        Flacht die Bäume eines trainierten Ensembles ab.
+
+        Args:
+            model: Pipeline aus optionalem StandardScaler und
+                   RandomForestClassifier oder GradientBoostingClassifier (binär)
+            features: Feature-Liste des Trainers (default: FEATURES)
+
+        Returns:
+            TreeEnsemblePredictor
+        """
+        mean, scale, clf = _split_pipeline(model)
+        if not hasattr(clf, "estimators_") or len(clf.classes_) != 2:
+            raise TypeError(f"Kein binäres Baum-Ensemble: {type(clf).__name__}")
+
+        if hasattr(clf, "learning_rate"):
+            # Gradient Boosting: ein Regressionsbaum pro Stufe, Blatt-Werte mal Lernrate
+            trees = [est.tree_ for est in clf.estimators_[:, 0]]
+            leaf_values = [t.value[:, 0, 0] * clf.learning_rate for t in trees]
+            if clf.init_ == "zero":
+                base = 0.0
+            else:
+                prior = clf.init_.class_prior_[1]
+                base = math.log(prior / (1 - prior))
+            mode = "logit"
+        else:
+            # Random Forest: Klassenanteile im Blatt, gemittelt über die Bäume
+            trees = [est.tree_ for est in clf.estimators_]
+            leaf_values = [t.value[:, 0, 1] / t.value[:, 0, :].sum(axis=1) for t in trees]
+            base = 0.0
+            mode = "mean"
+
+        offsets = np.cumsum([0] + [t.node_count for t in trees])
+        feature, threshold, left, right = [], [], [], []
+        for offset, t in zip(offsets, trees):
+            nodes = np.arange(t.node_count) + offset
+            leaf = t.children_left == -1
+            feature.append(np.where(leaf, 0, t.feature))
+            threshold.append(np.where(leaf, 0.0, t.threshold))
+            left.append(np.where(leaf, nodes, t.children_left + offset))
+            right.append(np.where(leaf, nodes, t.children_right + offset))
+
+        return cls(
+            np.concatenate(feature), np.concatenate(threshold),
+            np.concatenate(left), np.concatenate(right), np.concatenate(leaf_values),
+            roots=offsets[:-1], max_depth=max(t.max_depth for t in trees), mode=mode,
+            base=base, mean=mean, scale=scale, features=features,
+        )
+
+    def leaves(self, X, chunk_size=1024):
+        """Blatt-Index pro Zeile und Baum, Array (n, n_trees)."""
+        if self.mean is not None:
+            X = (X - self.mean) / self.scale
+        # Sklearn vergleicht float32-Features mit float64-Thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        if len(X) <= chunk_size:
+            return self._traverse(X)
+        # Zeilen-Blöcke halten die (Zeilen x Bäume)-Arrays im Cache
+        return np.concatenate([self._traverse(X[i:i + chunk_size]) for i in range(0, len(X), chunk_size)])
+
+    def _traverse(self, X):
+        rows = np.arange(len(X))[:, None]
+        node = np.broadcast_to(self.roots, (len(X), len(self.roots)))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def _proba(self, X):
+        values = self.value[self.leaves(X)]
+        if self.mode == "mean":
+            return values.mean(axis=1)
+        return _sigmoid_array(self.base + values.sum(axis=1))
+
+    def _arrays(self):
+        arrays = {
+            "feature": self.feature, "threshold": self.threshold,
+            "left": self.left, "right": self.right, "value": self.value, "roots": self.roots,
+            "max_depth": np.array(self.max_depth), "mode": np.array(self.mode), "base": np.array(self.base),
+        }
+        if self.mean is not None:
+            arrays.update(mean=self.mean, scale=self.scale)
+        return arrays
+
+    @classmethod
+    def _from_arrays(cls, arrays, features):
+        return cls(
+            arrays["feature"], arrays["threshold"], arrays["left"], arrays["right"],
+            arrays["value"], arrays["roots"], int(arrays["max_depth"]), str(arrays["mode"]),
+            base=float(arrays["base"]), mean=arrays.get("mean"), scale=arrays.get("scale"),
+            features=features,
+        )
+
+
+# kind -> Klasse, für load_predictor
+_PREDICTORS = {cls.kind: cls for cls in (LinearPredictor, TreeEnsemblePredictor)}
+
+
+def compile_model(model, features=FEATURES):
+    """
+    Kompiliert ein trainiertes Modell für schnelle Inferenz.
+
+    Args:
+        model: Trainierte Sklearn-Pipeline (train_logreg, train_random_forest
+               oder train_gradient_boosting)
+        features: Feature-Liste des Trainers (default: FEATURES)
+
+    Returns:
+        LinearPredictor oder TreeEnsemblePredictor
+    """
+    clf = model.steps[-1][1] if hasattr(model, "steps") else model
+    if hasattr(clf, "estimators_"):
+        return TreeEnsemblePredictor.from_pipeline(model, features)
+    return LinearPredictor.from_pipeline(model, features)
+
+
+def load_predictor(path):
+    """Lädt ein mit save() gespeichertes Modell (ohne sklearn)."""
+    with np.load(path, allow_pickle=False) as npz:
+        arrays = {key: npz[key] for key in npz.files}
+    kind = str(arrays.pop("kind"))
+    features = [str(f) for f in arrays.pop("features")]
+    return _PREDICTORS[kind]._from_arrays(arrays, features)
+
+
+def _time_per_call(fn, repeat):
+    fn()  # Warm-up
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
+
+
+def _print_results(results):
+    base = results[0][1]
+    for name, t in results:
+        print(f"  {name:30s}: {t * 1e6:10.2f} µs  ({base / t:6.1f}x)")
+
+
+def benchmark(n_train=2000, n_batch=10_000, repeat=2000):
+    """Vergleicht die Latenz pro Aufruf von infer_proba und den kompilierten Modellen."""
+    import pandas as pd
+    from src.model import infer_proba, train_gradient_boosting, train_logreg, train_random_forest
+
+    rng = np.random.default_rng(0)
+    train = pd.DataFrame({f: rng.normal(size=n_train) for f in FEATURES})
+    train["y"] = (train[FEATURES[0]] + rng.normal(size=n_train) > 0).astype(int)
+    row_df = train.iloc[-1:]
+    row = row_df.iloc[0].to_dict()
+    x = row_df[FEATURES].to_numpy()[0]
+    batch_df = pd.DataFrame({f: rng.normal(size=n_batch) for f in FEATURES})
+    batch = batch_df.to_numpy()
+
+    trainers = [("logreg", train_logreg, repeat),
+                ("random_forest", train_random_forest, repeat // 10),
+                ("gradient_boosting", train_gradient_boosting, repeat // 10)]
+    for name, trainer, n_calls in trainers:
+        model = trainer(train)
+        predictor = compile_model(model)
+
+        print(f"\n{name}: einzelne Zeile ({len(FEATURES)} Features), {n_calls:,} Aufrufe")
+        _print_results([
+            ("infer_proba (DataFrame)", _time_per_call(lambda: infer_proba(model, row_df), n_calls)),
+            ("Pipeline.predict_proba", _time_per_call(lambda: model.predict_proba(x[None, :]), n_calls)),
+            ("predict_proba (kompiliert)", _time_per_call(lambda: predictor.predict_proba(x), n_calls)),
+            ("predict_row (kompiliert)", _time_per_call(lambda: predictor.predict_row(row), n_calls)),
+        ])
+
+        n_calls = max(n_calls // 100, 5)
+        print(f"{name}: Batch ({n_batch:,} Zeilen), {n_calls:,} Aufrufe")
+        _print_results([
+            ("infer_proba (DataFrame)", _time_per_call(lambda: infer_proba(model, batch_df), n_calls)),
+            ("predict_proba (kompiliert)", _time_per_call(lambda: predictor.predict_proba(batch), n_calls)),
+        ])
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -1,3 +1,6 @@
+# Bar-Intervall der Scripts (Yahoo-Kürzel, z.B. "1h"); Indikator-Fenster bleiben in Tagen
+TIMEFRAME = "1d"
+
 # Threshold-Konfiguration
 P_ENTRY_THR = 0.55
 P_EXIT_THR  = 0.1
@@ -26,3 +29,22 @@ FEATURES_WITH_VOLUME = FEATURES_BASE + [
 
 # Default: Nutze Basis-Features (wie vorher)
 FEATURES = FEATURES_BASE
+
+# Spalten, die ml_policy zusätzlich zu den Modell-Features braucht
+POLICY_COLUMNS = ["ema50", "rsi14", "atr_pct"]
+
+# Suchräume für die Hyperparameter-Suche (src/search.py)
+PARAM_GRIDS = {
+    "logreg": {"C": [0.01, 0.1, 1.0, 10.0]},
+    "random_forest": {
+        "n_estimators": [100, 300],
+        "max_depth": [3, 5, 10],
+        "min_samples_leaf": [1, 5, 20],
+    },
+    "gradient_boosting": {
+        "n_estimators": [50, 100, 200],
+        "max_depth": [2, 3, 5],
+        "learning_rate": [0.03, 0.1],
+        "subsample": [0.7, 1.0],
+    },
+}
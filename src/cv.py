@@ -0,0 +1,188 @@
+"""
+Parallele Walk-Forward-Cross-Validation.
+
+Jeder Fold (Training auf der Vergangenheit, Test auf dem folgenden Block)
+wird in einem eigenen Prozess trainiert, per ml_policy in Signale übersetzt
+und mit dem SimpleBacktester bewertet. Der Feature-Frame wird einmal mit
+joblib auf die Platte geschrieben und von den Workern read-only
+Memory-mapped geladen, statt ihn pro Fold zu pickeln. Innerhalb der Worker
+läuft alles single-threaded (Random Forest mit n_jobs=1, BLAS-Threads
+begrenzt), damit Prozess-Pool und innere Parallelität sich nicht
+gegenseitig überbelegen.
+"""
+
+import os
+import tempfile
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, parallel_config
+
+from src.backtest import SimpleBacktester
+from src.config import FEATURES, POLICY_COLUMNS, P_ENTRY_THR, P_EXIT_THR
+from src.eval import equity_metrics
+from src.model import infer_proba
+from src.policy import ml_policy
+from src.registry import TRAINERS
+from src.rules import backtest_kwargs, compile_rules
+
+# Parameter, die die innere Parallelität eines Trainers steuern
+_INNER_JOBS = {"random_forest": {"n_jobs": 1}}
+
+
+def walk_forward_folds(n, n_folds=5, test_size=None, train_size=None, gap=0):
+    """
+    Erzeugt Walk-Forward-Folds über n Bars.
+
+    Args:
+        n: Anzahl Bars
+        n_folds: Anzahl Folds (default: 5)
+        test_size: Bars pro Test-Block (default: n // (n_folds + 1))
+        train_size: Länge des rollenden Trainings-Fensters (default: None = expanding)
+        gap: Bars zwischen Trainings-Ende und Test-Beginn (default: 0)
+
+    Returns:
+        Liste von (train_slice, test_slice), die Test-Blöcke liegen am Ende
+        der Daten und überlappen nicht
+    """
+    test_size = test_size or n // (n_folds + 1)
+    folds = []
+    for k in range(n_folds):
+        test_start = n - (n_folds - k) * test_size
+        train_end = test_start - gap
+        train_start = 0 if train_size is None else max(0, train_end - train_size)
+        if train_end <= train_start:
+            raise ValueError(f"Fold {k} hat keine Trainingsdaten")
+        folds.append((slice(train_start, train_end), slice(test_start, test_start + test_size)))
+    return folds
+
+
+def evaluate_fold(frame, fold, model_type="logreg", params=None,
+                  p_entry_thr=P_ENTRY_THR, p_exit_thr=P_EXIT_THR, timeframe=None, features=FEATURES,
+                  rules=None, return_model=False):
+    """
+    Trainiert und bewertet einen Fold.
+
+    Args:
+        frame: DataFrame mit Features, Label und Preisen (oder Pfad zu einem joblib-Dump)
+        fold: Tuple (train_slice, test_slice)
+        model_type: Schlüssel aus TRAINERS (default: "logreg")
+        params: Hyperparameter für den Trainer
+        p_entry_thr, p_exit_thr: Thresholds für ml_policy
+        timeframe: Bar-Intervall für die Annualisierung (default: "1d")
+        features: Feature-Spalten des Trainers (default: FEATURES)
+        rules: Optional RuleSet, wird auf dem Test-Block kompiliert (Entry-Filter,
+            Positionsgrösse, Cooldown)
+        return_model: Wenn True, enthält das Ergebnis das trainierte Modell unter "model"
+
+    Returns:
+        Dict mit Fold-Grenzen, Fit-Zeit und den Kennzahlen aus equity_metrics
+    """
+    if isinstance(frame, str):
+        # Pro Aufgabe neu laden (< 1 ms): kein Cache, der in wiederverwendeten
+        # Workern wächst und Dateien gelöschter Temp-Verzeichnisse offen hält
+        frame = joblib.load(frame, mmap_mode="r")
+    train_slice, test_slice = fold
+    train = frame.iloc[train_slice]
+    test = frame.iloc[test_slice]
+
+    t0 = time.perf_counter()
+    model = TRAINERS[model_type](train, features=list(features), **(params or {}))
+    fit_seconds = time.perf_counter() - t0
+
+    pred = infer_proba(model, test, features)
+    rules = compile_rules(rules, pred)
+    signals = ml_policy(pred, p_entry_thr=p_entry_thr, p_exit_thr=p_exit_thr, rules=rules)
+    equity, position = SimpleBacktester(pred).run_batch(
+        signals[["entry_long"]], signals[["exit_long"]], return_positions=True, **backtest_kwargs(rules)
+    )
+    metrics = equity_metrics(equity, position, timeframe=timeframe).iloc[0].to_dict()
+    result = {
+        "train_start": frame.index[train_slice.start],
+        "test_start": test.index[0],
+        "test_end": test.index[-1],
+        "n_train": len(train),
+        "fit_seconds": fit_seconds,
+        **metrics,
+    }
+    if return_model:
+        result["model"] = model
+    return result
+
+
+def cross_validate(df: pd.DataFrame, model_type="logreg", params=None, folds=None, n_folds=5,
+                   n_jobs=-1, features=FEATURES, p_entry_thr=P_ENTRY_THR, p_exit_thr=P_EXIT_THR,
+                   timeframe=None, rules=None):
+    """
+    Walk-Forward-Cross-Validation über einen Prozess-Pool.
+
+    Args:
+        df: DataFrame mit Features, Label 'y' und OHLC (z.B. aus make_label)
+        model_type: "logreg", "random_forest" oder "gradient_boosting" (default: "logreg")
+        params: Hyperparameter für den Trainer
+        folds: Liste von (train_slice, test_slice) (default: walk_forward_folds(len(df), n_folds))
+        n_folds: Anzahl Folds, falls folds nicht gegeben (default: 5)
+        n_jobs: Anzahl Prozesse (default: -1 = alle CPUs, 1 = sequenziell)
+        features: Feature-Spalten des Trainers (default: FEATURES)
+        p_entry_thr, p_exit_thr: Thresholds für ml_policy
+        timeframe: Bar-Intervall für die Annualisierung (default: "1d")
+        rules: Optional RuleSet für Policy und Backtest (pro Fold kompiliert)
+
+    Returns:
+        Tuple (fold_metrics, summary):
+        - fold_metrics: DataFrame mit einer Zeile pro Fold
+        - summary: Series mit Mittelwerten der Kennzahlen über alle Folds
+    """
+    folds = folds if folds is not None else walk_forward_folds(len(df), n_folds)
+    kwargs = dict(model_type=model_type, params=worker_params(model_type, params),
+                  p_entry_thr=p_entry_thr, p_exit_thr=p_exit_thr, timeframe=timeframe,
+                  features=list(features), rules=rules)
+    rows = run_folds(df, [(fold, kwargs) for fold in folds], n_jobs=n_jobs, features=features)
+
+    fold_metrics = pd.DataFrame(rows)
+    summary = fold_metrics.select_dtypes(include=[np.number]).mean()
+    return fold_metrics, summary
+
+
+def worker_params(model_type, params=None):
+    """Trainer-Parameter für Worker: innere Parallelität aus, explizite Parameter haben Vorrang."""
+    return {**_INNER_JOBS.get(model_type, {}), **(params or {})}
+
+
+def run_folds(df: pd.DataFrame, tasks, n_jobs=-1, features=FEATURES):
+    """
+    Führt evaluate_fold für viele (fold, kwargs)-Aufgaben aus.
+
+    Bei n_jobs != 1 wird der Frame einmal mit joblib gedumpt und von den
+    Workern Memory-mapped geladen. Die Ergebnisse kommen als Generator in
+    der Reihenfolge der Aufgaben, sobald sie fertig sind – so können
+    Aufrufer Zwischenergebnisse sofort speichern.
+
+    Args:
+        df: DataFrame mit Features, Label 'y' und OHLC
+        tasks: Iterable von (fold, kwargs) für evaluate_fold
+        n_jobs: Anzahl Prozesse (default: -1 = alle CPUs, 1 = sequenziell)
+        features: Spalten, die die Worker brauchen (Features des Trainers)
+
+    Returns:
+        Generator mit einem Dict pro Aufgabe
+    """
+    # Nur die Spalten, die Training, Policy, Regeln und Backtest brauchen
+    tasks = list(tasks)
+    rule_columns = [c for _, kwargs in tasks if kwargs.get("rules") is not None
+                    for c in kwargs["rules"].columns(df)]
+    frame = df[list(dict.fromkeys(["Open", "Close", "y"] + POLICY_COLUMNS + list(features) + rule_columns))]
+    if n_jobs == 1:
+        for fold, kwargs in tasks:
+            yield evaluate_fold(frame, fold, **kwargs)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "frame.joblib")
+        joblib.dump(frame, path)
+        with parallel_config(backend="loky", inner_max_num_threads=1):
+            yield from Parallel(n_jobs=n_jobs, return_as="generator")(
+                delayed(evaluate_fold)(path, fold, **kwargs) for fold, kwargs in tasks
+            )
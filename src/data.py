@@ -1,11 +1,15 @@
 """
 Modul zum Laden von Kryptowährungs-Daten via yfinance.
+
+Die Daten werden im lokalen OHLCV-Speicher (src.store) gehalten; pro Lauf
+werden nur die seit dem letzten gespeicherten Bar neuen Bars geladen.
 """
 
-import yfinance as yf
-import pandas as pd
+from src.store import get_store
+from src.timeframe import get_timeframe
+
 
-def download_eth_1d(start="2019-01-01", end=None, ticker="ETH-USD"):
+def download_eth_1d(start="2019-01-01", end=None, ticker="ETH-USD", store=None, refresh=True):
     """
     Lädt tägliche OHLCV-Daten für Ethereum von Yahoo Finance.
 
@@ -13,28 +17,31 @@ def download_eth_1d(start="2019-01-01", end=None, ticker="ETH-USD"):
         start: Start-Datum im Format "YYYY-MM-DD" (default: "2019-01-01")
         end: End-Datum im Format "YYYY-MM-DD" (default: None = heute)
         ticker: Yahoo Finance Ticker-Symbol (default: "ETH-USD")
+        store: OhlcvStore (default: None = gemeinsamer Speicher unter data/ohlcv)
+        refresh: Wenn False, nur gespeicherte Daten verwenden (offline)
 
     Returns:
         DataFrame mit Spalten: Open, High, Low, Close, Volume
         Index: Datum (DatetimeIndex)
     """
-    df = yf.download(
-        tickers=ticker,
-        interval="1d",
-        start=start,
-        end=end,
-        auto_adjust=False,  # explizit, um Überraschungen zu vermeiden
-        threads=True
-    )
-    # MultiIndex -> flach
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.get_level_values(0)
-
-    # Einheitliche Spaltennamen
-    df = df.rename(columns=str.title)  # Open High Low Close Volume Adj Close (falls vorhanden)
-    # Nur die Spalten, die wir brauchen
-    keep = [c for c in ["Open", "High", "Low", "Close", "Volume"] if c in df.columns]
-    df = df[keep].dropna()
-    df.index.name = "Date"
-    return df
+    return download_ohlcv(ticker, timeframe="1d", start=start, end=end, store=store, refresh=refresh)
+
+
+def download_ohlcv(ticker="ETH-USD", timeframe="1d", start="2019-01-01", end=None, store=None, refresh=True):
+    """
+    Lädt OHLCV-Daten in einem beliebigen Bar-Intervall.
+
+    Yahoo liefert Intraday-Daten nur für begrenzte Zeiträume (1h: ca. 730 Tage,
+    1m: ca. 7 Tage); längere Historien kommen aus dem lokalen Speicher.
 
+    Args:
+        ticker: Yahoo Finance Ticker-Symbol (default: "ETH-USD")
+        timeframe: Bar-Intervall, z.B. "1h" oder Timeframe (default: "1d")
+        start, end, store, refresh: wie bei download_eth_1d
+
+    Returns:
+        DataFrame mit Spalten: Open, High, Low, Close, Volume
+    """
+    store = store if store is not None else get_store()
+    interval = get_timeframe(timeframe).interval
+    return store.load(ticker, interval=interval, start=start, end=end, refresh=refresh)
@@ -1,31 +1,191 @@
 ﻿import numpy as np
 import pandas as pd
+from src.backtest import _shift_down
+from src.timeframe import get_timeframe
+
+def _periods(periods, timeframe):
+    # Explizite Periodenzahl hat Vorrang, sonst aus dem Bar-Intervall (default: 1d = 365)
+    return periods if periods is not None else get_timeframe(timeframe).periods_per_year
 
 def returns_from_equity(equity: pd.Series):
     return equity.pct_change().fillna(0.0)
 
-def sharpe(returns, periods=252, rf=0.0):
+def sharpe(returns, periods=None, rf=0.0, timeframe=None):
     r = np.array(returns)
     if r.std() == 0:
         return 0.0
-    return (r.mean() - rf) / r.std() * np.sqrt(periods)
+    return (r.mean() - rf) / r.std() * np.sqrt(_periods(periods, timeframe))
 
 def max_drawdown(equity: pd.Series):
     cummax = equity.cummax()
     dd = equity / cummax - 1
     return dd.min()
 
-def cagr(equity: pd.Series, periods_per_year=252):
+def cagr(equity: pd.Series, periods_per_year=None, timeframe=None):
     # Compound Annual Growth Rate
     if len(equity) < 2:
         return 0.0
     total_return = equity.iloc[-1] / equity.iloc[0]
-    years = len(equity) / periods_per_year
+    years = len(equity) / _periods(periods_per_year, timeframe)
     if years <= 0:
         return 0.0
     return total_return**(1/years) - 1
 
-def sweep_threshold(df, entry_thresholds=None, p_exit_thr=0.4):
+METRIC_COLUMNS = [
+    "sharpe", "sortino", "cagr", "maxdd", "calmar", "exposure", "trades", "win_rate"
+]
+
+def equity_metrics(equity, position=None, periods=None, timeframe=None):
+    """
+    Berechnet alle Kennzahlen für viele Equity-Kurven in einem vektorisierten Durchlauf.
+
+    Definitionen wie bei sharpe/cagr/max_drawdown (Returns via pct_change,
+    Standardabweichung mit ddof=0), aber für eine ganze Matrix auf einmal.
+
+    Args:
+        equity: Series, DataFrame oder Array (n_bars × n_strategien)
+        position: Optionale Positions-Matrix gleicher Form (0 = flat, ±1 = investiert),
+                  z.B. aus run_batch(..., return_positions=True). Ohne Position
+                  sind exposure/trades/win_rate NaN.
+        periods: Anzahl Perioden pro Jahr (default: None = aus timeframe)
+        timeframe: Bar-Intervall, z.B. "1h" oder Timeframe (default: "1d" = 365 Perioden)
+
+    Returns:
+        DataFrame mit einer Zeile pro Strategie und den Spalten
+        sharpe, sortino, cagr, maxdd, calmar, exposure, trades, win_rate.
+        Ein Trade reicht vom Bar, an dem die Position eröffnet oder gewechselt
+        wird, bis zum nächsten Positionswechsel.
+
+    Einschränkung: trades/win_rate zählen nur Trades, die in der Position
+    sichtbar sind. Ein Round-Trip mit Entry und Exit am selben Bar (Entry-
+    und Exit-Signal am Vortag, vorher flat) lässt die Position auf 0; er
+    geht über Fees/Slippage in Equity, Sharpe und CAGR ein, aber nicht in
+    trades und win_rate.
+    """
+    if isinstance(equity, pd.DataFrame):
+        names = equity.columns
+    elif isinstance(equity, pd.Series):
+        names = pd.Index([equity.name if equity.name is not None else 0])
+    else:
+        names = None
+    eq = np.asarray(equity, dtype=float)
+    if eq.ndim == 1:
+        eq = eq[:, None]
+    n, k = eq.shape
+    if names is None:
+        names = pd.RangeIndex(k)
+    periods = _periods(periods, timeframe)
+
+    ret = np.zeros_like(eq)
+    ret[1:] = eq[1:] / eq[:-1] - 1
+    mean = ret.mean(axis=0)
+    std = ret.std(axis=0)
+    downside = np.sqrt((np.minimum(ret, 0.0) ** 2).mean(axis=0))
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe_ = np.where(std == 0, 0.0, mean / std * np.sqrt(periods))
+        sortino = np.where(downside == 0, 0.0, mean / downside * np.sqrt(periods))
+
+        maxdd = (eq / np.maximum.accumulate(eq, axis=0) - 1).min(axis=0) if n else np.zeros(k)
+        if n < 2:
+            cagr_ = np.zeros(k)
+        else:
+            cagr_ = (eq[-1] / eq[0]) ** (1 / (n / periods)) - 1
+        calmar = np.where(maxdd == 0, 0.0, cagr_ / np.abs(maxdd))
+
+    exposure = np.full(k, np.nan)
+    trades = np.full(k, np.nan)
+    win_rate = np.full(k, np.nan)
+    if position is not None:
+        pos = np.asarray(position)
+        if pos.ndim == 1:
+            pos = pos[:, None]
+        if pos.shape != eq.shape:
+            raise ValueError(f"Formen passen nicht: {pos.shape} vs {eq.shape}")
+        exposure = (pos != 0).mean(axis=0)
+
+        prev = np.zeros_like(pos)
+        prev[1:] = pos[:-1]
+        change = pos != prev
+        starts = change & (pos != 0)
+        trades = starts.sum(axis=0).astype(float)
+
+        # Ende eines Trades = nächster Positionswechsel (oder letzter Bar)
+        rows = np.arange(n)[:, None]
+        next_change = np.minimum.accumulate(np.where(change, rows, n - 1)[::-1], axis=0)[::-1]
+        end_of_trade = np.full_like(next_change, n - 1)
+        end_of_trade[:-1] = next_change[1:]
+
+        start_rows, cols = np.nonzero(starts)
+        end_rows = end_of_trade[start_rows, cols]
+        # Basis = Equity vor dem Entry-Bar; Trade ab Bar 0 startet bei 1.0
+        base = np.where(start_rows > 0, eq[np.maximum(start_rows - 1, 0), cols], 1.0)
+        trade_ret = eq[end_rows, cols] / base - 1
+        wins = np.bincount(cols, weights=trade_ret > 0, minlength=k)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            win_rate = np.where(trades > 0, wins / trades, np.nan)
+
+    return pd.DataFrame({
+        "sharpe": sharpe_,
+        "sortino": sortino,
+        "cagr": cagr_,
+        "maxdd": maxdd,
+        "calmar": calmar,
+        "exposure": exposure,
+        "trades": trades,
+        "win_rate": win_rate
+    }, index=names)
+
+def sweep_grid(df, entry_thresholds, exit_thresholds, min_entries=5, timeframe=None, rules=None):
+    """
+    Backtestet alle (p_entry_thr, p_exit_thr)-Kombinationen in einem Batch.
+
+    Args:
+        df: DataFrame mit Preis-Daten und p_up-Prognose
+        entry_thresholds: Liste von Entry-Thresholds
+        exit_thresholds: Liste von Exit-Thresholds
+        min_entries: Mindestanzahl Entry-Signale, sonst Sharpe = -1e9 (default: 5)
+        timeframe: Bar-Intervall für die Annualisierung (default: "1d")
+        rules: Optional RuleSet oder CompiledRules (Entry-Filter, Positionsgrösse, Cooldown)
+
+    Returns:
+        DataFrame mit Sharpe/CAGR/MaxDD für jede Kombination, sortiert nach Sharpe (absteigend)
+    """
+    from src.policy import ml_policy_grid
+    from src.backtest import SimpleBacktester
+    from src.rules import backtest_kwargs, compile_rules
+
+    entry_thresholds = [float(t) for t in entry_thresholds]
+    exit_thresholds = [float(t) for t in exit_thresholds]
+    rules = compile_rules(rules, df)
+    entry, exit_ = ml_policy_grid(df, entry_thresholds, exit_thresholds, rules=rules)
+    n_configs = len(entry_thresholds) * len(exit_thresholds)
+
+    bt = SimpleBacktester(df)
+    equity_matrix = bt.run_batch(
+        entry.reshape(len(df), n_configs),
+        exit_.reshape(len(df), n_configs),
+        **backtest_kwargs(rules)
+    )
+    metrics = equity_metrics(equity_matrix, timeframe=timeframe)
+    n_entries = np.repeat(entry[:, :, 0].sum(axis=0), len(exit_thresholds))
+
+    results = pd.DataFrame({
+        "p_entry_thr": np.repeat(entry_thresholds, len(exit_thresholds)),
+        "p_exit_thr": np.tile(exit_thresholds, len(entry_thresholds)),
+        # Mindestanzahl Trades, sonst harte Strafe für "macht nichts"
+        "sharpe": np.where(n_entries < min_entries, -1e9, metrics["sharpe"].to_numpy()),
+        "maxdd": metrics["maxdd"].to_numpy(),
+        "cagr": metrics["cagr"].to_numpy()
+    })
+
+    return (
+        results
+        .sort_values("sharpe", ascending=False, kind="stable")
+        .reset_index(drop=True)
+    )
+
+def sweep_threshold(df, entry_thresholds=None, p_exit_thr=0.4, timeframe=None, rules=None):
     """
     Optimiert Entry-Threshold auf Validation-Set.
 
@@ -33,43 +193,229 @@ def sweep_threshold(df, entry_thresholds=None, p_exit_thr=0.4):
         df: DataFrame mit Preis-Daten und p_up-Prognose
         entry_thresholds: Liste von Entry-Thresholds zum Testen (default: 0.4-0.6)
         p_exit_thr: Fixer Exit-Threshold (default: 0.4)
+        timeframe: Bar-Intervall für die Annualisierung (default: "1d")
+        rules: Optional RuleSet oder CompiledRules (siehe sweep_grid)
 
     Returns:
         DataFrame mit Sharpe/CAGR/MaxDD für jeden Threshold, sortiert nach Sharpe (absteigend)
     """
-    import numpy as np
-    import pandas as pd
-    from src.policy import ml_policy
-    from src.backtest import SimpleBacktester
-    from src.eval import returns_from_equity, sharpe, max_drawdown, cagr
-
     if entry_thresholds is None:
         entry_thresholds = np.linspace(0.4, 0.6, 21)
+    return sweep_grid(df, entry_thresholds, [p_exit_thr], timeframe=timeframe, rules=rules)
 
-    results = []
-    for t in entry_thresholds:
-        signals = ml_policy(df, p_entry_thr=float(t), p_exit_thr=float(p_exit_thr))
-        bt = SimpleBacktester(df)
-        equity = bt.run(signals)
-        ret = returns_from_equity(equity)
+def _suffix_accumulate(values, groups, how):
+    """Kumulatives max/min von hinten nach vorne, neu gestartet pro Gruppe (zusammenhängende Blöcke)."""
+    rev = pd.Series(values[::-1]).groupby(groups[::-1])
+    return (rev.cummax() if how == "max" else rev.cummin()).to_numpy()[::-1]
 
-        n_entries = int(signals["entry_long"].sum())
-        if n_entries < 5:        # Mindestanzahl Trades
-            s = -1e9             # harte Strafe für "macht nichts"
-        else:
-            s = sharpe(ret, periods=252)
 
-        results.append({
-            "p_entry_thr": float(t),
-            "p_exit_thr": float(p_exit_thr),
-            "sharpe": float(s),
-            "maxdd": float(max_drawdown(equity)),
-            "cagr": float(cagr(equity))
-        })
+def _threshold_walk(open_, close, rank, exit_signal, n_levels, fees, slip, periods):
+    """
+    Sharpe/MaxDD/CAGR für alle Entry-Thresholds in einem sortierten Durchlauf.
 
-    return (
-        pd.DataFrame(results)
-        .sort_values("sharpe", ascending=False)
-        .reset_index(drop=True)
-    )
+    Die Exit-Aktionen zerlegen die Bars in Segmente; der Equity-Pfad eines
+    Segments hängt nur vom ersten Entry darin ab (weitere Entries während
+    eines offenen Trades ändern nichts). Beim Absenken des Thresholds kommen
+    Entries nur dazu, der erste Entry eines Segments wandert also nur nach
+    vorne. Pro Segment werden genau diese Wechsel ausgewertet:
+    - Summen von Returns und quadrierten Returns (Sharpe) sowie die
+      Log-Equity (CAGR) als laufende Summen der Änderungen
+    - MaxDD über einen Segment-Baum mit (Faktor, Hoch, Tief, Drawdown) pro
+      Knoten, der nur entlang der geänderten Segmente neu verknüpft wird
+
+    Entspricht _long_only_equity ohne Positionsgrösse und Cooldown.
+
+    Args:
+        open_, close: 1D-Arrays mit Open/Close-Preisen
+        rank: Pro Signal-Bar 0 (nie Entry) oder k + 1 (Entry bei Threshold-Index < k + 1)
+        exit_signal: Boolean-Array mit den Exit-Signalen
+        n_levels: Anzahl distinkter Levels (Threshold-Indizes 0..n_levels)
+        fees, slip: Fees und Slippage als Anteil
+        periods: Perioden pro Jahr
+
+    Returns:
+        Tuple (sharpe, maxdd, cagr) mit Arrays der Länge n_levels + 1
+    """
+    n = len(close)
+    entry_price = open_ * (1 + slip + fees)
+    exit_price = open_ * (1 - slip - fees)
+    exit_act = _shift_down(np.asarray(exit_signal, dtype=bool))
+    ends = np.append(np.flatnonzero(exit_act), n)
+    seg = np.cumsum(exit_act) - exit_act
+
+    # Hoch/Tief/Drawdown der Closes ab jedem Bar bis zum Segment-Ende (Exit-Bar ausgenommen)
+    max_close = _suffix_accumulate(np.where(exit_act, -np.inf, close), seg, "max")
+    min_close = _suffix_accumulate(np.where(exit_act, np.inf, close), seg, "min")
+    next_min = np.append(min_close[1:], np.inf)
+    next_min[:-1][seg[1:] != seg[:-1]] = np.inf
+    dd_close = np.minimum(_suffix_accumulate(next_min / close, seg, "min"), 1.0)
+
+    cc = np.zeros(n)
+    cc[1:] = close[1:] / close[:-1] - 1
+    c1 = np.cumsum(cc)
+    c2 = np.cumsum(cc ** 2)
+
+    # Entry-Kandidaten als Aktions-Bars (Signal am Vortag, letzter Signal-Bar wirkt nie)
+    e = np.flatnonzero(rank[:-1] > 0) + 1
+    r = rank[e - 1]
+    s = seg[e]
+    x = ends[s]
+    closed = x < n
+    round_trip = e == x
+    last = np.where(closed, x - 1, n - 1)
+    xi = np.minimum(x, n - 1)
+
+    # Segment mit Entry an e als (Faktor, Hoch, Tief, Drawdown) relativ zum Segment-Start
+    with np.errstate(divide="ignore", invalid="ignore"):
+        v_max = max_close[e] / entry_price[e]
+        v_min = min_close[e] / entry_price[e]
+        out = exit_price[xi] / entry_price[e]
+        factor = np.where(closed, out, close[-1] / entry_price[e])
+        high = np.maximum(1.0, np.where(closed, np.maximum(v_max, out), v_max))
+        low = np.minimum(1.0, np.where(closed, np.minimum(v_min, out), v_min))
+        dd = np.minimum.reduce([np.ones(len(e)), v_min, dd_close[e],
+                                np.where(closed, out / np.maximum(1.0, v_max), 1.0)])
+
+        r_in = close[e] / entry_price[e] - 1
+        r_out = np.where(closed, exit_price[xi] / close[np.maximum(x - 1, 0)] - 1, 0.0)
+        sum1 = r_in + c1[last] - c1[e] + r_out
+        sum2 = r_in ** 2 + c2[last] - c2[e] + r_out ** 2
+    rt = out - 1
+    high = np.where(round_trip, 1.0, high)
+    low = np.where(round_trip, np.minimum(1.0, out), low)
+    dd = np.where(round_trip, np.minimum(1.0, out), dd)
+    sum1 = np.where(round_trip, rt, sum1)
+    sum2 = np.where(round_trip, rt ** 2, sum2)
+    log_factor = np.log(factor)
+
+    # Wechsel des ersten Entries pro Segment: nach Segment, dann absteigendem Rang
+    order = np.lexsort((e, -r, s))
+    first = pd.Series(e[order]).groupby(s[order]).cummin()
+    before = first.groupby(s[order]).shift(1, fill_value=n + 1).to_numpy()
+    ev = order[e[order] < before]
+    same = np.zeros(len(ev), dtype=bool)
+    same[1:] = s[ev[1:]] == s[ev[:-1]]
+
+    def delta(values):
+        prev = np.zeros(len(ev))
+        prev[1:] = values[ev[:-1]]
+        return values[ev] - np.where(same, prev, 0.0)
+
+    # Laufende Summen in Reihenfolge des Durchlaufs (Rang absteigend)
+    walk = np.argsort(-r[ev], kind="stable")
+    ev_rank = r[ev][walk]
+    totals = [np.concatenate([[0.0], np.cumsum(delta(v)[walk])]) for v in (sum1, sum2, log_factor)]
+    k = np.arange(n_levels + 1)
+    applied = np.searchsorted(-ev_rank, -k, side="left")   # Anzahl Wechsel mit Rang > k
+    s1, s2, log_total = (t[applied] for t in totals)
+
+    mean = s1 / n
+    std = np.sqrt(np.maximum(s2 / n - mean ** 2, 0.0))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe_ = np.where(std == 0, 0.0, mean / std * np.sqrt(periods))
+    cagr_ = np.exp(log_total * periods / n) - 1 if n >= 2 else np.zeros(n_levels + 1)
+
+    # Segment-Baum für den MaxDD, Blätter = Segmente (leer = flach)
+    size = 1 << max(len(ends) - 1, 1).bit_length()
+    t_, h_, l_, d_ = ([1.0] * (2 * size) for _ in range(4))
+    maxdd = np.zeros(n_levels + 1)
+    i = 0
+    for level in range(n_levels, -1, -1):
+        while i < len(ev_rank) and ev_rank[i] > level:
+            j = ev[walk[i]]
+            pos = size + s[j]
+            t_[pos], h_[pos], l_[pos], d_[pos] = factor[j], high[j], low[j], dd[j]
+            pos //= 2
+            while pos:
+                a, b = 2 * pos, 2 * pos + 1
+                ta = t_[a]
+                t_[pos] = ta * t_[b]
+                h_[pos] = max(h_[a], ta * h_[b])
+                l_[pos] = min(l_[a], ta * l_[b])
+                d_[pos] = min(d_[a], d_[b], ta * l_[b] / h_[a])
+                pos //= 2
+            i += 1
+        maxdd[level] = d_[1] - 1
+    return sharpe_, maxdd, cagr_
+
+
+def sweep_threshold_exhaustive(df, p_exit_thr=0.4, min_entries=5, chunk_size=512, timeframe=None,
+                               rules=None, engine="walk"):
+    """
+    Exakte Sharpe/CAGR/MaxDD-Front über alle distinkten Entry-Thresholds.
+
+    Die Entry-Maske (p_up > t & Filter) ändert sich nur an den distinkten
+    p_up-Werten der Bars, die die ATR/EMA50-Filter (bzw. die Regeln)
+    passieren; genau diese Thresholds werden getestet. p_up wird einmal
+    sortiert und die Thresholds absteigend durchlaufen; Signale und
+    Kennzahlen werden nur dort aktualisiert, wo ein Entry dazukommt
+    (siehe _threshold_walk) – Aufwand O(n_bars log n_bars) statt eines
+    Backtests pro Threshold.
+
+    Args:
+        df: DataFrame mit Preis-Daten und p_up-Prognose
+        p_exit_thr: Fixer Exit-Threshold (default: 0.4)
+        min_entries: Mindestanzahl Entry-Signale, sonst Sharpe = -1e9 (default: 5)
+        chunk_size: Thresholds pro Batch bei engine="batch" (begrenzt den Speicherbedarf)
+        timeframe: Bar-Intervall für die Annualisierung (default: "1d")
+        rules: Optional RuleSet oder CompiledRules (siehe sweep_grid). Mit
+            Positionsgrösse ≠ 1 oder Cooldown wird immer der Batch-Backtest verwendet
+        engine: "walk" (inkrementell, default) oder "batch" (ein vollständiger
+            Backtest pro Threshold, Referenz-Implementierung)
+
+    Returns:
+        DataFrame mit Sharpe/CAGR/MaxDD für jeden distinkten Threshold,
+        aufsteigend nach p_entry_thr sortiert. Threshold t steht für alle
+        Werte im Intervall [t, nächster Threshold).
+    """
+    from src.policy import ml_policy_grid
+    from src.backtest import SimpleBacktester
+    from src.rules import backtest_kwargs, compile_rules
+
+    if engine not in ("walk", "batch"):
+        raise ValueError(f"Unbekannte Engine: {engine}")
+
+    # Filter- und Exit-Maske sind unabhängig vom Entry-Threshold
+    rules = compile_rules(rules, df)
+    entry_all, exit_ = ml_policy_grid(df, [-np.inf], [p_exit_thr], rules=rules)
+    candidates = entry_all[:, 0, 0]
+    exit_col = exit_[:, 0, 0]
+
+    p_up = df["p_up"].to_numpy(dtype=float)
+    levels = np.unique(p_up[candidates])
+    if len(levels) == 0:
+        return pd.DataFrame(columns=["p_entry_thr", "p_exit_thr", "n_entries", "sharpe", "maxdd", "cagr"])
+
+    # Threshold knapp unter dem Minimum lässt alle Kandidaten durch
+    thresholds = np.concatenate([[np.nextafter(levels[0], -np.inf)], levels])
+    # Rang k ⇔ p_up == levels[k-1]; Entry bei Threshold-Index k ⇔ Rang > k
+    rank = np.where(candidates, np.searchsorted(levels, p_up) + 1, 0)
+    # Entries mit Rang > k für jeden Threshold-Index k
+    n_entries = np.bincount(rank, minlength=len(thresholds) + 1)[::-1].cumsum()[::-1][1:]
+
+    bt = SimpleBacktester(df)
+    kwargs = backtest_kwargs(rules)
+    sized = kwargs.get("cooldown", 0) > 0 or (
+        "size" in kwargs and not np.all(np.asarray(kwargs["size"], dtype=float) == 1))
+    if engine == "walk" and not sized:
+        sharpe_, maxdd, cagr_ = _threshold_walk(
+            df["Open"].to_numpy(dtype=float), df["Close"].to_numpy(dtype=float), rank, exit_col,
+            len(levels), bt.fees, bt.slip, _periods(None, timeframe))
+    else:
+        parts = []
+        for start in range(0, len(thresholds), chunk_size):
+            ks = np.arange(start, min(start + chunk_size, len(thresholds)))
+            entry = rank[:, None] > ks[None, :]
+            exit_matrix = np.broadcast_to(exit_col[:, None], entry.shape)
+            parts.append(equity_metrics(bt.run_batch(entry, exit_matrix, **kwargs), timeframe=timeframe))
+        metrics = pd.concat(parts, ignore_index=True)
+        sharpe_, maxdd, cagr_ = (metrics[c].to_numpy() for c in ("sharpe", "maxdd", "cagr"))
 
+    return pd.DataFrame({
+        "p_entry_thr": thresholds,
+        "p_exit_thr": float(p_exit_thr),
+        "n_entries": n_entries,
+        "sharpe": np.where(n_entries < min_entries, -1e9, sharpe_),
+        "maxdd": maxdd,
+        "cagr": cagr_
+    })
@@ -0,0 +1,204 @@
+"""
+Suche nach der besten Feature-Teilmenge für die Logistic Regression.
+
+Die Kandidaten-Spalten werden einmal mit Mittelwert/Standardabweichung des
+Trainings-Fensters standardisiert; jede Teilmenge ist danach nur noch eine
+Spaltenauswahl dieser Matrix (StandardScaler wirkt pro Spalte, das
+Ergebnis ist identisch zu train_logreg auf der Teilmenge). Die Teilmengen
+werden nach Grösse geordnet gefittet: jede Teilmenge startet (warm start)
+mit den Koeffizienten ihrer Eltern-Teilmenge ohne das zuletzt hinzugekommene
+Feature. Die Fits einer Ebene laufen parallel im Prozess-Pool; alle
+Validierungs-Prognosen einer Ebene werden in einem Batch-Backtest
+(ml_policy_matrix + run_batch) bewertet.
+
+Modi:
+- "exhaustive": alle 2^k - 1 nicht-leeren Teilmengen (11 Kandidaten = 2047)
+- "beam": pro Grösse nur die beam_width besten Teilmengen (nach Sharpe auf
+  der Validierung) um je ein Feature erweitern – für grössere Kataloge
+
+Verwendung:
+    python -m src.feature_search
+"""
+
+import itertools
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed, effective_n_jobs, parallel_config
+from sklearn.linear_model import LogisticRegression
+
+from src.backtest import SimpleBacktester
+from src.config import FEATURES_WITH_VOLUME, P_ENTRY_THR, P_EXIT_THR, POLICY_COLUMNS
+from src.eval import equity_metrics
+from src.policy import ml_policy_matrix
+from src.rules import backtest_kwargs, compile_rules
+
+
+def standardize(train: pd.DataFrame, val: pd.DataFrame, candidates):
+    """
+    Standardisiert alle Kandidaten-Spalten mit den Statistiken des Trainings.
+
+    Returns:
+        Tuple (Z_train, Z_val) als float-Arrays (Spalten in Reihenfolge der Kandidaten)
+    """
+    X_train = train[list(candidates)].to_numpy(dtype=float)
+    mean = X_train.mean(axis=0)
+    std = X_train.std(axis=0)
+    std[std == 0] = 1.0
+    Z_train = (X_train - mean) / std
+    Z_val = (val[list(candidates)].to_numpy(dtype=float) - mean) / std
+    return Z_train, Z_val
+
+
+def _fit_subsets(Z_train, y, Z_val, subsets, inits, C, max_iter):
+    """Fittet eine Liste von Teilmengen; gibt (coef, intercept, p_val) pro Teilmenge zurück."""
+    out = []
+    for cols, init in zip(subsets, inits):
+        cols = list(cols)
+        clf = LogisticRegression(C=C, max_iter=max_iter, warm_start=init is not None)
+        if init is not None:
+            clf.coef_, clf.intercept_ = init[0][None, :].copy(), np.array([init[1]])
+        clf.fit(Z_train[:, cols], y)
+        out.append((clf.coef_[0], float(clf.intercept_[0]), clf.predict_proba(Z_val[:, cols])[:, 1]))
+    return out
+
+
+def _warm_start(subset, parent, fitted):
+    """Koeffizienten der Eltern-Teilmenge, für neue Features mit 0 aufgefüllt."""
+    if parent is None or parent not in fitted:
+        return None
+    coef, intercept = fitted[parent]
+    init = np.zeros(len(subset))
+    pos = {c: i for i, c in enumerate(subset)}
+    for c, w in zip(parent, coef):
+        init[pos[c]] = w
+    return init, intercept
+
+
+def _fit_level(Z_train, y, Z_val, subsets, parents, fitted, C, max_iter, n_jobs):
+    inits = [_warm_start(s, p, fitted) for s, p in zip(subsets, parents)]
+    if n_jobs == 1 or len(subsets) == 1:
+        return _fit_subsets(Z_train, y, Z_val, subsets, inits, C, max_iter)
+
+    n_chunks = min(len(subsets), 4 * effective_n_jobs(n_jobs))
+    chunks = np.array_split(np.arange(len(subsets)), n_chunks)
+    with parallel_config(backend="loky", inner_max_num_threads=1):
+        parts = Parallel(n_jobs=n_jobs)(
+            delayed(_fit_subsets)(Z_train, y, Z_val, [subsets[i] for i in idx], [inits[i] for i in idx],
+                                  C, max_iter)
+            for idx in chunks
+        )
+    return [r for part in parts for r in part]
+
+
+def _evaluate(val, P, p_entry_thr, p_exit_thr, timeframe=None, rules=None):
+    """Batch-Backtest aller Prognose-Spalten von P auf dem Validierungs-Fenster."""
+    entry, exit_ = ml_policy_matrix(val, P, p_entry_thr=p_entry_thr, p_exit_thr=p_exit_thr, rules=rules)
+    equity, position = SimpleBacktester(val).run_batch(entry, exit_, return_positions=True,
+                                                       **backtest_kwargs(rules))
+    return equity_metrics(equity, position, timeframe=timeframe)
+
+
+def feature_subset_search(train: pd.DataFrame, val: pd.DataFrame, candidates=FEATURES_WITH_VOLUME,
+                          mode="exhaustive", beam_width=10, max_features=None, C=1.0, max_iter=300,
+                          n_jobs=-1, p_entry_thr=P_ENTRY_THR, p_exit_thr=P_EXIT_THR, timeframe=None,
+                          rules=None):
+    """
+    Bewertet Feature-Teilmengen per Backtest auf dem Validierungs-Fenster.
+
+    Args:
+        train: Trainings-DataFrame mit Kandidaten-Spalten und Label 'y'
+        val: Validierungs-DataFrame mit Kandidaten-Spalten, OHLC und POLICY_COLUMNS
+        candidates: Kandidaten-Spalten (default: FEATURES_WITH_VOLUME)
+        mode: "exhaustive" (alle Teilmengen) oder "beam" (default: "exhaustive")
+        beam_width: Teilmengen, die pro Grösse erweitert werden (nur mode="beam", default: 10)
+        max_features: Maximale Grösse einer Teilmenge (default: alle Kandidaten)
+        C, max_iter: Parameter der Logistic Regression wie in train_logreg
+        n_jobs: Anzahl Prozesse für die Fits (default: -1 = alle CPUs)
+        p_entry_thr, p_exit_thr: Thresholds für die Policy
+        timeframe: Bar-Intervall für die Annualisierung (default: "1d")
+        rules: Optional RuleSet (Entry-Filter, Positionsgrösse und Cooldown im Backtest);
+            braucht die Regel-Spalten in val
+
+    Returns:
+        DataFrame mit einer Zeile pro Teilmenge (features, n_features und den
+        Kennzahlen aus equity_metrics), sortiert nach Sharpe absteigend
+    """
+    if mode not in ("exhaustive", "beam"):
+        raise ValueError(f"Unbekannter Modus: {mode}")
+    candidates = list(candidates)
+    k = len(candidates)
+    max_features = min(max_features or k, k)
+
+    Z_train, Z_val = standardize(train, val, candidates)
+    y = train["y"].to_numpy()
+    # Backtest braucht nur Preise und Policy-Spalten
+    val_bt = val[list(dict.fromkeys(["Open", "Close"] + POLICY_COLUMNS))]
+    # Regeln einmal auf dem Validierungs-Fenster kompilieren, für alle Ebenen gleich
+    rules = compile_rules(rules, val)
+
+    fitted = {}          # Teilmenge (Tuple von Spalten-Indizes) -> (coef, intercept)
+    results = []
+    subsets = [(i,) for i in range(k)]
+    parents = [None] * k
+    for size in range(1, max_features + 1):
+        fits = _fit_level(Z_train, y, Z_val, subsets, parents, fitted, C, max_iter, n_jobs)
+        for subset, (coef, intercept, _) in zip(subsets, fits):
+            fitted[subset] = (coef, intercept)
+        metrics = _evaluate(val_bt, np.column_stack([p for _, _, p in fits]), p_entry_thr, p_exit_thr,
+                            timeframe, rules)
+        metrics.insert(0, "n_features", size)
+        metrics.insert(0, "features", [tuple(candidates[i] for i in s) for s in subsets])
+        metrics["subset"] = subsets
+        results.append(metrics)
+
+        if size == max_features:
+            break
+        if mode == "exhaustive":
+            subsets = list(itertools.combinations(range(k), size + 1))
+            parents = [s[:-1] for s in subsets]
+        else:
+            order = np.argsort(-metrics["sharpe"].fillna(-np.inf).to_numpy(), kind="stable")
+            beam = [subsets[i] for i in order[:beam_width]]
+            children = {}
+            for parent in beam:
+                for j in range(k):
+                    if j not in parent:
+                        children.setdefault(tuple(sorted(parent + (j,))), parent)
+            subsets, parents = list(children), list(children.values())
+
+    out = pd.concat(results, ignore_index=True).drop(columns="subset")
+    return out.sort_values(["sharpe", "n_features"], ascending=[False, True], kind="stable").reset_index(drop=True)
+
+
+def main():
+    from src.config import TIMEFRAME
+    from src.data import download_ohlcv
+    from src.cache import get_cache
+    from src.compare_features import train_and_test
+
+    print("=" * 70)
+    print("FEATURE-SUBSET-SUCHE")
+    print("=" * 70)
+
+    df = download_ohlcv("ETH-USD", timeframe=TIMEFRAME, start="2019-01-01")
+    lab = get_cache().labeled(df, fee_buffer=0.0025, columns=FEATURES_WITH_VOLUME + POLICY_COLUMNS,
+                              timeframe=TIMEFRAME)
+
+    # Auswahl auf der Validierung (2022), Bestätigung auf dem Test (ab 2023)
+    fit = lab.loc[:"2022-01-01"]
+    val = lab.loc["2022-01-01":"2023-01-01"]
+    train = lab.loc[:"2023-01-01"]
+    test = lab.loc["2023-01-01":]
+
+    ranking = feature_subset_search(fit, val, timeframe=TIMEFRAME)
+    print(f"\n{len(ranking)} Teilmengen bewertet. Top 10 (Validierung 2022):")
+    print(ranking.head(10)[["features", "sharpe", "cagr", "maxdd", "trades"]].to_string(index=False))
+
+    print("\nTop 5 auf dem Test-Fenster (Training bis 2023):")
+    rows = [train_and_test(train, test, list(f), ", ".join(f)) for f in ranking["features"].head(5)]
+    print(pd.DataFrame(rows).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
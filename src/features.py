@@ -1,22 +1,169 @@
 import pandas as pd
 import numpy as np
-from ta.momentum import RSIIndicator
-from ta.trend import EMAIndicator, MACD
-from ta.volatility import AverageTrueRange, BollingerBands
-from ta.volume import OnBalanceVolumeIndicator, MFIIndicator, VolumeWeightedAveragePrice
+from src import indicators
+from src.timeframe import get_timeframe
 
-def add_features(df: pd.DataFrame, include_volume=True) -> pd.DataFrame:
+# Abhängigkeitsgraph der Features (NumPy-Engine):
+# Spalte -> (Voraussetzungen, Funktion(ctx) -> Array)
+# ctx enthält die Input-Spalten (Open/High/Low/Close/Volume als Arrays) und alle
+# bereits berechneten Knoten. Knoten mit "_" am Anfang sind Zwischenergebnisse
+# und landen nicht im DataFrame. Fenster sind in Tagen angegeben und werden über
+# ctx["_window"] in Bars umgerechnet (ohne timeframe: unverändert).
+FEATURE_GRAPH = {
+    # Trend-Indikatoren
+    "ema50": (("Close",), lambda c: indicators.ema(c["Close"], c["_window"](50))),
+    "ema200": (("Close",), lambda c: indicators.ema(c["Close"], c["_window"](200))),
+    # Momentum-Indikatoren
+    "rsi14": (("Close",), lambda c: indicators.rsi(c["Close"], c["_window"](14))),
+    "macd_diff": (("Close",), lambda c: indicators.macd_diff(
+        c["Close"], c["_window"](26), c["_window"](12), c["_window"](9))),
+    # Volatilitäts-Indikatoren (True Range wird geteilt)
+    "_tr": (("High", "Low", "Close"), lambda c: indicators.true_range(c["High"], c["Low"], c["Close"])),
+    "atr": (("_tr",), lambda c: indicators.atr(c["_tr"], c["_window"](14))),
+    "atr_pct": (("atr", "Close"), lambda c: c["atr"] / c["Close"] * 100),
+    "bb_width": (("Close",), lambda c: indicators.bollinger_width(c["Close"], c["_window"](20), 2)),
+    # Regime
+    "regime_bull": (("Close", "ema200"), lambda c: (c["Close"] > c["ema200"]).astype(int)),
+    # Returns (über einen Tag)
+    "ret1": (("Close",), lambda c: indicators.diff(np.log(c["Close"]), c["_window"](1))),
+    # Volumen-Indikatoren
+    "obv": (("Close", "Volume"), lambda c: indicators.obv(c["Close"], c["Volume"])),
+    "obv_ema": (("obv",), lambda c: indicators.ewm_mean(c["obv"], c["_window"](20))),
+    "mfi": (("High", "Low", "Close", "Volume"),
+            lambda c: indicators.mfi(c["High"], c["Low"], c["Close"], c["Volume"], c["_window"](14))),
+    "vol_sma20": (("Volume",), lambda c: indicators.sma(c["Volume"], c["_window"](20))),
+    "vol_ratio": (("Volume", "vol_sma20"), lambda c: c["Volume"] / c["vol_sma20"]),
+}
+
+VOLUME_FEATURES = ["obv", "obv_ema", "mfi", "vol_sma20", "vol_ratio"]
+ALL_FEATURES = [name for name in FEATURE_GRAPH if not name.startswith("_")]
+
+
+def resolve_features(columns):
+    """
+    Bestimmt alle Knoten, die für die gewünschten Spalten berechnet werden müssen.
+
+    Args:
+        columns: Liste gewünschter Feature-Spalten
+
+    Returns:
+        Liste der Knoten in Berechnungsreihenfolge (Voraussetzungen zuerst)
+    """
+    order = []
+    visiting = set()
+
+    def visit(name):
+        if name in order or name not in FEATURE_GRAPH:
+            return
+        if name in visiting:
+            raise ValueError(f"Zyklische Feature-Abhängigkeit bei {name}")
+        visiting.add(name)
+        for dep in FEATURE_GRAPH[name][0]:
+            visit(dep)
+        visiting.discard(name)
+        order.append(name)
+
+    for col in columns:
+        if col not in FEATURE_GRAPH:
+            raise ValueError(f"Unbekanntes Feature: {col}")
+        visit(col)
+    return order
+
+
+def add_features(df: pd.DataFrame, include_volume=True, engine="numpy", columns=None,
+                 timeframe=None) -> pd.DataFrame:
     """
     Berechnet technische Indikatoren als Features.
 
     Args:
         df: DataFrame mit OHLCV-Daten
         include_volume: Wenn True, werden Volumen-Indikatoren hinzugefügt (default: True)
+        engine: "numpy" (eigene Kernels aus src.indicators, default) oder
+                "ta" (Referenz-Implementierung mit der ta-Library)
+        columns: Optionale Liste benötigter Feature-Spalten. Dann werden nur diese
+                 und ihre Voraussetzungen berechnet (include_volume wird ignoriert).
+                 Default None = alle Features.
+        timeframe: Bar-Intervall der Daten, z.B. "1h" oder Timeframe. Die Fenster
+                   (EMA50 = 50 Tage usw.) werden dann in Bars umgerechnet.
+                   Default None = Fenster in Bars (wie bei Tages-Bars).
 
     Returns:
         DataFrame mit zusätzlichen Feature-Spalten
     """
+    if columns is None:
+        columns = [c for c in ALL_FEATURES if include_volume or c not in VOLUME_FEATURES]
+        if "Volume" not in df.columns:
+            columns = [c for c in columns if c not in VOLUME_FEATURES]
+    nodes = resolve_features(columns)
+
     d = df.copy()
+    if engine == "numpy":
+        _add_features_numpy(d, nodes, timeframe)
+    elif engine == "ta":
+        if timeframe is not None and get_timeframe(timeframe).bars_per_day != 1:
+            raise ValueError("Die ta-Engine unterstützt nur Tages-Bars")
+        _add_features_ta(d, include_volume=any(n in VOLUME_FEATURES for n in nodes))
+        d = d[list(df.columns) + [n for n in nodes if not n.startswith("_")]]
+    else:
+        raise ValueError(f"Unbekannte Engine: {engine}")
+    return d.dropna()
+
+
+def feature_arrays(bars, include_volume=True, columns=None, timeframe=None) -> dict:
+    """
+    Berechnet Features direkt auf Arrays, ohne DataFrame-Kopie.
+
+    Gedacht für lange Historien (z.B. OhlcvArrays aus OhlcvStore.open_arrays),
+    bei denen nur die Feature-Spalten selbst neu angelegt werden.
+
+    Args:
+        bars: Mapping mit OHLCV-Arrays (OhlcvArrays, Dict oder DataFrame)
+        include_volume, columns, timeframe: wie bei add_features
+
+    Returns:
+        Dict Feature -> Array in voller Länge (Warm-up-Zeilen sind NaN,
+        siehe valid_mask)
+    """
+    if columns is None:
+        columns = [c for c in ALL_FEATURES if include_volume or c not in VOLUME_FEATURES]
+        if "Volume" not in bars:
+            columns = [c for c in columns if c not in VOLUME_FEATURES]
+    ctx = _compute_nodes(bars, resolve_features(columns), timeframe)
+    return {name: ctx[name] for name in columns}
+
+
+def valid_mask(arrays) -> np.ndarray:
+    """Zeilen ohne NaN über alle Arrays (entspricht dropna)."""
+    arrays = list(arrays.values()) if isinstance(arrays, dict) else list(arrays)
+    mask = np.ones(len(arrays[0]), dtype=bool)
+    for values in arrays:
+        mask &= ~np.isnan(np.asarray(values, dtype=float))
+    return mask
+
+
+def _compute_nodes(bars, nodes, timeframe=None) -> dict:
+    # np.asarray kopiert float64-Arrays (auch Memory-mapped) nicht
+    ctx = {col: np.asarray(bars[col], dtype=float) for col in ["Open", "High", "Low", "Close", "Volume"]
+           if col in bars}
+    ctx["_window"] = get_timeframe(timeframe).window if timeframe is not None else (lambda days: days)
+    for name in nodes:
+        ctx[name] = FEATURE_GRAPH[name][1](ctx)
+    return ctx
+
+
+def _add_features_numpy(d: pd.DataFrame, nodes, timeframe=None):
+    ctx = _compute_nodes(d, nodes, timeframe)
+    for name in nodes:
+        if not name.startswith("_"):
+            d[name] = ctx[name]
+
+
+def _add_features_ta(d: pd.DataFrame, include_volume: bool):
+    # ta nur bei Bedarf importieren (langsamer Import)
+    from ta.momentum import RSIIndicator
+    from ta.trend import EMAIndicator, MACD
+    from ta.volatility import AverageTrueRange, BollingerBands
+    from ta.volume import OnBalanceVolumeIndicator, MFIIndicator
 
     # Trend-Indikatoren
     d["ema50"]  = EMAIndicator(d["Close"], 50).ema_indicator()
@@ -54,5 +201,3 @@ def add_features(df: pd.DataFrame, include_volume=True) -> pd.DataFrame:
         # Volume Ratio (aktuelles Volumen / durchschnittliches Volumen)
         d["vol_sma20"] = d["Volume"].rolling(20).mean()
         d["vol_ratio"] = d["Volume"] / d["vol_sma20"]
-
-    return d.dropna()
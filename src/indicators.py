@@ -0,0 +1,216 @@
+"""
+Vektorisierte NumPy-Kernels für die technischen Indikatoren aus add_features.
+
+Ersetzt die Indikator-Objekte der ta-Library. Die Formeln (inkl. Warm-up und
+min_periods) entsprechen ta 0.11, sodass die Ergebnisse bis auf Rundung
+identisch sind. Rekursive Glättungen (EMA, Wilder) werden blockweise in
+geschlossener Form berechnet, ohne Python-Loop pro Bar.
+"""
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Maximaler Wachstumsfaktor innerhalb eines Blocks der geschlossenen Form
+_MAX_BLOCK_GROWTH = 1e12
+
+
+def _linear_recursion(x, decay, gain, init):
+    """
+    Berechnet y[t] = decay * y[t-1] + gain * x[t] mit y[-1] = init.
+
+    Innerhalb eines Blocks gilt die geschlossene Form
+    y[t] = decay^(t+1) * (init + gain * Σ x[i] * decay^-(i+1)).
+    Die Blocklänge wird so gewählt, dass decay^-L numerisch harmlos bleibt.
+    Ein NaN in x setzt sich in alle folgenden Werte fort (wie die ATR-Schleife
+    von ta); die EWM-Kernels überspringen NaN-Werte vorher.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.empty_like(x)
+    if len(x) == 0:
+        return y
+    block = max(1, int(np.log(_MAX_BLOCK_GROWTH) / -np.log(decay)))
+    powers = decay ** np.arange(1, block + 1)
+
+    carry = init
+    for start in range(0, len(x), block):
+        chunk = x[start:start + block]
+        p = powers[:len(chunk)]
+        y[start:start + len(chunk)] = p * (carry + gain * np.cumsum(chunk / p))
+        carry = y[start + len(chunk) - 1]
+    return y
+
+
+def _ewm_adjust_false(x, alpha, min_periods):
+    """
+    pandas ewm(alpha=..., adjust=False, min_periods=...).mean() inkl. NaN-Lücken.
+
+    Wie pandas (ignore_na=False) werden NaN-Werte übersprungen: an NaN-Bars
+    bleibt der letzte Wert stehen, der erste Wert nach einer Lücke von g Bars
+    gewichtet den alten Stand mit decay^(g+1). min_periods zählt gültige Werte.
+    """
+    x = np.asarray(x, dtype=float)
+    out = np.full_like(x, np.nan)
+    valid = ~np.isnan(x)
+    idx = np.flatnonzero(valid)
+    if len(idx) == 0:
+        return out
+    decay = 1 - alpha
+
+    # Läufe gültiger Werte; zwischen zwei Läufen liegt eine NaN-Lücke
+    breaks = np.flatnonzero(np.diff(idx) > 1) + 1
+    starts = idx[np.r_[0, breaks]]
+    ends = idx[np.r_[breaks - 1, len(idx) - 1]] + 1
+    prev_end = None
+    for start, end in zip(starts, ends):
+        if prev_end is None:
+            # Startwert = erster gültiger Wert (decay * x0 + alpha * x0 = x0)
+            first = x[start]
+        else:
+            carry = out[prev_end - 1]
+            out[prev_end:start] = carry
+            weight = decay ** (start - prev_end + 1)
+            first = (weight * carry + alpha * x[start]) / (weight + alpha)
+        out[start] = first
+        out[start + 1:end] = _linear_recursion(x[start + 1:end], decay, alpha, first)
+        prev_end = end
+    out[prev_end:] = out[prev_end - 1]
+    out[np.cumsum(valid) < min_periods] = np.nan
+    return out
+
+
+def ema(x, window):
+    """Exponential Moving Average wie ta.trend.EMAIndicator (span=window, adjust=False)."""
+    return _ewm_adjust_false(x, 2 / (window + 1), window)
+
+
+def ewm_mean(x, span):
+    """pandas ewm(span=span).mean() mit adjust=True (gewichteter Mittelwert, NaN übersprungen)."""
+    x = np.asarray(x, dtype=float)
+    valid = ~np.isnan(x)
+    decay = 1 - 2 / (span + 1)
+    # NaN-Werte tragen kein Gewicht bei, die Gewichte zerfallen aber weiter (ignore_na=False)
+    num = _linear_recursion(np.where(valid, x, 0.0), decay, 1.0, 0.0)
+    den = _linear_recursion(valid.astype(float), decay, 1.0, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den > 0, num / den, np.nan)
+
+
+def sma(x, window):
+    """Simple Moving Average (rolling mean, NaN bis das Fenster voll ist)."""
+    x = np.asarray(x, dtype=float)
+    out = np.full_like(x, np.nan)
+    if len(x) >= window:
+        out[window - 1:] = sliding_window_view(x, window).mean(axis=1)
+    return out
+
+
+def rolling_sum(x, window):
+    """Rollende Summe (NaN bis das Fenster voll ist)."""
+    x = np.asarray(x, dtype=float)
+    out = np.full_like(x, np.nan)
+    if len(x) >= window:
+        out[window - 1:] = sliding_window_view(x, window).sum(axis=1)
+    return out
+
+
+def rolling_std(x, window):
+    """Rollende Standardabweichung mit ddof=0."""
+    x = np.asarray(x, dtype=float)
+    out = np.full_like(x, np.nan)
+    if len(x) >= window:
+        out[window - 1:] = sliding_window_view(x, window).std(axis=1)
+    return out
+
+
+def diff(x, lag=1):
+    """Differenz über lag Bars, die ersten lag Werte NaN."""
+    x = np.asarray(x, dtype=float)
+    out = np.empty_like(x)
+    out[:lag] = np.nan
+    out[lag:] = x[lag:] - x[:-lag]
+    return out
+
+
+def rsi(close, window=14, close_diff=None):
+    """
+    Relative Strength Index nach Wilder wie ta.momentum.RSIIndicator.
+
+    Args:
+        close: Close-Preise
+        window: Periode (default: 14)
+        close_diff: Optional bereits berechnete diff(close) zur Wiederverwendung
+    """
+    d = diff(close) if close_diff is None else close_diff
+    up = np.where(d > 0, d, 0.0)
+    down = np.where(d < 0, -d, 0.0)
+    emaup = _ewm_adjust_false(up, 1 / window, window)
+    emadn = _ewm_adjust_false(down, 1 / window, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(emadn == 0, 100.0, 100 - 100 / (1 + emaup / emadn))
+
+
+def macd_diff(close, window_slow=26, window_fast=12, window_sign=9):
+    """MACD-Histogramm (MACD - Signal) wie ta.trend.MACD.macd_diff."""
+    macd = ema(close, window_fast) - ema(close, window_slow)
+    return macd - ema(macd, window_sign)
+
+
+def true_range(high, low, close):
+    """True Range; der erste Wert ist High - Low (kein Vortags-Close)."""
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    prev_close = np.empty_like(high)
+    prev_close[:1] = np.nan
+    prev_close[1:] = np.asarray(close, dtype=float)[:-1]
+    return np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+
+def atr(tr, window=14):
+    """
+    Average True Range wie ta.volatility.AverageTrueRange.
+
+    Startwert ist der Mittelwert der ersten `window` True Ranges, danach
+    Wilder-Glättung. Vor dem Startwert ist die ATR 0 (wie bei ta).
+
+    Args:
+        tr: True Range (siehe true_range), kann zwischen Indikatoren geteilt werden
+        window: Periode (default: 14)
+    """
+    tr = np.asarray(tr, dtype=float)
+    out = np.zeros_like(tr)
+    if len(tr) < window:
+        return out
+    start = tr[:window].mean()
+    out[window - 1] = start
+    out[window:] = _linear_recursion(tr[window:], (window - 1) / window, 1 / window, start)
+    return out
+
+
+def bollinger_width(close, window=20, window_dev=2):
+    """Bollinger-Bandbreite (hband - lband) / Close."""
+    close = np.asarray(close, dtype=float)
+    mavg = sma(close, window)
+    mstd = rolling_std(close, window)
+    return ((mavg + window_dev * mstd) - (mavg - window_dev * mstd)) / close
+
+
+def obv(close, volume):
+    """On-Balance Volume wie ta.volume.OnBalanceVolumeIndicator."""
+    close = np.asarray(close, dtype=float)
+    volume = np.asarray(volume, dtype=float)
+    falling = np.zeros(len(close), dtype=bool)
+    falling[1:] = close[1:] < close[:-1]
+    return np.where(falling, -volume, volume).cumsum()
+
+
+def mfi(high, low, close, volume, window=14):
+    """Money Flow Index wie ta.volume.MFIIndicator."""
+    typical = (np.asarray(high, dtype=float) + np.asarray(low, dtype=float)
+               + np.asarray(close, dtype=float)) / 3.0
+    direction = np.zeros(len(typical))
+    direction[1:] = np.sign(typical[1:] - typical[:-1])
+    mfr = typical * np.asarray(volume, dtype=float) * direction
+    positive = rolling_sum(np.where(mfr >= 0.0, mfr, 0.0), window)
+    negative = np.abs(rolling_sum(np.where(mfr < 0.0, mfr, 0.0), window))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - 100 / (1 + positive / negative)
@@ -0,0 +1,193 @@
+"""
+Streaming-Ingest von Trade-Prints zu OHLCV-Bars.
+
+Liest grosse Trade-Dateien (CSV oder binär) in Chunks mit begrenztem Speicher
+und aggregiert sie zu Bars eines festen Intervalls (z.B. 1m, 1h, 4h, 1d).
+Jeder Chunk wird zu Teil-Bars reduziert, die Open/Close zusammen mit dem
+Zeitstempel des ersten/letzten Trades speichern. Beim Zusammenführen gewinnt
+der früheste bzw. späteste Trade, daher dürfen Trades über Chunk-Grenzen
+hinweg (oder innerhalb eines Chunks) ungeordnet sein. Der Speicherbedarf
+wächst mit der Anzahl Bars, nicht mit der Anzahl Trades.
+
+Benchmark (Rows/s):
+    python -m src.ingest
+"""
+
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.timeframe import parse_interval
+
+# Binärformat: ein Record pro Trade, Zeitstempel in ns seit Epoch (UTC)
+TRADE_DTYPE = np.dtype([("ts", "<i8"), ("price", "<f8"), ("size", "<f8")])
+
+# Teil-Bar: Trades eines Bars, reduziert
+_PARTIAL_FIELDS = ["bar", "first_ts", "open", "last_ts", "close", "high", "low", "volume"]
+
+
+def _reduce(p: dict) -> dict:
+    """Fasst Teil-Bars mit gleicher Bar-Nummer zusammen."""
+    if len(p["bar"]) == 0:
+        return p
+    # Nach Bar und Zeitstempel sortieren (stabil: bei Gleichstand gilt die Dateireihenfolge)
+    by_first = np.lexsort((p["first_ts"], p["bar"]))
+    bar = p["bar"][by_first]
+    starts = np.flatnonzero(np.r_[True, bar[1:] != bar[:-1]])
+    ends = np.r_[starts[1:], len(bar)] - 1
+
+    by_last = np.lexsort((p["last_ts"], p["bar"]))
+    return {
+        "bar": bar[starts],
+        "first_ts": p["first_ts"][by_first][starts],
+        "open": p["open"][by_first][starts],
+        "last_ts": p["last_ts"][by_last][ends],
+        "close": p["close"][by_last][ends],
+        "high": np.maximum.reduceat(p["high"][by_first], starts),
+        "low": np.minimum.reduceat(p["low"][by_first], starts),
+        "volume": np.add.reduceat(p["volume"][by_first], starts),
+    }
+
+
+def _trades_to_partial(ts, price, size, step_ns) -> dict:
+    ts = np.asarray(ts, dtype=np.int64)
+    price = np.asarray(price, dtype=float)
+    return _reduce({
+        "bar": ts // step_ns,
+        "first_ts": ts,
+        "open": price,
+        "last_ts": ts,
+        "close": price,
+        "high": price,
+        "low": price,
+        "volume": np.asarray(size, dtype=float),
+    })
+
+
+def _concat(partials) -> dict:
+    return {f: np.concatenate([p[f] for p in partials]) for f in _PARTIAL_FIELDS}
+
+
+def _to_ns(values, time_unit) -> np.ndarray:
+    """Zeitstempel-Spalte (Epoch-Zahlen oder Datums-Strings) → int64 ns UTC."""
+    if pd.api.types.is_numeric_dtype(values):
+        ts = pd.to_datetime(values, unit=time_unit)
+    else:
+        ts = pd.to_datetime(values, utc=True).dt.tz_localize(None)
+    return pd.DatetimeIndex(ts).as_unit("ns").asi8
+
+
+def iter_trade_chunks(path, chunk_size=1_000_000, time_col="timestamp", price_col="price",
+                      size_col="amount", time_unit="ms"):
+    """
+    Liest eine Trade-Datei in Chunks.
+
+    Dateien mit Endung .bin werden als Records mit TRADE_DTYPE gelesen
+    (Memory-mapped), alles andere als CSV.
+
+    Yields:
+        Tuple (ts_ns, price, size) als Arrays mit höchstens chunk_size Einträgen
+    """
+    path = Path(path)
+    if path.suffix == ".bin":
+        records = np.memmap(path, dtype=TRADE_DTYPE, mode="r")
+        for start in range(0, len(records), chunk_size):
+            chunk = records[start:start + chunk_size]
+            yield chunk["ts"], chunk["price"], chunk["size"]
+        return
+
+    reader = pd.read_csv(path, usecols=[time_col, price_col, size_col], chunksize=chunk_size)
+    for chunk in reader:
+        yield (_to_ns(chunk[time_col], time_unit),
+               chunk[price_col].to_numpy(dtype=float),
+               chunk[size_col].to_numpy(dtype=float))
+
+
+def aggregate_trades(chunks, interval="1m", compact_every=16) -> pd.DataFrame:
+    """
+    Aggregiert Trade-Chunks zu OHLCV-Bars.
+
+    Args:
+        chunks: Iterable von (ts_ns, price, size)-Tuples, z.B. iter_trade_chunks(...)
+        interval: Bar-Intervall, z.B. "1m", "1h", "4h", "1d" (default: "1m")
+        compact_every: Nach so vielen Chunks werden die Teil-Bars zusammengefasst (default: 16)
+
+    Returns:
+        DataFrame mit Spalten Open, High, Low, Close, Volume und DatetimeIndex "Date"
+        (Beginn des Bars, UTC). Bars ohne Trades fehlen.
+    """
+    step_ns = parse_interval(interval).value
+    partials = []
+    for ts, price, size in chunks:
+        partials.append(_trades_to_partial(ts, price, size, step_ns))
+        if len(partials) >= compact_every:
+            partials = [_reduce(_concat(partials))]
+
+    if not partials:
+        bars = {f: np.empty(0) for f in _PARTIAL_FIELDS}
+        bars["bar"] = np.empty(0, dtype=np.int64)
+    else:
+        bars = _reduce(_concat(partials))
+
+    index = pd.DatetimeIndex(bars["bar"] * step_ns, name="Date")
+    return pd.DataFrame({
+        "Open": bars["open"],
+        "High": bars["high"],
+        "Low": bars["low"],
+        "Close": bars["close"],
+        "Volume": bars["volume"],
+    }, index=index)
+
+
+def ingest_trades(path, interval="1m", chunk_size=1_000_000, **csv_options) -> pd.DataFrame:
+    """
+    Baut OHLCV-Bars aus einer Trade-Datei (direkt nutzbar für add_features).
+
+    Args:
+        path: Pfad zur Trade-Datei (.csv oder .bin mit TRADE_DTYPE)
+        interval: Bar-Intervall (default: "1m")
+        chunk_size: Trades pro Chunk (default: 1_000_000)
+        **csv_options: time_col, price_col, size_col, time_unit für CSV-Dateien
+
+    Returns:
+        DataFrame mit Spalten Open, High, Low, Close, Volume
+    """
+    return aggregate_trades(iter_trade_chunks(path, chunk_size=chunk_size, **csv_options), interval)
+
+
+def write_trades_binary(path, ts_ns, price, size):
+    """Schreibt Trades im Binärformat (TRADE_DTYPE)."""
+    records = np.empty(len(ts_ns), dtype=TRADE_DTYPE)
+    records["ts"] = ts_ns
+    records["price"] = price
+    records["size"] = size
+    records.tofile(path)
+
+
+def benchmark(n_rows=5_000_000, chunk_size=1_000_000, interval="1m"):
+    """Misst den Durchsatz (Rows/s) für CSV- und Binär-Dateien mit synthetischen Trades."""
+    rng = np.random.default_rng(0)
+    ts = np.sort(rng.integers(0, 30 * 86_400_000, n_rows)) * 1_000_000   # 30 Tage, ms → ns
+    price = 2000 * np.exp(np.cumsum(rng.normal(0, 1e-4, n_rows)))
+    size = rng.exponential(0.5, n_rows)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bin_path = os.path.join(tmp, "trades.bin")
+        csv_path = os.path.join(tmp, "trades.csv")
+        write_trades_binary(bin_path, ts, price, size)
+        pd.DataFrame({"timestamp": ts // 1_000_000, "price": price, "amount": size}).to_csv(csv_path, index=False)
+
+        print(f"{n_rows:,} Trades, Chunks à {chunk_size:,}, Intervall {interval}")
+        for name, path in [("binär", bin_path), ("csv", csv_path)]:
+            t0 = time.perf_counter()
+            bars = ingest_trades(path, interval=interval, chunk_size=chunk_size)
+            elapsed = time.perf_counter() - t0
+            print(f"  {name:6s}: {elapsed:6.2f}s  {n_rows / elapsed:>12,.0f} Rows/s  ({len(bars):,} Bars)")
+
+
+if __name__ == "__main__":
+    benchmark()
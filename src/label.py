@@ -2,9 +2,18 @@
 Modul zur Label-Generierung für ML-Training.
 """
 
+import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from src.timeframe import get_timeframe
 
-def make_label(df: pd.DataFrame, fee_buffer=0.0025, forward_days=1) -> pd.DataFrame:
+def _horizon_bars(forward_days, timeframe):
+    # Ohne timeframe ist ein Bar ein Tag (bisheriges Verhalten)
+    if timeframe is None:
+        return forward_days
+    return get_timeframe(timeframe).window(forward_days)
+
+def make_label(df: pd.DataFrame, fee_buffer=0.0025, forward_days=1, timeframe=None) -> pd.DataFrame:
     """
     Erstellt binäre Labels basierend auf Forward-Returns.
 
@@ -17,6 +26,9 @@ def make_label(df: pd.DataFrame, fee_buffer=0.0025, forward_days=1) -> pd.DataFr
         forward_days: Anzahl Tage für Forward-Return (default: 1)
                       - 1 = Next-day return (noise)
                       - 5 = 5-day return (besseres Signal für ML)
+        timeframe: Bar-Intervall der Daten, z.B. "1h" oder Timeframe. Der Horizont
+                   wird dann in Bars umgerechnet (1 Tag = 24 Stunden-Bars).
+                   Default None = ein Bar pro Tag.
 
     Returns:
         DataFrame mit zusätzlichen Spalten:
@@ -24,8 +36,170 @@ def make_label(df: pd.DataFrame, fee_buffer=0.0025, forward_days=1) -> pd.DataFr
         - y: Binäres Label (1 = profitabel, 0 = nicht profitabel)
     """
     d = df.copy()
-    d["ret_fwd"] = d["Close"].shift(-forward_days)/d["Close"] - 1
+    horizon = _horizon_bars(forward_days, timeframe)
+    d["ret_fwd"] = d["Close"].shift(-horizon)/d["Close"] - 1
     # Adjust fee_buffer for multi-day: bei 5 Tagen erwarten wir min. 5x die fees
     adjusted_buffer = fee_buffer * forward_days
     d["y"] = (d["ret_fwd"] > adjusted_buffer).astype(int)
     return d.dropna()
+
+
+def label_arrays(close, fee_buffer=0.0025, forward_days=1, timeframe=None):
+    """
+    Array-Variante von make_label für lange Historien (ohne DataFrame-Kopie).
+
+    Args:
+        close: Close-Preise (z.B. Memory-mapped Array)
+        fee_buffer, forward_days, timeframe: wie bei make_label
+
+    Returns:
+        Tuple (ret_fwd, y): ret_fwd ist in den letzten Horizont-Zeilen NaN,
+        y ist ein int8-Array (dort 0)
+    """
+    close = np.asarray(close, dtype=float)
+    horizon = _horizon_bars(forward_days, timeframe)
+    ret_fwd = np.full(len(close), np.nan)
+    if len(close) > horizon:
+        ret_fwd[:-horizon] = close[horizon:] / close[:-horizon] - 1
+    y = (ret_fwd > fee_buffer * forward_days).astype(np.int8)
+    return ret_fwd, y
+
+
+def make_label_matrix(df: pd.DataFrame, horizons=(1, 5), fee_buffer=0.0025, timeframe=None) -> pd.DataFrame:
+    """
+    Forward-Returns und Labels für mehrere Horizonte in einem Durchlauf.
+
+    Im Gegensatz zu make_label wird df nicht kopiert; das Ergebnis enthält nur
+    die Label-Spalten (ret_fwd_<h>, y_<h>) und kann per apply_label mit einem
+    beliebigen zusammenhängenden Ausschnitt von df kombiniert werden.
+
+    Args:
+        df: DataFrame mit Close-Spalte
+        horizons: Horizonte in Tagen (default: (1, 5))
+        fee_buffer: wie bei make_label (wird pro Horizont-Tag skaliert)
+        timeframe: wie bei make_label
+
+    Returns:
+        DataFrame (gleicher Index wie df) mit ret_fwd_<h> (float, am Ende NaN)
+        und y_<h> (int8) pro Horizont
+    """
+    close = df["Close"].to_numpy(dtype=float)
+    n = len(close)
+    steps = np.array([_horizon_bars(h, timeframe) for h in horizons])
+
+    # Alle Horizonte auf einmal: Zeile t, Spalte j → Close[t + steps[j]]
+    target = np.arange(n)[:, None] + steps[None, :]
+    valid = target < n
+    ret = np.where(valid, close[np.minimum(target, n - 1)] / close[:, None] - 1, np.nan)
+    y = (ret > fee_buffer * np.asarray(horizons, dtype=float)[None, :]).astype(np.int8)
+
+    columns = {}
+    for j, h in enumerate(horizons):
+        columns[f"ret_fwd_{h}"] = ret[:, j]
+        columns[f"y_{h}"] = y[:, j]
+    return pd.DataFrame(columns, index=df.index)
+
+
+def apply_label(df: pd.DataFrame, labels: pd.DataFrame, forward_days=1, timeframe=None) -> pd.DataFrame:
+    """
+    Hängt ret_fwd/y eines Horizonts aus make_label_matrix an df an.
+
+    Liefert dasselbe wie make_label(df, fee_buffer, forward_days), auch wenn df
+    nur ein zusammenhängender Ausschnitt ist: die letzten Zeilen, deren
+    Horizont über das Ende von df hinausreicht, werden verworfen (kein Blick
+    über eine Train/Test-Grenze).
+
+    Args:
+        df: DataFrame (Ausschnitt des Frames, für den labels berechnet wurde)
+        labels: Ergebnis von make_label_matrix
+        forward_days: Horizont (muss in labels enthalten sein)
+        timeframe: wie bei make_label_matrix
+
+    Returns:
+        DataFrame mit zusätzlichen Spalten ret_fwd und y
+    """
+    horizon = _horizon_bars(forward_days, timeframe)
+    ret = labels[f"ret_fwd_{forward_days}"].reindex(df.index).to_numpy(copy=True)
+    ret[max(len(ret) - horizon, 0):] = np.nan
+    d = df.copy()
+    d["ret_fwd"] = ret
+    d["y"] = labels[f"y_{forward_days}"].reindex(df.index).astype(int)
+    return d.dropna()
+
+
+def triple_barrier_labels(df: pd.DataFrame, take_profit=0.02, stop_loss=0.02, max_holding=5,
+                          timeframe=None, chunk_size=None, max_cells=2**22) -> pd.DataFrame:
+    """
+    Triple-Barrier-Labels (Take-Profit / Stop-Loss / Timeout) mit High/Low.
+
+    Einstieg zum Close von Bar t. Innerhalb der nächsten max_holding Tage wird
+    geprüft, ob High die obere (Close * (1 + take_profit)) oder Low die untere
+    Barriere (Close * (1 - stop_loss)) zuerst berührt. Werden beide im selben
+    Bar berührt, zählt konservativ der Stop-Loss. Ohne Berührung gilt der
+    Return zum Close nach max_holding (Timeout). Vektorisiert über
+    sliding_window_view, blockweise über chunk_size Zeilen; ein Block belegt
+    chunk_size × Horizont Zellen pro Zwischen-Array.
+
+    Args:
+        df: DataFrame mit High, Low, Close
+        take_profit: Abstand der oberen Barriere (default: 0.02 = 2%)
+        stop_loss: Abstand der unteren Barriere (default: 0.02 = 2%)
+        max_holding: Maximale Haltedauer in Tagen (default: 5)
+        timeframe: wie bei make_label
+        chunk_size: Zeilen pro Block (default: None = aus max_cells und Horizont)
+        max_cells: Speicher-Budget pro Block in Zellen (Zeilen × Horizont), daraus
+            chunk_size = max(1, max_cells // Horizont) (default: 2**22, ca. 4 MB pro bool-Array)
+
+    Returns:
+        DataFrame (gleicher Index wie df) mit
+        - tb_label: 1 = Take-Profit, -1 = Stop-Loss, 0 = Timeout,
+          NaN wenn am Ende der Daten noch nicht entschieden
+        - tb_ret: Return bei Barriere bzw. Timeout
+        - tb_bars: Anzahl Bars bis zur Entscheidung
+    """
+    horizon = _horizon_bars(max_holding, timeframe)
+    high = df["High"].to_numpy(dtype=float)
+    low = df["Low"].to_numpy(dtype=float)
+    close = df["Close"].to_numpy(dtype=float)
+    n = len(close)
+    if chunk_size is None:
+        chunk_size = max(1, max_cells // horizon)
+
+    # Zukünftige Bars t+1 .. t+horizon; am Ende mit NaN aufgefüllt (berührt nie)
+    pad = np.full(horizon, np.nan)
+    high_win = sliding_window_view(np.concatenate([high[1:], pad, [np.nan]]), horizon)[:n]
+    low_win = sliding_window_view(np.concatenate([low[1:], pad, [np.nan]]), horizon)[:n]
+
+    label = np.full(n, np.nan)
+    ret = np.full(n, np.nan)
+    bars = np.full(n, np.nan)
+    for start in range(0, n, chunk_size):
+        rows = slice(start, min(start + chunk_size, n))
+        c = close[rows, None]
+        hit_up = high_win[rows] >= c * (1 + take_profit)
+        hit_dn = low_win[rows] <= c * (1 - stop_loss)
+
+        # Erster Bar mit Berührung (horizon = keine)
+        first_up = np.where(hit_up.any(axis=1), hit_up.argmax(axis=1), horizon)
+        first_dn = np.where(hit_dn.any(axis=1), hit_dn.argmax(axis=1), horizon)
+
+        lab = np.where(first_dn <= first_up, -1.0, 1.0)
+        r = np.where(first_dn <= first_up, -stop_loss, take_profit)
+        b = np.minimum(first_up, first_dn) + 1.0
+
+        # Timeout: keine Berührung innerhalb des Horizonts
+        idx = np.arange(rows.start, rows.stop)
+        timeout = (first_up == horizon) & (first_dn == horizon)
+        complete = idx + horizon < n
+        exit_close = close[np.minimum(idx + horizon, n - 1)]
+        lab = np.where(timeout, 0.0, lab)
+        r = np.where(timeout, exit_close / close[rows] - 1, r)
+        b = np.where(timeout, float(horizon), b)
+
+        # Am Ende der Daten ohne Berührung: noch offen
+        undecided = timeout & ~complete
+        label[rows] = np.where(undecided, np.nan, lab)
+        ret[rows] = np.where(undecided, np.nan, r)
+        bars[rows] = np.where(undecided, np.nan, b)
+
+    return pd.DataFrame({"tb_label": label, "tb_ret": ret, "tb_bars": bars}, index=df.index)
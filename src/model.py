@@ -1,68 +1,81 @@
 import joblib
 import numpy as np
+import pandas as pd
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
 from src.config import FEATURES
 
-def train_logreg(train_df):
+def train_logreg(train_df, C=1.0, max_iter=300, features=FEATURES):
     """
     Trainiert ein Logistic Regression Modell mit StandardScaler.
 
     Args:
-        train_df: DataFrame mit Features (aus FEATURES) und Label 'y'
+        train_df: DataFrame mit Features und Label 'y'
+        C: Inverse Regularisierungsstärke (default: 1.0)
+        max_iter: Maximale Iterationen des Solvers (default: 300)
+        features: Feature-Spalten (default: FEATURES)
 
     Returns:
         Sklearn Pipeline mit Scaler und Classifier
     """
-    X = train_df[FEATURES].values
+    X = train_df[features].values
     y = train_df["y"].values
     pipe = Pipeline([("scaler", StandardScaler()),
-                     ("clf", LogisticRegression(max_iter=300))])
+                     ("clf", LogisticRegression(C=C, max_iter=max_iter))])
     pipe.fit(X, y)
     return pipe
 
-def train_random_forest(train_df, n_estimators=100, max_depth=10):
+def train_random_forest(train_df, n_estimators=100, max_depth=10, min_samples_leaf=1, n_jobs=-1,
+                        features=FEATURES):
     """
     Trainiert ein Random Forest Modell mit StandardScaler.
 
     Args:
-        train_df: DataFrame mit Features (aus FEATURES) und Label 'y'
+        train_df: DataFrame mit Features und Label 'y'
         n_estimators: Anzahl der Bäume (default: 100)
         max_depth: Maximale Tiefe der Bäume (default: 10)
+        min_samples_leaf: Minimale Anzahl Samples pro Blatt (default: 1)
+        n_jobs: Threads für Training/Prognose (default: -1 = alle CPU-Cores;
+                in parallelen Folds 1, um Überbelegung zu vermeiden)
+        features: Feature-Spalten (default: FEATURES)
 
     Returns:
         Sklearn Pipeline mit Scaler und Random Forest Classifier
     """
-    X = train_df[FEATURES].values
+    X = train_df[features].values
     y = train_df["y"].values
     pipe = Pipeline([
         ("scaler", StandardScaler()),
         ("clf", RandomForestClassifier(
             n_estimators=n_estimators,
             max_depth=max_depth,
+            min_samples_leaf=min_samples_leaf,
             random_state=42,
-            n_jobs=-1  # Nutze alle CPU-Cores
+            n_jobs=n_jobs
         ))
     ])
     pipe.fit(X, y)
     return pipe
 
-def train_gradient_boosting(train_df, n_estimators=100, max_depth=5, learning_rate=0.1):
+def train_gradient_boosting(train_df, n_estimators=100, max_depth=5, learning_rate=0.1, subsample=1.0,
+                            features=FEATURES):
     """
     Trainiert ein Gradient Boosting Modell (ähnlich zu XGBoost).
 
     Args:
-        train_df: DataFrame mit Features (aus FEATURES) und Label 'y'
+        train_df: DataFrame mit Features und Label 'y'
         n_estimators: Anzahl der Boosting-Stufen (default: 100)
         max_depth: Maximale Tiefe der Bäume (default: 5)
         learning_rate: Lernrate (default: 0.1)
+        subsample: Anteil der Samples pro Boosting-Stufe (default: 1.0)
+        features: Feature-Spalten (default: FEATURES)
 
     Returns:
         Sklearn Pipeline mit Scaler und Gradient Boosting Classifier
     """
-    X = train_df[FEATURES].values
+    X = train_df[features].values
     y = train_df["y"].values
     pipe = Pipeline([
         ("scaler", StandardScaler()),
@@ -70,24 +83,80 @@ def train_gradient_boosting(train_df, n_estimators=100, max_depth=5, learning_ra
             n_estimators=n_estimators,
             max_depth=max_depth,
             learning_rate=learning_rate,
+            subsample=subsample,
             random_state=42
         ))
     ])
     pipe.fit(X, y)
     return pipe
 
-def infer_proba(model, df):
+def infer_proba(model, df, features=FEATURES):
     """
     Berechnet Wahrscheinlichkeiten für die positive Klasse (y=1).
 
     Args:
         model: Trainiertes Sklearn-Modell
-        df: DataFrame mit Features (aus FEATURES)
+        df: DataFrame mit Features
+        features: Feature-Spalten wie beim Training (default: FEATURES)
 
     Returns:
         DataFrame mit zusätzlicher Spalte 'p_up' (Wahrscheinlichkeit für Aufwärtsbewegung)
     """
-    proba = model.predict_proba(df[FEATURES].values)[:,1]
+    proba = model.predict_proba(df[features].values)[:,1]
     out = df.copy()
     out["p_up"] = proba
     return out
+
+def _scaler_key(model):
+    """
+    Schlüssel für gemeinsame Scaler: gleiche Parameter -> gleicher Schlüssel.
+
+    Andere Vorverarbeitungen werden über die Identität ihrer Schritte
+    geteilt; die Schritt-Objekte gehören zum Modell und leben während
+    infer_proba_multi weiter (anders als ein temporärer Slice model[:-1]).
+    """
+    if not isinstance(model, Pipeline) or len(model.steps) == 1:
+        return None
+    steps = [step for _, step in model.steps[:-1]]
+    if len(steps) == 1 and isinstance(steps[0], StandardScaler):
+        scaler = steps[0]
+        return ("std", np.asarray(scaler.mean_).tobytes(), np.asarray(scaler.scale_).tobytes())
+    return ("id",) + tuple(id(step) for step in steps)
+
+def infer_proba_multi(models, df, features=FEATURES, ensemble=False):
+    """
+    Berechnet p_up für mehrere Modelle auf derselben Feature-Matrix.
+
+    Die Feature-Matrix wird nur einmal aus df gebaut. Modelle, deren Scaler
+    dieselben Parameter haben (z.B. alle auf demselben Trainings-Fenster
+    trainiert), teilen sich einen Scaler-Durchlauf; danach wird nur noch der
+    Classifier aufgerufen. df wird nicht kopiert.
+
+    Args:
+        models: Dict Name -> trainiertes Sklearn-Modell (oder Liste, dann Namen 0..n-1)
+        df: DataFrame mit Features
+        features: Feature-Spalten (default: FEATURES)
+        ensemble: Wenn True, zusätzliche Spalte 'ensemble' mit dem Mittel aller Modelle
+
+    Returns:
+        DataFrame (Bars × Modelle) mit p_up pro Modell, Index wie df
+    """
+    if not isinstance(models, dict):
+        models = dict(enumerate(models))
+    X = df[features].to_numpy(dtype=float)
+
+    proba = np.empty((len(X), len(models)))
+    transformed = {}
+    for j, model in enumerate(models.values()):
+        key = _scaler_key(model)
+        if key is None:
+            proba[:, j] = model.predict_proba(X)[:, 1]
+            continue
+        if key not in transformed:
+            transformed[key] = model[:-1].transform(X)
+        proba[:, j] = model[-1].predict_proba(transformed[key])[:, 1]
+
+    out = pd.DataFrame(proba, index=df.index, columns=list(models))
+    if ensemble:
+        out["ensemble"] = proba.mean(axis=1)
+    return out
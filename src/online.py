@@ -0,0 +1,353 @@
+"""
+Inkrementelle Feature-Berechnung für Live-Prognosen.
+
+Der OnlineFeatureEngine hält den Zustand aller Indikatoren aus add_features
+(EMA50/EMA200, RSI14, MACD, ATR14, Bollinger(20,2), OBV/MFI, Volumen-SMA)
+und aktualisiert ihn pro neuem Bar in konstanter Zeit. Nach der Warm-up-Phase
+stimmen die Werte (bis auf Rundung) mit add_features(..., timeframe=timeframe)
+überein; die Fenster sind wie dort in Tagen definiert und werden in Bars
+umgerechnet.
+"""
+
+import copy
+import math
+from collections import deque
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from src import indicators
+from src.timeframe import get_timeframe
+
+
+class _Ewm:
+    """EWM mit adjust=False und min_periods wie pandas/ta (NaN-Lücken übersprungen)."""
+
+    def __init__(self, alpha, min_periods):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = None
+        self.count = 0
+        self._gap = 0
+
+    def update(self, x):
+        if x is None or math.isnan(x):
+            if self.value is not None:
+                self._gap += 1
+            return self.get()
+        if self.value is None:
+            self.value = x
+        elif self._gap == 0:
+            self.value = (1 - self.alpha) * self.value + self.alpha * x
+        else:
+            # Nach einer Lücke zählt der alte Stand mit decay^(gap+1) wie bei pandas
+            weight = (1 - self.alpha) ** (self._gap + 1)
+            self.value = (weight * self.value + self.alpha * x) / (weight + self.alpha)
+            self._gap = 0
+        self.count += 1
+        return self.get()
+
+    def warm_up(self, x):
+        """Verarbeitet ein ganzes Array vektorisiert; gibt die Werte wie update() zurück."""
+        x = np.asarray(x, dtype=float)
+        valid = ~np.isnan(x)
+        values = indicators._ewm_adjust_false(x, self.alpha, 1)
+        if valid.any():
+            self.value = float(values[-1])
+            self.count = int(valid.sum())
+            self._gap = len(x) - 1 - int(np.flatnonzero(valid)[-1])
+        values[np.cumsum(valid) < self.min_periods] = np.nan
+        return values
+
+    def get(self):
+        if self.count < self.min_periods:
+            return np.nan
+        return self.value
+
+
+class _Rolling:
+    """Rollendes Fenster fester Länge (Ringpuffer)."""
+
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+
+    def update(self, x):
+        self.values.append(x)
+
+    @property
+    def full(self):
+        return len(self.values) == self.window
+
+    def sum(self):
+        return math.fsum(self.values)
+
+    def mean(self):
+        if not self.full:
+            return np.nan
+        return self.sum() / self.window
+
+    def std(self):
+        if not self.full:
+            return np.nan
+        return float(np.std(np.fromiter(self.values, dtype=float, count=self.window)))
+
+
+class OnlineFeatureEngine:
+    """
+    Inkrementelle Variante von add_features mit O(1)-Update pro Bar.
+
+    Verwendung:
+        engine = OnlineFeatureEngine.from_frame(df)   # Warm-up über Historie
+        row = engine.update(bar)                      # neuer, abgeschlossener Bar
+        row = engine.preview(bar)                     # unvollständiger Bar, ohne Zustand zu ändern
+
+    Jeder Aufruf liefert ein Dict mit den OHLCV-Werten und allen Feature-Spalten.
+    Solange ein Feature noch in der Warm-up-Phase ist, ist es NaN (entspricht den
+    Zeilen, die add_features per dropna entfernt).
+    """
+
+    def __init__(self, include_volume=True, timeframe=None):
+        self.include_volume = include_volume
+        self.timeframe = get_timeframe(timeframe)
+        self.n_bars = 0
+        self.last_timestamp = None
+        w = self.timeframe.window
+
+        self._ema50 = _Ewm(2 / (w(50) + 1), w(50))
+        self._ema200 = _Ewm(2 / (w(200) + 1), w(200))
+        self._rsi_up = _Ewm(1 / w(14), w(14))
+        self._rsi_down = _Ewm(1 / w(14), w(14))
+        self._macd_fast = _Ewm(2 / (w(12) + 1), w(12))
+        self._macd_slow = _Ewm(2 / (w(26) + 1), w(26))
+        self._macd_signal = _Ewm(2 / (w(9) + 1), w(9))
+        self._atr_window = w(14)
+        self._tr_window = []
+        self._atr = 0.0
+        self._bb = _Rolling(w(20))
+        self._prev_close = None
+        # Closes der letzten w(1) Bars für die Tagesrendite ret1
+        self._ret_closes = deque(maxlen=w(1))
+
+        self._obv = 0.0
+        self._obv_num = 0.0
+        self._obv_den = 0.0
+        self._obv_decay = 1 - 2 / (w(20) + 1)
+        self._mf_pos = _Rolling(w(14))
+        self._mf_neg = _Rolling(w(14))
+        self._prev_typical = None
+        self._vol = _Rolling(w(20))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, include_volume=True, timeframe=None):
+        """
+        Erstellt einen Engine mit dem Zustand nach dem letzten Bar von df.
+
+        Der Zustand wird mit den vektorisierten Kernels aus src.indicators über
+        die ganze Historie berechnet (kein Loop pro Bar); danach verhält sich
+        der Engine wie nach update() für jeden Bar von df.
+
+        Args:
+            df: DataFrame mit OHLCV-Daten (DatetimeIndex)
+            include_volume: Wenn True, werden Volumen-Indikatoren berechnet (default: True)
+            timeframe: Bar-Intervall der Daten, z.B. "1h" (default: None = Tages-Bars)
+
+        Returns:
+            OnlineFeatureEngine mit Zustand nach dem letzten Bar von df
+        """
+        engine = cls(include_volume=include_volume, timeframe=timeframe)
+        if len(df):
+            engine._warm_up(df)
+        return engine
+
+    def extend(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Verarbeitet alle Bars aus df, die neuer als der letzte verarbeitete Bar sind.
+
+        Returns:
+            DataFrame mit den Feature-Zeilen der neuen Bars (inkl. Warm-up-NaNs)
+        """
+        if self.last_timestamp is not None:
+            df = df.loc[df.index > self.last_timestamp]
+        rows = [self.update(bar, timestamp=ts) for ts, bar in df.iterrows()]
+        return pd.DataFrame(rows, index=df.index)
+
+    def update(self, bar, timestamp=None) -> dict:
+        """
+        Verarbeitet einen abgeschlossenen Bar und aktualisiert den Zustand.
+
+        Args:
+            bar: Mapping/Series mit Open, High, Low, Close (und Volume)
+            timestamp: Optionaler Zeitstempel des Bars
+
+        Returns:
+            Dict mit OHLCV-Werten und Features für diesen Bar
+        """
+        row = self._step(bar)
+        if timestamp is not None:
+            self.last_timestamp = timestamp
+        return row
+
+    def preview(self, bar) -> dict:
+        """Berechnet Features für einen (z.B. unvollständigen) Bar, ohne den Zustand zu ändern."""
+        return copy.deepcopy(self)._step(bar)
+
+    def save(self, path):
+        """Speichert den Zustand (joblib)."""
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path):
+        """Lädt einen mit save() gespeicherten Zustand."""
+        return joblib.load(path)
+
+    def _step(self, bar) -> dict:
+        o = float(bar["Open"])
+        h = float(bar["High"])
+        lo = float(bar["Low"])
+        c = float(bar["Close"])
+        prev_close = self._prev_close
+        self.n_bars += 1
+
+        row = {"Open": o, "High": h, "Low": lo, "Close": c}
+        if "Volume" in bar:
+            row["Volume"] = float(bar["Volume"])
+
+        # Trend-Indikatoren
+        row["ema50"] = self._ema50.update(c)
+        row["ema200"] = self._ema200.update(c)
+
+        # Momentum-Indikatoren (RSI nach Wilder, erster Diff zählt als 0)
+        diff = 0.0 if prev_close is None else c - prev_close
+        up = self._rsi_up.update(diff if diff > 0 else 0.0)
+        down = self._rsi_down.update(-diff if diff < 0 else 0.0)
+        if math.isnan(down):
+            row["rsi14"] = np.nan
+        elif down == 0:
+            row["rsi14"] = 100.0
+        else:
+            row["rsi14"] = 100 - 100 / (1 + up / down)
+
+        fast = self._macd_fast.update(c)
+        slow = self._macd_slow.update(c)
+        macd = fast - slow
+        signal = self._macd_signal.update(macd)
+        row["macd_diff"] = macd - signal
+
+        # Volatilitäts-Indikatoren (ATR wie ta: Mittelwert als Startwert, danach Wilder)
+        if prev_close is None:
+            tr = h - lo
+        else:
+            tr = max(h - lo, abs(h - prev_close), abs(lo - prev_close))
+        n = self._atr_window
+        if self.n_bars < n:
+            self._tr_window.append(tr)
+            self._atr = 0.0
+        elif self.n_bars == n:
+            self._tr_window.append(tr)
+            self._atr = sum(self._tr_window) / n
+            self._tr_window = []
+        else:
+            self._atr = (self._atr * (n - 1) + tr) / n
+        row["atr"] = self._atr
+        row["atr_pct"] = self._atr / c * 100
+
+        self._bb.update(c)
+        mavg = self._bb.mean()
+        mstd = self._bb.std()
+        row["bb_width"] = ((mavg + 2 * mstd) - (mavg - 2 * mstd)) / c
+
+        # Regime
+        row["regime_bull"] = int(c > row["ema200"]) if not math.isnan(row["ema200"]) else np.nan
+
+        # Returns (über einen Tag)
+        closes = self._ret_closes
+        row["ret1"] = math.log(c) - math.log(closes[0]) if len(closes) == closes.maxlen else np.nan
+        closes.append(c)
+
+        if self.include_volume and "Volume" in bar:
+            v = row["Volume"]
+
+            self._obv += -v if (prev_close is not None and c < prev_close) else v
+            row["obv"] = self._obv
+            # ewm(span=20) mit adjust=True: gewichtete Summe / Summe der Gewichte
+            decay = self._obv_decay
+            self._obv_num = self._obv_num * decay + self._obv
+            self._obv_den = self._obv_den * decay + 1.0
+            row["obv_ema"] = self._obv_num / self._obv_den
+
+            typical = (h + lo + c) / 3.0
+            mf = 0.0
+            if self._prev_typical is not None:
+                if typical > self._prev_typical:
+                    mf = typical * v
+                elif typical < self._prev_typical:
+                    mf = -typical * v
+            self._prev_typical = typical
+            self._mf_pos.update(mf if mf >= 0 else 0.0)
+            self._mf_neg.update(-mf if mf < 0 else 0.0)
+            if self._mf_pos.full:
+                pos = self._mf_pos.sum()
+                neg = self._mf_neg.sum()
+                if neg == 0:
+                    row["mfi"] = 100.0 if pos > 0 else np.nan
+                else:
+                    row["mfi"] = 100 - 100 / (1 + pos / neg)
+            else:
+                row["mfi"] = np.nan
+
+            self._vol.update(v)
+            row["vol_sma20"] = self._vol.mean()
+            row["vol_ratio"] = v / row["vol_sma20"]
+
+        self._prev_close = c
+        return row
+
+    def _warm_up(self, df: pd.DataFrame):
+        """Setzt den Zustand eines frischen Engines vektorisiert aus allen Bars von df."""
+        h = df["High"].to_numpy(dtype=float)
+        lo = df["Low"].to_numpy(dtype=float)
+        c = df["Close"].to_numpy(dtype=float)
+        self.n_bars = len(c)
+        self.last_timestamp = df.index[-1]
+        self._prev_close = float(c[-1])
+
+        self._ema50.warm_up(c)
+        self._ema200.warm_up(c)
+        d = indicators.diff(c)
+        d[0] = 0.0
+        self._rsi_up.warm_up(np.where(d > 0, d, 0.0))
+        self._rsi_down.warm_up(np.where(d < 0, -d, 0.0))
+        macd = self._macd_fast.warm_up(c) - self._macd_slow.warm_up(c)
+        self._macd_signal.warm_up(macd)
+
+        tr = indicators.true_range(h, lo, c)
+        if self.n_bars < self._atr_window:
+            self._tr_window = tr.tolist()
+        else:
+            self._atr = float(indicators.atr(tr, self._atr_window)[-1])
+        self._bb.values.extend(c[-self._bb.window:].tolist())
+        self._ret_closes.extend(c[-self._ret_closes.maxlen:].tolist())
+
+        if self.include_volume and "Volume" in df.columns:
+            v = df["Volume"].to_numpy(dtype=float)
+            obv = indicators.obv(c, v)
+            decay = self._obv_decay
+            self._obv = float(obv[-1])
+            self._obv_num = float(indicators._linear_recursion(obv, decay, 1.0, 0.0)[-1])
+            self._obv_den = float(indicators._linear_recursion(np.ones(len(obv)), decay, 1.0, 0.0)[-1])
+
+            typical = (h + lo + c) / 3.0
+            direction = np.zeros(len(typical))
+            direction[1:] = np.sign(typical[1:] - typical[:-1])
+            mf = typical * v * direction
+            self._prev_typical = float(typical[-1])
+            self._mf_pos.values.extend(np.where(mf >= 0, mf, 0.0)[-self._mf_pos.window:].tolist())
+            self._mf_neg.values.extend(np.where(mf < 0, -mf, 0.0)[-self._mf_neg.window:].tolist())
+            self._vol.values.extend(v[-self._vol.window:].tolist())
+
+    @property
+    def is_warm(self):
+        """True sobald alle Features definiert sind (EMA200 braucht am längsten)."""
+        return self.n_bars >= self._ema200.min_periods
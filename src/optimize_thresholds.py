@@ -3,10 +3,11 @@ Optimiert Entry- und Exit-Thresholds auf Validation-Set.
 """
 
 from src.data import download_eth_1d
-from src.features import add_features
-from src.label import make_label
-from src.model import train_logreg, infer_proba
-from src.eval import sweep_threshold
+from src.cache import get_cache
+from src.model import infer_proba
+from src.registry import get_registry
+from src.eval import sweep_grid, sweep_threshold_exhaustive
+from src.config import FEATURES_BASE, POLICY_COLUMNS
 import numpy as np
 
 
@@ -18,8 +19,7 @@ def main():
     # 1) Daten
     print("\n[1/4] Lade Daten...")
     df = download_eth_1d(start="2019-01-01")
-    feat = add_features(df, include_volume=False)  # Basis-Features
-    lab = make_label(feat, fee_buffer=0.0025)
+    lab = get_cache().labeled(df, fee_buffer=0.0025, columns=FEATURES_BASE + POLICY_COLUMNS)
 
     # 2) Split: Train / Validation / Test
     print("[2/4] Erstelle Train/Validation/Test-Split...")
@@ -38,7 +38,7 @@ def main():
 
     # 3) Modell auf TRAIN trainieren
     print("\n[3/4] Trainiere Modell auf Train-Set...")
-    model = train_logreg(train)
+    model = get_registry().get_or_train("logreg", train)
     print("  -> Fertig")
 
     # 4) Threshold-Sweep auf VALIDATION
@@ -51,21 +51,25 @@ def main():
     # Grid für Exit-Thresholds
     exit_grid = [0.2, 0.3, 0.4]
 
-    best_sharpe = -999
-    best_config = None
-    all_results = []
-
-    for p_exit in exit_grid:
-        print(f"\n  Testing p_exit_thr = {p_exit}...")
-        res = sweep_threshold(val_pred, entry_thresholds=entry_grid, p_exit_thr=p_exit)
-
-        # Bestes für diesen Exit-Threshold
-        best_row = res.iloc[0]
-        all_results.append(best_row)
-
-        if best_row["sharpe"] > best_sharpe:
-            best_sharpe = best_row["sharpe"]
-            best_config = best_row
+    # Alle Kombinationen in einem Batch backtesten
+    print(f"\n  Teste {len(entry_grid) * len(exit_grid)} Kombinationen...")
+    res = sweep_grid(val_pred, entry_grid, exit_grid)
+
+    # Bestes pro Exit-Threshold (res ist nach Sharpe sortiert)
+    all_results = [
+        res[res["p_exit_thr"] == p_exit].iloc[0] for p_exit in exit_grid
+    ]
+    best_config = res.iloc[0]
+
+    # Alle distinkten p_up-Werte als Entry-Threshold für den besten Exit-Threshold
+    frontier = sweep_threshold_exhaustive(val_pred, p_exit_thr=best_config["p_exit_thr"])
+    print(f"  Alle {len(frontier)} distinkten Entry-Thresholds getestet")
+    if frontier.empty:
+        print("  Kein Bar passiert die Filter – keine distinkten Thresholds")
+    else:
+        best_level = frontier.loc[frontier["sharpe"].idxmax()]
+        print(f"  Bester distinkter Threshold: {best_level['p_entry_thr']:.4f} "
+              f"(Sharpe {best_level['sharpe']:.3f})")
 
     # Ergebnisse
     print("\n" + "=" * 70)
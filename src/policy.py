@@ -2,19 +2,34 @@
 Modul für Trading-Policy (Entry/Exit-Regeln).
 """
 
+import numpy as np
 import pandas as pd
 
+from src.rules import compile_rules
+
+
+def _allowed(df: pd.DataFrame, rules=None) -> np.ndarray:
+    """Entry-Freigabe pro Bar: ATR-Band 0.8–6.0% bzw. keine skip-Regel greift."""
+    if rules is None:
+        return df["atr_pct"].between(0.8, 6.0).to_numpy()
+    allow = np.asarray(compile_rules(rules, df).allow, dtype=bool)
+    if len(allow) != len(df):
+        raise ValueError(f"Regeln für {len(allow)} Bars kompiliert, DataFrame hat {len(df)}")
+    return allow
+
 def ml_policy(
     df: pd.DataFrame,
     p_entry_thr=0.6,
-    p_exit_thr=0.4
+    p_exit_thr=0.4,
+    rules=None
 ):
     """
     Generiert Entry/Exit-Signale basierend auf ML-Prognosen und technischen Filtern.
 
     Entry-Bedingungen (alle müssen erfüllt sein):
     - ML-Wahrscheinlichkeit für "up" > p_entry_thr
-    - ATR zwischen 0.8% und 6.0% (Volatilitätsfilter)
+    - ATR zwischen 0.8% und 6.0% (Volatilitätsfilter) bzw. mit rules:
+      keine skip-Regel aus der Regel-Datei greift
     - Preis über EMA50 (Trendfilter)
 
     Exit-Bedingungen (mindestens eine):
@@ -25,6 +40,9 @@ def ml_policy(
         df: DataFrame mit Features und ML-Prognose 'p_up'
         p_entry_thr: Threshold für Entry-Signal (default: 0.6)
         p_exit_thr: Threshold für Exit-Signal (default: 0.4)
+        rules: Optional RuleSet (z.B. rules.load_rules()) oder CompiledRules;
+               ersetzt den fest eingebauten ATR-Filter. Positionsgrösse und
+               Cooldown gibt man dem Backtester mit (CompiledRules.backtest_kwargs())
 
     Returns:
         DataFrame mit Boolean-Spalten:
@@ -33,7 +51,7 @@ def ml_policy(
     """
     entry = (
         (df["p_up"] > p_entry_thr)
-        & (df["atr_pct"].between(0.8, 6.0))
+        & pd.Series(_allowed(df, rules), index=df.index)
         & (df["Close"] > df["ema50"])
     )
     exit_ = (
@@ -43,6 +61,72 @@ def ml_policy(
     return pd.DataFrame({"entry_long": entry, "exit_long": exit_}, index=df.index)
 
 
+def ml_policy_grid(df: pd.DataFrame, entry_thresholds, exit_thresholds, rules=None):
+    """
+    Grid-Variante von ml_policy für viele (p_entry_thr, p_exit_thr)-Paare.
+
+    p_up wird gegen alle Thresholds gebroadcastet; die ATR/EMA50-Filter und
+    die RSI-Bedingung werden nur einmal berechnet. Die Entry-Maske hängt nur
+    vom Entry-Threshold ab, die Exit-Maske nur vom Exit-Threshold – die
+    zurückgegebenen Tensoren sind deshalb Broadcast-Views ohne Kopie.
+
+    Args:
+        df: DataFrame mit Features und ML-Prognose 'p_up'
+        entry_thresholds: Liste/Array von Entry-Thresholds (Länge E)
+        exit_thresholds: Liste/Array von Exit-Thresholds (Länge X)
+        rules: Optional RuleSet oder CompiledRules wie bei ml_policy (ersetzt den
+               ATR-Filter; Grösse und Cooldown gehören in run_batch)
+
+    Returns:
+        Tuple (entry_long, exit_long) mit Boolean-Arrays der Form (n_bars, E, X)
+        - entry_long[:, i, j] entspricht
+          ml_policy(df, entry_thresholds[i], exit_thresholds[j], rules)["entry_long"]
+        - exit_long[:, i, j] entsprechend für "exit_long"
+    """
+    entry_thr = np.asarray(entry_thresholds, dtype=float).ravel()
+    exit_thr = np.asarray(exit_thresholds, dtype=float).ravel()
+    p_up = df["p_up"].to_numpy(dtype=float)[:, None]
+
+    # Filter-Masken einmal berechnen und für alle Thresholds wiederverwenden
+    filters = _allowed(df, rules) & (df["Close"] > df["ema50"]).to_numpy()
+    overbought = (df["rsi14"] > 55).to_numpy()
+
+    entry = (p_up > entry_thr[None, :]) & filters[:, None]
+    exit_ = (p_up < exit_thr[None, :]) | overbought[:, None]
+
+    shape = (len(df), len(entry_thr), len(exit_thr))
+    return (
+        np.broadcast_to(entry[:, :, None], shape),
+        np.broadcast_to(exit_[:, None, :], shape),
+    )
+
+
+def ml_policy_matrix(df: pd.DataFrame, p_up, p_entry_thr=0.6, p_exit_thr=0.4, rules=None):
+    """
+    ml_policy für viele Prognose-Spalten auf denselben Bars.
+
+    Die ATR/EMA50-Filter (bzw. die Regeln) und die RSI-Bedingung werden nur
+    einmal berechnet und gegen alle Spalten von p_up gebroadcastet.
+
+    Args:
+        df: DataFrame mit atr_pct (bzw. den Spalten der Regeln), Close, ema50, rsi14
+        p_up: Matrix (n_bars × n_modelle) mit Wahrscheinlichkeiten
+        p_entry_thr: Threshold für Entry-Signal (default: 0.6)
+        p_exit_thr: Threshold für Exit-Signal (default: 0.4)
+        rules: Optional RuleSet oder CompiledRules wie bei ml_policy
+
+    Returns:
+        Tuple (entry_long, exit_long) mit Boolean-Arrays der Form von p_up;
+        Spalte j entspricht ml_policy mit p_up[:, j]
+    """
+    p_up = np.asarray(p_up, dtype=float)
+    filters = _allowed(df, rules) & (df["Close"] > df["ema50"]).to_numpy()
+    overbought = (df["rsi14"] > 55).to_numpy()
+    entry = (p_up > p_entry_thr) & filters[:, None]
+    exit_ = (p_up < p_exit_thr) | overbought[:, None]
+    return entry, exit_
+
+
 def ml_policy_longshort(
     df: pd.DataFrame,
     p_long_thr=0.55,
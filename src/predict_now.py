@@ -5,15 +5,59 @@ Verwendung:
     python -m src.predict_now
 """
 
-from src.data import download_eth_1d
-from src.features import add_features
-from src.label import make_label
-from src.model import train_logreg, infer_proba
+from src.data import download_ohlcv
+from src.cache import get_cache
+from src.compiled import compile_model
+from src.registry import get_registry
 from src.policy import ml_policy
-from src.config import P_ENTRY_THR, P_EXIT_THR
+from src.online import OnlineFeatureEngine
+from src.config import P_ENTRY_THR, P_EXIT_THR, FEATURES, POLICY_COLUMNS, TIMEFRAME
+from src.timeframe import get_timeframe
+from pathlib import Path
 import pandas as pd
 from datetime import datetime
 
+# Zustand der inkrementellen Feature-Berechnung (nur abgeschlossene Bars)
+ONLINE_STATE_PATH = Path("data/online_features.joblib")
+
+
+def latest_features(df: pd.DataFrame, state_path=ONLINE_STATE_PATH, timeframe=None) -> pd.DataFrame:
+    """
+    Berechnet die Features des letzten Bars inkrementell.
+
+    Der gespeicherte Engine-Zustand wird nur um die neuen, abgeschlossenen
+    Bars erweitert (ohne gespeicherten Zustand: OnlineFeatureEngine.from_frame
+    über alle abgeschlossenen Bars); der letzte (evtl. noch laufende) Bar wird per preview()
+    ausgewertet, ohne in den Zustand einzufliessen.
+
+    Args:
+        df: DataFrame mit OHLCV-Daten
+        state_path: Pfad zum gespeicherten Engine-Zustand
+        timeframe: Bar-Intervall der Daten (default: None = Tages-Bars)
+
+    Returns:
+        DataFrame mit genau einer Zeile (letzter Bar) inkl. aller Features
+    """
+    complete = df.iloc[:-1]
+    engine = None
+    if state_path.exists():
+        engine = OnlineFeatureEngine.load(state_path)
+        # Zustand verwerfen, wenn er nicht zu den aktuellen Daten passt
+        if (engine.last_timestamp is None or engine.last_timestamp not in complete.index
+                or getattr(engine, "timeframe", None) != get_timeframe(timeframe)):
+            engine = None
+    if engine is None:
+        # Kaltstart: vektorisierter Warm-up über die ganze Historie statt Bar für Bar
+        engine = OnlineFeatureEngine.from_frame(complete, timeframe=timeframe)
+    else:
+        engine.extend(complete)
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    engine.save(state_path)
+
+    row = engine.preview(df.iloc[-1])
+    return pd.DataFrame([row], index=df.index[-1:])
+
+
 def main():
     print("=" * 70)
     print("ETH TRADING BOT - LIVE PREDICTION")
@@ -22,20 +66,20 @@ def main():
 
     # 1. Lade aktuelle Daten (inkl. heute)
     print("Lade aktuelle Daten...")
-    df = download_eth_1d(start="2019-01-01")  # end=None -> bis heute
-    feat = add_features(df)
-    lab = make_label(feat, fee_buffer=0.0025)
+    df = download_ohlcv("ETH-USD", timeframe=TIMEFRAME, start="2019-01-01")  # end=None -> bis heute
+    lab = get_cache().labeled(df, fee_buffer=0.0025, columns=FEATURES + POLICY_COLUMNS, timeframe=TIMEFRAME)
 
-    # 2. Trainiere Modell auf ALLEN Daten bis gestern
-    print("Trainiere Modell auf allen verfügbaren Daten...")
+    # 2. Modell aus der Registry laden (neu trainiert nur, wenn sich das Trainings-Fenster ändert)
+    print("Lade Modell (Training nur bei geänderten Daten)...")
     split_date = "2023-01-01"  # Train/Val split für Modell-Training
     train = lab.loc[:split_date]
 
-    model = train_logreg(train)
+    model = get_registry().get_or_train("logreg", train)
+    predictor = compile_model(model)
 
-    # 3. Prognose für HEUTE (letzte verfügbare Zeile)
-    latest = lab.iloc[[-1]]  # Letzte Zeile als DataFrame
-    latest_pred = infer_proba(model, latest)
+    # 3. Prognose für HEUTE (letzter verfügbarer Bar, Features inkrementell)
+    latest = latest_features(df, timeframe=TIMEFRAME)
+    latest_pred = latest.assign(p_up=predictor.predict_row(latest.iloc[0]))
 
     # 4. Policy anwenden
     signals_df = ml_policy(latest_pred, p_entry_thr=P_ENTRY_THR, p_exit_thr=P_EXIT_THR)
@@ -0,0 +1,162 @@
+"""
+Persistente Modell-Registry.
+
+Trainierte Pipelines werden mit joblib unter models/ gespeichert. Der Schlüssel
+besteht aus Modell-Typ, Hyperparametern, Feature-Liste, sklearn-Version und
+einem Hash des Trainings-Fensters (Index, Features und Label). Passt der
+Schlüssel, wird das Modell geladen statt neu trainiert. Alte Artefakte werden
+nach Alter und Anzahl aufgeräumt.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+
+from src.config import FEATURES
+from src.model import train_logreg, train_random_forest, train_gradient_boosting
+
+# Parameter, die nur die Ausführung steuern und das Modell nicht verändern
+_EXECUTION_PARAMS = {"n_jobs", "verbose"}
+
+# Modell-Typ -> Trainingsfunktion(train_df, features=..., **params)
+TRAINERS = {
+    "logreg": train_logreg,
+    "random_forest": train_random_forest,
+    "gradient_boosting": train_gradient_boosting,
+}
+
+
+def trainer_params(model_type, params) -> dict:
+    """
+    Vollständige Hyperparameter eines Trainers: params ergänzt um die Defaults der Signatur.
+
+    Damit ergeben z.B. gradient_boosting mit und ohne learning_rate=0.1 denselben Schlüssel.
+    Reine Ausführungs-Parameter (_EXECUTION_PARAMS, z.B. n_jobs) fehlen: ein Random
+    Forest mit n_jobs=1 im Worker ist dasselbe Modell wie mit n_jobs=-1.
+    Unbekannte Parameter lösen wie beim Aufruf einen TypeError aus.
+    """
+    bound = inspect.signature(TRAINERS[model_type]).bind(None, **params)
+    bound.apply_defaults()
+    skip = {"features"} | _EXECUTION_PARAMS
+    return {name: value for name, value in list(bound.arguments.items())[1:] if name not in skip}
+
+
+def hash_training_window(train_df: pd.DataFrame, features=FEATURES) -> str:
+    """SHA-256 über Index, Feature-Werte und Label des Trainings-Fensters."""
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(train_df.index.asi8).tobytes())
+    h.update(np.ascontiguousarray(train_df[list(features) + ["y"]].to_numpy(dtype=float)).tobytes())
+    return h.hexdigest()
+
+
+class ModelRegistry:
+    """
+    Speichert und lädt trainierte Modelle anhand ihres Schlüssels.
+
+    Args:
+        root: Verzeichnis für die Artefakte (default: "models")
+        max_age_days: Artefakte, die länger nicht benutzt wurden, werden gelöscht (default: 30)
+        max_models: Maximale Anzahl Artefakte (default: 20)
+    """
+
+    def __init__(self, root="models", max_age_days=30, max_models=20):
+        self.root = Path(root)
+        self.max_age_days = max_age_days
+        self.max_models = max_models
+
+    def key(self, model_type, train_df: pd.DataFrame, features=FEATURES, **params) -> str:
+        """Schlüssel aus Modell-Typ, Parametern (inkl. Defaults), Features und Trainingsdaten."""
+        config = {
+            "model_type": model_type,
+            "params": trainer_params(model_type, params),
+            "features": list(features),
+            "sklearn": sklearn.__version__,
+            "data": hash_training_window(train_df, features),
+        }
+        digest = hashlib.sha256(json.dumps(config, sort_keys=True).encode()).hexdigest()[:20]
+        return f"{model_type}-{digest}"
+
+    def get_or_train(self, model_type, train_df: pd.DataFrame, features=FEATURES, **params):
+        """
+        Lädt das passende Modell oder trainiert und speichert es.
+
+        Args:
+            model_type: "logreg", "random_forest" oder "gradient_boosting"
+            train_df: DataFrame mit Features und Label 'y'
+            features: Feature-Liste des Trainers (default: FEATURES)
+            **params: Hyperparameter für die Trainingsfunktion
+
+        Returns:
+            Trainierte Sklearn-Pipeline
+        """
+        if model_type not in TRAINERS:
+            raise ValueError(f"Unbekannter Modell-Typ: {model_type}")
+        key = self.key(model_type, train_df, features, **params)
+        model = self.load(key)
+        if model is None:
+            model = TRAINERS[model_type](train_df, features=list(features), **params)
+            self.save(key, model)
+            self.gc()
+        return model
+
+    def load(self, key):
+        """Lädt ein Modell (None, falls nicht vorhanden) und markiert es als benutzt."""
+        path = self._path(key)
+        if not path.exists():
+            return None
+        model = joblib.load(path)
+        os.utime(path)
+        return model
+
+    def save(self, key, model):
+        """Speichert ein Modell atomar."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        os.close(fd)
+        try:
+            joblib.dump(model, tmp)
+            os.replace(tmp, self._path(key))
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def gc(self, now=None):
+        """
+        Löscht Artefakte, die älter als max_age_days sind, und darüber hinaus
+        die am längsten nicht benutzten, bis höchstens max_models übrig sind.
+
+        Returns:
+            Liste der gelöschten Schlüssel
+        """
+        now = time.time() if now is None else now
+        paths = sorted(self.root.glob("*.joblib"), key=lambda p: p.stat().st_mtime, reverse=True)
+        removed = []
+        for i, path in enumerate(paths):
+            too_old = now - path.stat().st_mtime > self.max_age_days * 86400
+            if too_old or i >= self.max_models:
+                path.unlink()
+                removed.append(path.stem)
+        return removed
+
+    def _path(self, key) -> Path:
+        return self.root / f"{key}.joblib"
+
+
+_default_registry = None
+
+
+def get_registry() -> ModelRegistry:
+    """Gemeinsame Registry im Standard-Verzeichnis (lazy erstellt)."""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = ModelRegistry()
+    return _default_registry
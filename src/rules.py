@@ -0,0 +1,260 @@
+"""
+Regel-Engine für rules/risk_rules.csv.
+
+Jede Zeile der Datei besteht aus einer Bedingung und einer Aktion, z.B.
+
+    condition,action
+    ATR_pct < 0.8,skip
+    price_below_EMA200,half_position
+    after_loss,cooldown_1bar
+
+Die Regeln werden einmal geparst und dann pro DataFrame zu Arrays
+kompiliert: eine Entry-Maske (skip) und ein Positions-Multiplikator
+(half_position, size_<x>) über alle Bars. Die zustandsabhängige Regel
+after_loss → cooldown_<n>bar wird nicht hier, sondern im Backtester
+umgesetzt (SimpleBacktester.run(..., cooldown=n)), der dafür von Trade zu
+Trade springt statt Bar für Bar zu iterieren.
+
+Bedingungen:
+- <Spalte> <op> <Zahl> mit op in <, <=, >, >=, ==, != (Spalten-Namen ohne
+  Beachtung der Gross-/Kleinschreibung, "price" = Close)
+- price_below_<Spalte>, price_above_<Spalte>
+- after_loss (nur mit cooldown_<n>bar)
+"""
+
+import codecs
+import csv
+import operator
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Standard-Pfad der Regel-Datei
+RULES_PATH = Path("rules/risk_rules.csv")
+
+_OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+_COMPARISON = re.compile(r"^([A-Za-z_][A-Za-z0-9_]*)\s*(<=|>=|==|!=|<|>)\s*(-?\d+(?:\.\d+)?)$")
+_PRICE_VS = re.compile(r"^price_(below|above)_([A-Za-z0-9_]+)$")
+_COOLDOWN = re.compile(r"^cooldown_(\d+)bars?$")
+_SIZE = re.compile(r"^size_(\d+(?:\.\d+)?)$")
+
+# Benannte Positions-Multiplikatoren
+SIZE_ACTIONS = {"half_position": 0.5}
+
+
+def _read_text(path) -> str:
+    """Liest die Datei und erkennt die Kodierung am BOM (UTF-16 oder UTF-8)."""
+    raw = Path(path).read_bytes()
+    if raw.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return raw.decode("utf-16")
+    return raw.decode("utf-8-sig")
+
+
+def _column_name(df: pd.DataFrame, name):
+    """Spalten-Name zu einem Namen aus der Regel-Datei (ohne Beachtung der Gross-/Kleinschreibung)."""
+    if name.lower() == "price":
+        name = "Close"
+    if name in df.columns:
+        return name
+    matches = [c for c in df.columns if isinstance(c, str) and c.lower() == name.lower()]
+    if not matches:
+        raise KeyError(f"Spalte für Regel nicht gefunden: {name}")
+    return matches[0]
+
+
+def _column(df: pd.DataFrame, name):
+    """Spalte zu einem Namen aus der Regel-Datei als float-Array."""
+    return df[_column_name(df, name)].to_numpy(dtype=float)
+
+
+class Rule:
+    """
+    Eine Regel (Bedingung → Aktion), beim Erstellen auf Syntax geprüft.
+
+    Args:
+        condition: Bedingung, z.B. "ATR_pct < 0.8" oder "price_below_EMA200"
+        action: "skip", "half_position", "size_<x>" oder "cooldown_<n>bar"
+    """
+
+    def __init__(self, condition, action):
+        self.condition = condition.strip()
+        self.action = action.strip()
+
+        if self.condition == "after_loss":
+            match = _COOLDOWN.match(self.action)
+            if match is None:
+                raise ValueError(f"after_loss unterstützt nur cooldown_<n>bar, nicht '{self.action}'")
+            self.cooldown = int(match.group(1))
+            return
+        self.cooldown = 0
+
+        if self.action == "skip":
+            self.size = 0.0
+        elif self.action in SIZE_ACTIONS:
+            self.size = SIZE_ACTIONS[self.action]
+        elif _SIZE.match(self.action):
+            self.size = float(_SIZE.match(self.action).group(1))
+        else:
+            raise ValueError(f"Unbekannte Aktion: '{self.action}'")
+
+        comparison = _COMPARISON.match(self.condition)
+        price_vs = _PRICE_VS.match(self.condition)
+        if comparison is not None:
+            column, op, value = comparison.groups()
+            self._compare = (column, _OPERATORS[op], float(value))
+        elif price_vs is not None:
+            direction, column = price_vs.groups()
+            self._compare = ("price", operator.lt if direction == "below" else operator.gt, column)
+        else:
+            raise ValueError(f"Unbekannte Bedingung: '{self.condition}'")
+
+    @property
+    def stateful(self):
+        return self.cooldown > 0
+
+    def columns(self, df: pd.DataFrame):
+        """Spalten von df, die die Bedingung liest (leer für after_loss)."""
+        if self.stateful:
+            return []
+        left, _, right = self._compare
+        names = [left, right] if isinstance(right, str) else [left]
+        return [_column_name(df, name) for name in names]
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Boolean-Array: Bedingung pro Bar erfüllt.
+
+        NaN in einer der verglichenen Spalten zählt bei skip als erfüllt
+        (kein Entry ohne gültige Werte, wie der fest eingebaute ATR-Filter),
+        bei allen anderen Aktionen als nicht erfüllt.
+        """
+        if self.stateful:
+            raise ValueError("after_loss ist zustandsabhängig und wird im Backtester ausgewertet")
+        left, op, right = self._compare
+        left = _column(df, left)
+        right = _column(df, right) if isinstance(right, str) else right
+        with np.errstate(invalid="ignore"):
+            mask = op(left, right)
+        if self.size == 0:
+            mask |= np.isnan(left) | np.isnan(right)
+        return mask
+
+    def __repr__(self):
+        return f"Rule({self.condition!r}, {self.action!r})"
+
+
+class CompiledRules:
+    """
+    Regeln, kompiliert für einen DataFrame.
+
+    Attributes:
+        index: Index des DataFrames
+        allow: Boolean-Array, False = Entry an diesem Bar verboten (skip)
+        size: Positions-Anteil pro Bar (Produkt aller zutreffenden Multiplikatoren)
+        cooldown: Bars ohne Entry nach einem Verlust-Trade (für den Backtester)
+    """
+
+    def __init__(self, index, allow, size, cooldown=0):
+        self.index = index
+        self.allow = allow
+        self.size = size
+        self.cooldown = cooldown
+
+    def backtest_kwargs(self):
+        """Argumente für SimpleBacktester.run/run_batch (size als Series am Index)."""
+        return {"size": pd.Series(self.size, index=self.index), "cooldown": self.cooldown}
+
+
+class RuleSet:
+    """
+    Liste von Regeln, die gemeinsam kompiliert werden.
+
+    Args:
+        rules: Liste von Rule oder (condition, action)-Tuples
+    """
+
+    def __init__(self, rules):
+        self.rules = [r if isinstance(r, Rule) else Rule(*r) for r in rules]
+
+    @classmethod
+    def from_csv(cls, path=RULES_PATH):
+        """Lädt eine Regel-Datei mit Spalten condition,action (UTF-8 oder UTF-16)."""
+        reader = csv.DictReader(_read_text(path).splitlines())
+        rules = []
+        for row in reader:
+            condition = (row.get("condition") or "").strip()
+            if not condition or condition.startswith("#"):
+                continue
+            rules.append(Rule(condition, row.get("action") or ""))
+        return cls(rules)
+
+    @property
+    def cooldown(self):
+        return max((r.cooldown for r in self.rules), default=0)
+
+    def columns(self, df: pd.DataFrame):
+        """Spalten von df, die die Regeln lesen (ohne Duplikate)."""
+        return list(dict.fromkeys(c for rule in self.rules for c in rule.columns(df)))
+
+    def compile(self, df: pd.DataFrame) -> CompiledRules:
+        """
+        Wertet alle zustandslosen Regeln vektorisiert über den ganzen Frame aus.
+
+        Args:
+            df: DataFrame mit den in den Regeln verwendeten Spalten
+
+        Returns:
+            CompiledRules mit Entry-Maske, Positions-Multiplikator und Cooldown
+        """
+        allow = np.ones(len(df), dtype=bool)
+        size = np.ones(len(df))
+        for rule in self.rules:
+            if rule.stateful:
+                continue
+            mask = rule.mask(df)
+            if rule.size == 0:
+                allow &= ~mask
+            else:
+                size = np.where(mask, size * rule.size, size)
+        return CompiledRules(df.index, allow, size, self.cooldown)
+
+    def __len__(self):
+        return len(self.rules)
+
+    def __repr__(self):
+        return f"RuleSet({self.rules!r})"
+
+
+def compile_rules(rules, df: pd.DataFrame):
+    """
+    Kompiliert ein RuleSet für df; CompiledRules und None bleiben unverändert.
+
+    Args:
+        rules: RuleSet, CompiledRules oder None
+        df: DataFrame, auf dem die Signale berechnet werden
+
+    Returns:
+        CompiledRules (bzw. None ohne Regeln)
+    """
+    if rules is not None and hasattr(rules, "compile"):
+        return rules.compile(df)
+    return rules
+
+
+def backtest_kwargs(rules):
+    """Argumente für SimpleBacktester.run/run_batch zu CompiledRules ({} ohne Regeln)."""
+    return {} if rules is None else rules.backtest_kwargs()
+
+
+def load_rules(path=RULES_PATH) -> RuleSet:
+    """Lädt die Regel-Datei (default: rules/risk_rules.csv)."""
+    return RuleSet.from_csv(path)
@@ -1,11 +1,12 @@
-from src.data import download_eth_1d
-from src.features import add_features
-from src.label import make_label
-from src.model import train_logreg, infer_proba
+from src.data import download_ohlcv
+from src.cache import get_cache
+from src.model import infer_proba
+from src.registry import get_registry
 from src.policy import ml_policy
+from src.rules import load_rules
 from src.backtest import SimpleBacktester
 from src.eval import returns_from_equity, sharpe, max_drawdown, cagr
-from src.config import P_ENTRY_THR, P_EXIT_THR
+from src.config import P_ENTRY_THR, P_EXIT_THR, FEATURES, POLICY_COLUMNS, TIMEFRAME
 
 def main():
     """
@@ -17,18 +18,15 @@ def main():
     3. Labels generieren
     4. Train/Test-Split
     5. Modell trainieren
-    6. Signale generieren
+    6. Signale generieren (mit Risiko-Regeln)
     7. Backtest durchführen
     8. Metriken ausgeben
     """
     # 1) Daten
-    df = download_eth_1d(start="2019-01-01")
+    df = download_ohlcv("ETH-USD", timeframe=TIMEFRAME, start="2019-01-01")
 
-    # 2) Features
-    feat = add_features(df)
-
-    # 3) Label
-    lab = make_label(feat, fee_buffer=0.0025)
+    # 2) + 3) Features und Label (gecacht)
+    lab = get_cache().labeled(df, fee_buffer=0.0025, columns=FEATURES + POLICY_COLUMNS, timeframe=TIMEFRAME)
 
     # 4) Zeitbasierter Split
     split_date = "2023-01-01"
@@ -36,15 +34,19 @@ def main():
     test  = lab.loc[split_date:]
 
     # 5) Modell
-    model = train_logreg(train)
+    model = get_registry().get_or_train("logreg", train)
 
     # 6) Inferenz + Policy
     test_pred = infer_proba(model, test)
 
+    # Risiko-Regeln aus rules/risk_rules.csv (ATR-Filter, Positionsgrösse, Cooldown)
+    rules = load_rules().compile(test_pred)
+
     signals_df = ml_policy(
         test_pred,
         p_entry_thr=P_ENTRY_THR,
-        p_exit_thr=P_EXIT_THR
+        p_exit_thr=P_EXIT_THR,
+        rules=rules
     )
 
     signals = signals_df[["entry_long", "exit_long"]].astype(int)
@@ -55,18 +57,19 @@ def main():
     print(f"P_ENTRY_THR: {P_ENTRY_THR} | P_EXIT_THR: {P_EXIT_THR}")
     print(f"Entry-Signale: {int(signals['entry_long'].sum())}")
     print(f"Exit-Signale: {int(signals['exit_long'].sum())}")
+    print(f"Reduzierte Positionsgrösse: {int((rules.size < 1).sum())} Bars | Cooldown: {rules.cooldown} Bar(s)")
 
     # 7) Backtest
     bt = SimpleBacktester(test_pred)
-    equity = bt.run(signals)
+    equity = bt.run(signals, **rules.backtest_kwargs())
 
     # 8) Kennzahlen
     ret = returns_from_equity(equity)
     print("\n" + "=" * 50)
     print("BACKTEST-ERGEBNISSE")
     print("=" * 50)
-    print(f"Sharpe Ratio: {round(sharpe(ret, periods=252), 2)}")
-    print(f"CAGR: {round(cagr(equity) * 100, 2)}%")
+    print(f"Sharpe Ratio: {round(sharpe(ret, timeframe=TIMEFRAME), 2)}")
+    print(f"CAGR: {round(cagr(equity, timeframe=TIMEFRAME) * 100, 2)}%")
     print(f"Max Drawdown: {round(max_drawdown(equity) * 100, 1)}%")
     print(f"Final Equity: {round(equity.iloc[-1], 2)}")
     print("=" * 50)
@@ -0,0 +1,236 @@
+"""
+Hyperparameter-Suche mit Successive Halving auf Walk-Forward-Folds.
+
+Alle Kandidaten aus einem Parameter-Grid werden zuerst mit einem kurzen,
+rollenden Trainings-Fenster auf denselben Test-Blöcken bewertet (Sharpe des
+Backtests mit SimpleBacktester, gemittelt über die Folds). Nur das beste
+1/eta der Kandidaten kommt in die nächste Runde, deren Trainings-Fenster
+eta-mal so lang ist; in der letzten Runde wird mit der gesamten Historie
+(expanding) trainiert. Zwischen Training und Test liegt eine Purge-Lücke
+in der Länge des Label-Horizonts, damit kein Label in den Test-Block
+hineinreicht.
+
+Die Folds laufen über den Prozess-Pool aus src.cv. Jedes Fold-Ergebnis wird
+sofort als Zeile an ein JSONL-Log angehängt; ein abgebrochener Lauf setzt
+beim nächsten Start dort fort und bewertet nur fehlende Folds.
+
+Verwendung:
+    python -m src.search
+"""
+
+import itertools
+import json
+import math
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.config import FEATURES, P_ENTRY_THR, P_EXIT_THR, PARAM_GRIDS, POLICY_COLUMNS
+from src.cv import run_folds, walk_forward_folds, worker_params
+from src.registry import TRAINERS, hash_training_window
+from src.timeframe import get_timeframe
+
+# Standard-Verzeichnis für die Such-Logs
+SEARCH_LOG_DIR = Path(".cache/search")
+
+
+def param_candidates(grid, max_candidates=None, seed=42):
+    """
+    Alle Kombinationen eines Grids (dict Parameter -> Werte-Liste).
+
+    Args:
+        grid: Dict mit Werte-Listen pro Parameter
+        max_candidates: Optional zufällige Auswahl von höchstens so vielen Kombinationen
+        seed: Seed für die Auswahl (default: 42)
+
+    Returns:
+        Liste von Parameter-Dicts
+    """
+    names = sorted(grid)
+    candidates = [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+    if max_candidates is not None and len(candidates) > max_candidates:
+        idx = np.random.default_rng(seed).choice(len(candidates), max_candidates, replace=False)
+        candidates = [candidates[i] for i in sorted(idx)]
+    return candidates
+
+
+def _task_key(data, model_type, params, train_size, fold, p_entry_thr, p_exit_thr, timeframe=None,
+              rules=None):
+    train_slice, test_slice = fold
+    return json.dumps({
+        "data": data,
+        "rules": None if rules is None else [[r.condition, r.action] for r in rules.rules],
+        "timeframe": str(get_timeframe(timeframe).bar),
+        "model_type": model_type,
+        "params": params,
+        "p_entry_thr": p_entry_thr,
+        "p_exit_thr": p_exit_thr,
+        "train_size": train_size,
+        "train": [train_slice.start, train_slice.stop],
+        "test": [test_slice.start, test_slice.stop],
+    }, sort_keys=True)
+
+
+def _read_log(path):
+    """Bereits bewertete Folds aus dem JSONL-Log (task_key -> Zeile)."""
+    done = {}
+    if path is None or not Path(path).exists():
+        return done
+    with open(path) as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue   # abgeschnittene letzte Zeile eines abgebrochenen Laufs
+            done[row["key"]] = row
+    return done
+
+
+def _open_log(path):
+    """Öffnet das Log zum Anhängen; nach einer abgeschnittenen letzten Zeile zuerst ein Zeilenumbruch."""
+    log = open(path, "a+b")
+    if log.tell() > 0:
+        log.seek(-1, 2)
+        if log.read(1) != b"\n":
+            log.write(b"\n")
+    return log
+
+
+def successive_halving(df: pd.DataFrame, model_type, grid=None, candidates=None, min_train=250,
+                       eta=3, n_folds=3, test_size=None, forward_days=1, n_jobs=-1, log_path=None,
+                       features=FEATURES, p_entry_thr=P_ENTRY_THR, p_exit_thr=P_EXIT_THR, timeframe=None,
+                       rules=None):
+    """
+    Successive-Halving-Suche über Trainings-Fenster-Längen.
+
+    Args:
+        df: DataFrame mit Features, Label 'y' und OHLC (z.B. aus make_label)
+        model_type: "logreg", "random_forest" oder "gradient_boosting"
+        grid: Parameter-Grid (default: PARAM_GRIDS[model_type])
+        candidates: Alternativ explizite Liste von Parameter-Dicts
+        min_train: Trainings-Fenster der ersten Runde in Bars (default: 250)
+        eta: Faktor für Fenster-Wachstum und Auswahl (default: 3 = bestes Drittel)
+        n_folds: Anzahl Test-Blöcke, in allen Runden dieselben (default: 3)
+        test_size: Bars pro Test-Block (default: n // (n_folds + 1))
+        forward_days: Label-Horizont in Tagen = Purge-Lücke zwischen Training und Test (default: 1)
+        n_jobs: Anzahl Prozesse (default: -1 = alle CPUs)
+        log_path: JSONL-Log für Fortsetzen (default: None = nicht speichern)
+        features: Feature-Spalten des Trainers (default: FEATURES)
+        p_entry_thr, p_exit_thr: Thresholds für ml_policy
+        timeframe: Bar-Intervall der Daten; rechnet forward_days in Bars um und
+            bestimmt die Annualisierung (default: None = Tages-Bars)
+        rules: Optional RuleSet für Policy und Backtest (Teil des Log-Schlüssels)
+
+    Returns:
+        Tuple (best_params, history):
+        - best_params: Parameter-Dict des besten Kandidaten der letzten Runde
+        - history: DataFrame mit einer Zeile pro Runde und Kandidat
+          (rung, train_size, params, sharpe, sharpe_std, cagr, maxdd, trades)
+    """
+    if model_type not in TRAINERS:
+        raise ValueError(f"Unbekannter Modell-Typ: {model_type}")
+    if candidates is None:
+        candidates = param_candidates(grid if grid is not None else PARAM_GRIDS[model_type])
+    if not candidates:
+        raise ValueError("Keine Kandidaten")
+
+    n = len(df)
+    test_size = test_size or n // (n_folds + 1)
+    # Längstes mögliches Fenster: alles vor dem ersten Test-Block (minus Purge)
+    gap = get_timeframe(timeframe).window(forward_days)
+    max_train = n - n_folds * test_size - gap
+    # Hash über alle Spalten, die die Worker lesen (Features, Label, Preise, Policy, Regeln)
+    columns = list(features) + ["Open", "Close"] + POLICY_COLUMNS
+    if rules is not None:
+        columns += rules.columns(df)
+    data = hash_training_window(df, list(dict.fromkeys(columns)))[:16]
+    done = _read_log(log_path)
+    if log_path is not None:
+        Path(log_path).parent.mkdir(parents=True, exist_ok=True)
+
+    history = []
+    train_size = min_train
+    for rung in itertools.count():
+        final = train_size >= max_train or len(candidates) == 1
+        window = None if final else train_size
+        folds = walk_forward_folds(n, n_folds, test_size, train_size=window, gap=gap)
+
+        # Nur Folds bewerten, die noch nicht im Log stehen
+        keys = {}
+        tasks = []
+        for i, params in enumerate(candidates):
+            kwargs = dict(model_type=model_type, params=worker_params(model_type, params),
+                          p_entry_thr=p_entry_thr, p_exit_thr=p_exit_thr, timeframe=timeframe,
+                          features=list(features), rules=rules)
+            for fold in folds:
+                key = _task_key(data, model_type, params, window, fold, p_entry_thr, p_exit_thr, timeframe,
+                                rules)
+                keys[i, fold[1].start] = key
+                if key not in done:
+                    tasks.append((key, fold, kwargs))
+
+        if tasks:
+            results = run_folds(df, [(fold, kwargs) for _, fold, kwargs in tasks],
+                                n_jobs=n_jobs, features=features)
+            log = _open_log(log_path) if log_path is not None else None
+            try:
+                for (key, _, _), row in zip(tasks, results):
+                    row = {"key": key, "sharpe": row["sharpe"], "cagr": row["cagr"],
+                           "maxdd": row["maxdd"], "trades": row["trades"]}
+                    done[key] = row
+                    if log is not None:
+                        log.write((json.dumps(row) + "\n").encode())
+                        log.flush()
+            finally:
+                if log is not None:
+                    log.close()
+
+        rows = []
+        for i, params in enumerate(candidates):
+            fold_rows = pd.DataFrame([done[keys[i, fold[1].start]] for fold in folds])
+            rows.append({
+                "rung": rung,
+                "train_size": window if window is not None else max_train,
+                "params": params,
+                "sharpe": fold_rows["sharpe"].mean(),
+                "sharpe_std": fold_rows["sharpe"].std(ddof=0),
+                "cagr": fold_rows["cagr"].mean(),
+                "maxdd": fold_rows["maxdd"].mean(),
+                "trades": fold_rows["trades"].mean(),
+            })
+        history.extend(rows)
+
+        # Ranking nach mittlerem Sharpe (NaN = schlechtester Platz)
+        order = np.argsort(-np.nan_to_num([r["sharpe"] for r in rows], nan=-np.inf), kind="stable")
+        if final:
+            return candidates[order[0]], pd.DataFrame(history)
+        candidates = [candidates[i] for i in order[:math.ceil(len(candidates) / eta)]]
+        train_size *= eta
+
+
+def main():
+    from src.data import download_ohlcv
+    from src.cache import get_cache
+    from src.config import POLICY_COLUMNS, TIMEFRAME
+
+    print("=" * 70)
+    print("HYPERPARAMETER-SUCHE (Successive Halving, Walk-Forward)")
+    print("=" * 70)
+
+    df = download_ohlcv("ETH-USD", timeframe=TIMEFRAME, start="2019-01-01")
+    lab = get_cache().labeled(df, fee_buffer=0.0025, columns=FEATURES + POLICY_COLUMNS, timeframe=TIMEFRAME)
+
+    for model_type in PARAM_GRIDS:
+        log_path = SEARCH_LOG_DIR / f"{model_type}.jsonl"
+        best, history = successive_halving(lab, model_type, log_path=log_path, timeframe=TIMEFRAME)
+        print(f"\n{model_type}: {len(history)} Bewertungen, Log: {log_path}")
+        for rung, part in history.groupby("rung"):
+            top = part.sort_values("sharpe", ascending=False).iloc[0]
+            print(f"  Runde {rung} (Fenster {top['train_size']} Bars, {len(part)} Kandidaten): "
+                  f"bester Sharpe {top['sharpe']:.3f} mit {top['params']}")
+        print(f"  -> Beste Parameter: {best}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,10 @@
 # src/signals.py
 from src.data import download_eth_1d
-from src.features import add_features
-from src.label import make_label
-from src.model import train_logreg, infer_proba
+from src.cache import get_cache
+from src.model import infer_proba
+from src.registry import get_registry
 from src.policy import ml_policy
+from src.config import FEATURES, POLICY_COLUMNS
 from pathlib import Path
 import pandas as pd
 
@@ -11,14 +12,13 @@ def main():
     Path("plots").mkdir(parents=True, exist_ok=True)
 
     df = download_eth_1d(start="2019-01-01")
-    feat = add_features(df)
-    lab  = make_label(feat, fee_buffer=0.0025)
+    lab  = get_cache().labeled(df, fee_buffer=0.0025, columns=FEATURES + POLICY_COLUMNS)
 
     split_date = "2023-01-01"
     train = lab.loc[:split_date]
     test  = lab.loc[split_date:]
 
-    model = train_logreg(train)
+    model = get_registry().get_or_train("logreg", train)
     test_pred = infer_proba(model, test)
 
     # Threshold kannst du später tunen; nimm vorerst 0.55
@@ -0,0 +1,328 @@
+"""
+Lokaler spaltenweiser OHLCV-Speicher mit inkrementeller Aktualisierung.
+
+Pro Ticker und Intervall liegt unter root/<ticker>/<interval>/ eine Generation
+von .npy-Dateien (eine pro Spalte plus Index). Die Datei CURRENT.json zeigt auf
+die aktuelle Generation und wird erst nach dem vollständigen Schreiben der
+neuen Generation atomar ersetzt. Bei einer Aktualisierung werden nur Bars ab
+dem letzten gespeicherten Zeitstempel geladen (der letzte Bar kann noch
+unvollständig gewesen sein). Ist der Speicher aktuell, wird die Quelle nicht
+angefragt.
+
+Lange Historien (z.B. Minuten-Bars) können per open_arrays() als
+Memory-mapped Arrays gelesen werden, ohne einen DataFrame zu materialisieren.
+
+Die Datenquelle ist austauschbar: YahooSource für yfinance, CsvSource für
+lokale Dateien (z.B. in Tests). Zeitstempel werden als naive UTC-Zeiten
+gespeichert (yfinance liefert Intraday-Bars mit Zeitzone).
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.timeframe import parse_interval
+
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+
+def _naive_utc(ts):
+    """Zeitstempel mit Zeitzone als naive UTC-Zeit, naive Zeitstempel unverändert."""
+    if ts is None:
+        return None
+    ts = pd.Timestamp(ts)
+    return ts.tz_convert("UTC").tz_localize(None) if ts.tz is not None else ts
+
+
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    """Flache Spaltennamen, nur OHLCV, sortierter naiver UTC-Index ohne Duplikate."""
+    if isinstance(df.columns, pd.MultiIndex):
+        df.columns = df.columns.get_level_values(0)
+    df = df.rename(columns=str.title)
+    keep = [c for c in OHLCV_COLUMNS if c in df.columns]
+    df = df[keep].dropna().astype(float)
+    if isinstance(df.index, pd.DatetimeIndex) and df.index.tz is not None:
+        df.index = df.index.tz_convert("UTC").tz_localize(None)
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    df.index.name = "Date"
+    return df
+
+
+class YahooSource:
+    """Lädt OHLCV-Daten von Yahoo Finance (yfinance wird erst bei Bedarf importiert)."""
+
+    def fetch(self, ticker, interval, start, end=None) -> pd.DataFrame:
+        import yfinance as yf
+
+        df = yf.download(
+            tickers=ticker,
+            interval=interval,
+            start=start,
+            end=end,
+            auto_adjust=False,  # explizit, um Überraschungen zu vermeiden
+            threads=True,
+            progress=False,
+        )
+        return _normalize(df)
+
+
+class CsvSource:
+    """
+    Dateibasierte Quelle: liest root/<ticker>_<interval>.csv.
+
+    Die CSV braucht eine Datums-Spalte als erste Spalte und OHLCV-Spalten.
+    Verhält sich wie YahooSource (start inklusiv, end exklusiv).
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def path(self, ticker, interval) -> Path:
+        return self.root / f"{ticker}_{interval}.csv"
+
+    def fetch(self, ticker, interval, start, end=None) -> pd.DataFrame:
+        df = _normalize(pd.read_csv(self.path(ticker, interval), index_col=0, parse_dates=True))
+        df = df.loc[df.index >= _naive_utc(start)]
+        if end is not None:
+            df = df.loc[df.index < _naive_utc(end)]
+        return df
+
+
+class OhlcvArrays:
+    """
+    OHLCV-Spalten als (Memory-mapped) NumPy-Arrays mit Zeitstempel-Index.
+
+    Verhält sich für Lesezugriffe wie ein DataFrame: arrays["Close"],
+    "Volume" in arrays, len(arrays), arrays.index, arrays.columns.
+    Ausschnitte per slice() sind Views und bleiben Memory-mapped.
+    """
+
+    def __init__(self, index, data: dict):
+        self.index = index
+        self._data = data
+        for col, values in data.items():
+            if len(values) != len(index):
+                raise ValueError(f"Spalte {col} hat {len(values)} statt {len(index)} Werte")
+
+    @property
+    def columns(self):
+        return list(self._data)
+
+    def __getitem__(self, col):
+        return self._data[col]
+
+    def __contains__(self, col):
+        return col in self._data
+
+    def __len__(self):
+        return len(self.index)
+
+    def slice(self, start=None, end=None) -> "OhlcvArrays":
+        """Bars mit start <= Zeitstempel < end (binäre Suche, ohne Kopie)."""
+        lo = 0 if start is None else np.searchsorted(self.index, np.datetime64(pd.Timestamp(start)), side="left")
+        hi = len(self) if end is None else np.searchsorted(self.index, np.datetime64(pd.Timestamp(end)), side="left")
+        return OhlcvArrays(self.index[lo:hi], {col: v[lo:hi] for col, v in self._data.items()})
+
+    def to_frame(self) -> pd.DataFrame:
+        """Materialisiert die Arrays als DataFrame (kopiert)."""
+        return pd.DataFrame({col: np.asarray(v) for col, v in self._data.items()},
+                            index=pd.DatetimeIndex(np.asarray(self.index), name="Date"))
+
+
+class OhlcvStore:
+    """
+    Lokaler OHLCV-Speicher pro Ticker und Intervall.
+
+    Args:
+        root: Basisverzeichnis (default: "data/ohlcv")
+        source: Datenquelle mit fetch(ticker, interval, start, end) (default: YahooSource)
+        max_age: Wie lange ein beim Laden noch unvollständiger letzter Bar als
+            aktuell gilt (default: 1 Stunde)
+    """
+
+    def __init__(self, root="data/ohlcv", source=None, max_age=pd.Timedelta(hours=1)):
+        self.root = Path(root)
+        self.source = source if source is not None else YahooSource()
+        self.max_age = pd.Timedelta(max_age)
+
+    def load(self, ticker, interval="1d", start="2019-01-01", end=None,
+             refresh=True, now=None) -> pd.DataFrame:
+        """
+        Liefert OHLCV-Daten aus dem Speicher und lädt fehlende Bars nach.
+
+        Args:
+            ticker: Ticker-Symbol, z.B. "ETH-USD"
+            interval: Yahoo-Intervall, z.B. "1d" oder "1h" (default: "1d")
+            start: Start-Datum (inklusiv)
+            end: End-Datum (exklusiv, default: None = bis heute)
+            refresh: Wenn False, wird die Quelle nie angefragt (offline)
+            now: Aktueller Zeitpunkt, für Tests (default: jetzt in UTC)
+
+        Returns:
+            DataFrame mit Spalten Open, High, Low, Close, Volume und DatetimeIndex "Date"
+            (naive UTC-Zeiten; start/end/now mit Zeitzone werden nach UTC umgerechnet)
+        """
+        start = _naive_utc(start)
+        end = _naive_utc(end)
+        now = _naive_utc(pd.Timestamp.now(tz="UTC") if now is None else now)
+
+        df, meta = self.read(ticker, interval)
+        if df is not None and df.index.tz is not None:
+            # Bestand aus einer Version, die den Index mit Zeitzone gespeichert hat
+            df.index = df.index.tz_convert("UTC").tz_localize(None)
+        if refresh:
+            if df is None or df.empty or (start < df.index[0] and start < _naive_utc(meta["start"])):
+                # Kein Bestand oder Historie zu kurz: komplett laden
+                df = self._fetch(ticker, interval, start, None)
+                self.write(ticker, interval, df, start=start, fetched_at=now)
+            elif self._is_stale(df, meta, interval, end, now):
+                df = self._refresh(ticker, interval, df, meta, now)
+
+        if df is None:
+            raise FileNotFoundError(f"Keine gespeicherten Daten für {ticker} ({interval}) in {self.root}")
+
+        df = df.loc[df.index >= start]
+        if end is not None:
+            df = df.loc[df.index < end]
+        return df
+
+    def read(self, ticker, interval):
+        """
+        Liest die aktuelle Generation.
+
+        Returns:
+            Tuple (DataFrame oder None, Metadaten-Dict oder None)
+        """
+        meta = self._read_pointer(ticker, interval)
+        if meta is None:
+            return None, None
+        gen_dir = self._dir(ticker, interval) / meta["generation"]
+        index = pd.DatetimeIndex(np.load(gen_dir / "index.npy"), name="Date")
+        if meta.get("tz"):
+            index = index.tz_localize("UTC").tz_convert(meta["tz"])
+        data = {col: np.load(gen_dir / f"{col}.npy") for col in meta["columns"]}
+        return pd.DataFrame(data, index=index), meta
+
+    def write(self, ticker, interval, df: pd.DataFrame, start, fetched_at):
+        """Schreibt df als neue Generation und ersetzt den Zeiger atomar."""
+        tz = df.index.tz
+        index = df.index.tz_convert("UTC").tz_localize(None) if tz is not None else df.index
+        data = {col: df[col].to_numpy(dtype=float) for col in df.columns}
+        self.write_arrays(ticker, interval, index.to_numpy(), data, start=start,
+                          fetched_at=fetched_at, tz=str(tz) if tz is not None else None)
+
+    def write_arrays(self, ticker, interval, index, data: dict, start=None, fetched_at=None, tz=None):
+        """
+        Schreibt Arrays direkt als neue Generation (ohne DataFrame), z.B. für lange Minuten-Historien.
+
+        Args:
+            index: datetime64-Array mit den Bar-Zeitstempeln (UTC bzw. naiv), aufsteigend
+            data: Dict Spalte -> Array gleicher Länge (Open, High, Low, Close, Volume)
+            start: Angefragtes Start-Datum (default: erster Zeitstempel)
+            fetched_at: Zeitpunkt des Ladens (default: jetzt)
+            tz: Optionale Zeitzone des Index
+        """
+        base = self._dir(ticker, interval)
+        base.mkdir(parents=True, exist_ok=True)
+        old = self._read_pointer(ticker, interval)
+
+        index = np.asarray(index)
+        gen_dir = Path(tempfile.mkdtemp(dir=base, prefix="gen-"))
+        np.save(gen_dir / "index.npy", index)
+        for col, values in data.items():
+            np.save(gen_dir / f"{col}.npy", np.asarray(values, dtype=float))
+
+        meta = {
+            "generation": gen_dir.name,
+            "columns": list(data),
+            "tz": tz,
+            "start": str(pd.Timestamp(start if start is not None else index[0])),
+            "fetched_at": str(pd.Timestamp(fetched_at) if fetched_at is not None else pd.Timestamp.now()),
+            "n_bars": len(index),
+        }
+        fd, tmp = tempfile.mkstemp(dir=base, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=1)
+        os.replace(tmp, base / "CURRENT.json")
+
+        if old is not None and old["generation"] != gen_dir.name:
+            shutil.rmtree(base / old["generation"], ignore_errors=True)
+
+    def open_arrays(self, ticker, interval, start=None, end=None) -> "OhlcvArrays":
+        """
+        Öffnet die aktuelle Generation als Memory-mapped Arrays (ohne Kopie in den RAM).
+
+        Args:
+            ticker: Ticker-Symbol
+            interval: Intervall, z.B. "1m"
+            start: Optionales Start-Datum (inklusiv)
+            end: Optionales End-Datum (exklusiv)
+
+        Returns:
+            OhlcvArrays (read-only)
+        """
+        meta = self._read_pointer(ticker, interval)
+        if meta is None:
+            raise FileNotFoundError(f"Keine gespeicherten Daten für {ticker} ({interval}) in {self.root}")
+        gen_dir = self._dir(ticker, interval) / meta["generation"]
+        arrays = OhlcvArrays(
+            np.load(gen_dir / "index.npy", mmap_mode="r"),
+            {col: np.load(gen_dir / f"{col}.npy", mmap_mode="r") for col in meta["columns"]},
+        )
+        return arrays.slice(start, end)
+
+    def _refresh(self, ticker, interval, df, meta, now):
+        """Lädt Bars ab dem letzten gespeicherten Zeitstempel und führt sie zusammen."""
+        last = df.index[-1]
+        try:
+            new = self._fetch(ticker, interval, last, None)
+        except Exception as e:
+            print(f"⚠️  Aktualisierung von {ticker} fehlgeschlagen ({e}), verwende gespeicherte Daten")
+            return df
+        if new.empty:
+            return df
+        merged = pd.concat([df.loc[df.index < new.index[0]], new])
+        self.write(ticker, interval, merged, start=meta["start"], fetched_at=now)
+        return merged
+
+    def _fetch(self, ticker, interval, start, end):
+        df = self.source.fetch(ticker, interval, start, end)
+        return _normalize(df)
+
+    def _is_stale(self, df, meta, interval, end, now):
+        """True, wenn die Quelle neuere oder vollständigere Bars liefern kann."""
+        last = df.index[-1]
+        if end is not None and end <= last:
+            return False
+        step = parse_interval(interval)
+        if now >= last + step:
+            return True
+        # Letzter Bar läuft noch: nach max_age neu laden
+        fetched_at = _naive_utc(meta["fetched_at"])
+        return fetched_at < last + step and now - fetched_at > self.max_age
+
+    def _dir(self, ticker, interval) -> Path:
+        return self.root / ticker.replace("/", "_") / interval
+
+    def _read_pointer(self, ticker, interval):
+        path = self._dir(ticker, interval) / "CURRENT.json"
+        if not path.exists():
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+
+_default_store = None
+
+
+def get_store() -> OhlcvStore:
+    """Gemeinsamer Speicher im Standard-Verzeichnis (lazy erstellt)."""
+    global _default_store
+    if _default_store is None:
+        _default_store = OhlcvStore()
+    return _default_store
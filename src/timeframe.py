@@ -0,0 +1,87 @@
+"""
+Timeframe-Abstraktion für Bars beliebiger Länge (1m, 1h, 1d, ...).
+
+Krypto handelt rund um die Uhr: ein Jahr hat 365 Handelstage, also 365
+Tages-Bars, 8760 Stunden-Bars oder 525600 Minuten-Bars. Daraus ergeben sich
+die Perioden pro Jahr für die Annualisierung (Sharpe, CAGR). Indikator-Fenster
+und Label-Horizonte sind in Tagen definiert und werden über window()/bars()
+in Bars umgerechnet.
+"""
+
+import re
+
+import pandas as pd
+
+DEFAULT_INTERVAL = "1d"
+
+# Yahoo-Kürzel: 1m, 5m, 1h, 4h, 1d, 1wk
+_UNITS = {"m": "minutes", "h": "hours", "d": "days", "wk": "weeks"}
+
+
+def parse_interval(interval) -> pd.Timedelta:
+    """Bar-Länge für ein Intervall-Kürzel wie "1m", "4h", "1d", "1wk" (oder pd.Timedelta)."""
+    match = re.fullmatch(r"(\d+)(m|h|d|wk)", str(interval))
+    if match:
+        return pd.Timedelta(**{_UNITS[match.group(2)]: int(match.group(1))})
+    return pd.Timedelta(interval)
+
+
+class Timeframe:
+    """
+    Bar-Intervall mit abgeleiteten Grössen.
+
+    Args:
+        interval: Intervall-Kürzel wie "1m", "5m", "1h", "4h", "1d" (default: "1d")
+        days_per_year: Handelstage pro Jahr (default: 365 für Krypto)
+    """
+
+    def __init__(self, interval=DEFAULT_INTERVAL, days_per_year=365):
+        self.interval = interval
+        self.bar = parse_interval(interval)
+        if self.bar <= pd.Timedelta(0):
+            raise ValueError(f"Ungültiges Intervall: {interval}")
+        self.days_per_year = days_per_year
+
+    def __repr__(self):
+        return f"Timeframe({self.interval!r})"
+
+    def __eq__(self, other):
+        return (isinstance(other, Timeframe) and self.bar == other.bar
+                and self.days_per_year == other.days_per_year)
+
+    def __hash__(self):
+        return hash((self.bar, self.days_per_year))
+
+    @property
+    def bars_per_day(self) -> float:
+        return pd.Timedelta(days=1) / self.bar
+
+    @property
+    def periods_per_year(self) -> float:
+        """Anzahl Bars pro Jahr (für Sharpe/Sortino/CAGR)."""
+        return self.days_per_year * self.bars_per_day
+
+    def bars(self, duration) -> int:
+        """Anzahl Bars für eine Dauer wie "5D" oder pd.Timedelta (mindestens 1)."""
+        return max(1, round(pd.Timedelta(duration) / self.bar))
+
+    def window(self, days) -> int:
+        """Rechnet ein in Tagen definiertes Fenster in Bars um (mindestens 1)."""
+        return max(1, round(days * self.bars_per_day))
+
+    @classmethod
+    def from_index(cls, index: pd.DatetimeIndex, days_per_year=365):
+        """Leitet das Intervall aus dem häufigsten Abstand eines DatetimeIndex ab."""
+        if len(index) < 2:
+            raise ValueError("Mindestens zwei Zeitstempel nötig")
+        step = pd.Series(index[1:] - index[:-1]).mode().iloc[0]
+        return cls(step, days_per_year=days_per_year)
+
+
+def get_timeframe(timeframe=None) -> Timeframe:
+    """Wandelt None (default "1d"), ein Intervall-Kürzel oder eine Timeframe in eine Timeframe."""
+    if timeframe is None:
+        return Timeframe(DEFAULT_INTERVAL)
+    if isinstance(timeframe, Timeframe):
+        return timeframe
+    return Timeframe(timeframe)
@@ -8,14 +8,19 @@ from .eval import returns_from_equity, sharpe, max_drawdown, cagr
 def sweep_threshold(df_with_proba, thr_list=None):
     if thr_list is None:
         thr_list = np.round(np.linspace(0.50, 0.70, 9), 2)
+    thr_list = [float(thr) for thr in thr_list]
+    signals = [ml_policy(df_with_proba, p_entry_thr=thr) for thr in thr_list]
+    bt = SimpleBacktester(df_with_proba)
+    equity_matrix = bt.run_batch(
+        pd.DataFrame({i: s["entry_long"] for i, s in enumerate(signals)}),
+        pd.DataFrame({i: s["exit_long"] for i, s in enumerate(signals)})
+    )
     rows = []
-    for thr in thr_list:
-        signals = ml_policy(df_with_proba, p_thr=float(thr))
-        bt = SimpleBacktester(df_with_proba)
-        equity = bt.run(signals)
+    for i, thr in enumerate(thr_list):
+        equity = equity_matrix[i]
         ret = returns_from_equity(equity)
         rows.append({
-            "p_thr": float(thr),
+            "p_thr": thr,
             "Sharpe": round(sharpe(ret), 3),
             "MaxDD%": round(max_drawdown(equity)*100, 2),
             "CAGR%": round(cagr(equity)*100, 2)
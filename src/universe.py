@@ -0,0 +1,134 @@
+"""
+Paralleles Laden und Feature-Berechnung für mehrere Ticker.
+
+Pro Ticker wird in einem eigenen Prozess geladen (OhlcvStore), add_features
+und make_label berechnet. Die Ergebnis-Matrix geht über Shared Memory an den
+Hauptprozess zurück statt gepickelt zu werden; nur Spaltennamen und dtypes
+werden übertragen. Das Ergebnis ist ein am Datum ausgerichtetes Panel mit
+Spalten (Ticker, Feld).
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+import pandas as pd
+
+from src.features import add_features
+from src.label import make_label
+from src.store import get_store
+
+
+def _to_shared(values: np.ndarray):
+    """Kopiert ein Array in einen neuen Shared-Memory-Block."""
+    shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[...] = values
+    name = shm.name
+    shm.close()
+    # Der Hauptprozess übernimmt den Block und gibt ihn frei (_from_shared)
+    resource_tracker.unregister(shm._name, "shared_memory")
+    return name, values.shape, values.dtype.str
+
+
+def _from_shared(name, shape, dtype) -> np.ndarray:
+    """Liest ein Array aus Shared Memory, kopiert es und gibt den Block frei."""
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        return np.ndarray(shape, dtype=dtype, buffer=shm.buf).copy()
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def build_ticker_frame(ticker, store, start="2019-01-01", end=None, interval="1d",
+                       columns=None, fee_buffer=0.0025, forward_days=1) -> pd.DataFrame:
+    """
+    Lädt einen Ticker und berechnet Features und Labels.
+
+    Args:
+        ticker: Ticker-Symbol
+        store: OhlcvStore
+        start, end, interval: Zeitraum und Intervall
+        columns: Feature-Spalten (default: None = alle)
+        fee_buffer, forward_days: wie bei make_label; fee_buffer=None = ohne Labels
+
+    Returns:
+        DataFrame mit OHLCV, Features (und ret_fwd, y)
+    """
+    df = store.load(ticker, interval=interval, start=start, end=end)
+    # Fenster und Label-Horizont sind in Tagen definiert, das Intervall rechnet sie in Bars um
+    feat = add_features(df, columns=columns, timeframe=interval)
+    if fee_buffer is None:
+        return feat
+    return make_label(feat, fee_buffer=fee_buffer, forward_days=forward_days, timeframe=interval)
+
+
+def _worker(ticker, store, kwargs):
+    frame = build_ticker_frame(ticker, store, **kwargs)
+    values = frame.to_numpy(dtype=float)
+    tz = frame.index.tz
+    index = frame.index.tz_convert(None) if tz is not None else frame.index
+    return {
+        "values": _to_shared(values),
+        "index": _to_shared(index.to_numpy()),
+        "tz": str(tz) if tz is not None else None,
+        "columns": list(frame.columns),
+        "dtypes": [str(t) for t in frame.dtypes],
+    }
+
+
+def _collect(result) -> pd.DataFrame:
+    values = _from_shared(*result["values"])
+    index = pd.DatetimeIndex(_from_shared(*result["index"]), name="Date")
+    if result["tz"]:
+        index = index.tz_localize("UTC").tz_convert(result["tz"])
+    frame = pd.DataFrame(values, index=index, columns=result["columns"])
+    return frame.astype(dict(zip(result["columns"], result["dtypes"])))
+
+
+def load_universe(tickers, start="2019-01-01", end=None, interval="1d", columns=None,
+                  fee_buffer=0.0025, forward_days=1, store=None, n_jobs=None, join="outer") -> pd.DataFrame:
+    """
+    Lädt mehrere Ticker parallel und liefert ein ausgerichtetes Panel.
+
+    Args:
+        tickers: Liste von Ticker-Symbolen
+        start, end, interval: Zeitraum und Intervall
+        columns: Feature-Spalten (default: None = alle)
+        fee_buffer, forward_days: wie bei make_label; fee_buffer=None = ohne Labels
+        store: OhlcvStore (default: gemeinsamer Speicher); muss picklebar sein
+        n_jobs: Anzahl Prozesse (default: None = Anzahl CPUs, 1 = ohne Prozess-Pool)
+        join: "outer" (alle Daten) oder "inner" (nur gemeinsame Daten)
+
+    Returns:
+        DataFrame mit MultiIndex-Spalten (Ticker, Feld). Ticker, die nicht
+        geladen werden konnten, fehlen (mit Warnung).
+    """
+    tickers = list(tickers)
+    if not tickers:
+        return pd.DataFrame()
+    store = store if store is not None else get_store()
+    kwargs = dict(start=start, end=end, interval=interval, columns=columns,
+                  fee_buffer=fee_buffer, forward_days=forward_days)
+    n_jobs = n_jobs or os.cpu_count() or 1
+
+    frames = {}
+    if n_jobs == 1:
+        for ticker in tickers:
+            try:
+                frames[ticker] = build_ticker_frame(ticker, store, **kwargs)
+            except Exception as e:
+                print(f"⚠️  {ticker} übersprungen: {e}")
+    else:
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(tickers))) as pool:
+            futures = {ticker: pool.submit(_worker, ticker, store, kwargs) for ticker in tickers}
+            for ticker, future in futures.items():
+                try:
+                    frames[ticker] = _collect(future.result())
+                except Exception as e:
+                    print(f"⚠️  {ticker} übersprungen: {e}")
+
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, axis=1, join=join).sort_index()
@@ -12,22 +12,22 @@ import plotly.express as px
 
 # Projekt
 from src.data import download_eth_1d
-from src.features import add_features
-from src.label import make_label
-from src.model import train_logreg, infer_proba
+from src.cache import get_cache
+from src.model import infer_proba
+from src.registry import get_registry
 from src.policy import ml_policy
 from src.backtest import SimpleBacktester
 from src.eval import returns_from_equity, sharpe, max_drawdown, cagr, sweep_threshold
 from src.trades import compute_trades
-from src.config import P_EXIT_THR
+from src.config import P_EXIT_THR, FEATURES, POLICY_COLUMNS
 
 def main():
     Path("plots").mkdir(parents=True, exist_ok=True)
 
     # 1) Daten + Features + Label
     df = download_eth_1d(start="2019-01-01")
-    feat = add_features(df)
-    lab  = make_label(feat, fee_buffer=0.0025)
+    feat = get_cache().features(df, columns=FEATURES + POLICY_COLUMNS)
+    lab  = get_cache().labeled(df, fee_buffer=0.0025, columns=FEATURES + POLICY_COLUMNS)
 
     # 2) Split
     split_date = "2023-01-01"
@@ -42,7 +42,7 @@ def main():
     from src.config import P_EXIT_THR, ENTRY_THR_GRID
 
     # 3) Modell auf TRAIN fitten
-    model = train_logreg(train)
+    model = get_registry().get_or_train("logreg", train)
 
     # 4) Threshold-Sweep auf VALIDATION (nur Entry, Exit fix)
     val_pred = infer_proba(model, val)
@@ -102,7 +102,7 @@ def main():
             pos = 0
 
     # Kennzahlen
-    s  = round(sharpe(ret, periods=252), 2)
+    s  = round(sharpe(ret), 2)
     dd = round(max_drawdown(equity)*100, 2)
     cg = round(cagr(equity)*100, 2)
 
@@ -3,13 +3,13 @@ Erstellt umfassende Visualisierungen aller Experimente.
 """
 
 from src.data import download_eth_1d
-from src.features import add_features
-from src.label import make_label
-from src.model import train_logreg, train_random_forest, train_gradient_boosting, infer_proba
+from src.cache import get_cache
+from src.model import infer_proba_multi
+from src.registry import get_registry
 from src.policy import ml_policy
 from src.backtest import SimpleBacktester
 from src.eval import returns_from_equity, sharpe, max_drawdown, cagr
-from src.config import P_ENTRY_THR, P_EXIT_THR, FEATURES_BASE, FEATURES_WITH_VOLUME
+from src.config import P_ENTRY_THR, P_EXIT_THR, FEATURES_BASE, FEATURES_WITH_VOLUME, POLICY_COLUMNS
 from pathlib import Path
 import pandas as pd
 import plotly.graph_objects as go
@@ -22,9 +22,8 @@ def create_plots_dir():
     Path("plots").mkdir(parents=True, exist_ok=True)
 
 
-def test_model_with_equity(model_name, model, test, p_entry_thr, p_exit_thr):
-    """Testet Modell und gibt Equity-Kurve zurück."""
-    test_pred = infer_proba(model, test)
+def test_model_with_equity(model_name, test_pred, p_entry_thr, p_exit_thr):
+    """Testet die Prognosen eines Modells (Spalte p_up) und gibt Equity-Kurve zurück."""
     signals_df = ml_policy(test_pred, p_entry_thr=p_entry_thr, p_exit_thr=p_exit_thr)
     signals = signals_df[["entry_long", "exit_long"]].astype(int)
 
@@ -36,7 +35,7 @@ def test_model_with_equity(model_name, model, test, p_entry_thr, p_exit_thr):
         "name": model_name,
         "equity": equity,
         "returns": ret,
-        "sharpe": sharpe(ret, periods=252),
+        "sharpe": sharpe(ret),
         "cagr": cagr(equity) * 100,
         "maxdd": max_drawdown(equity) * 100
     }
@@ -203,11 +202,8 @@ def main():
     # Daten laden
     print("\n[1/4] Lade Daten und bereite vor...")
     df = download_eth_1d(start="2019-01-01")
-    feat = add_features(df, include_volume=False)
-    lab = make_label(feat, fee_buffer=0.0025)
-
-    feat_vol = add_features(df, include_volume=True)
-    lab_vol = make_label(feat_vol, fee_buffer=0.0025)
+    lab = get_cache().labeled(df, fee_buffer=0.0025, columns=FEATURES_BASE + POLICY_COLUMNS)
+    lab_vol = get_cache().labeled(df, fee_buffer=0.0025, columns=FEATURES_WITH_VOLUME + POLICY_COLUMNS)
 
     # Split
     split_date = "2023-01-01"
@@ -220,17 +216,17 @@ def main():
     print("\n[2/4] Erstelle Modell-Vergleich Plots...")
     model_results = []
 
-    print("  -> Trainiere Logistic Regression...")
-    model_lr = train_logreg(train)
-    model_results.append(test_model_with_equity("Logistic Regression", model_lr, test, P_ENTRY_THR, P_EXIT_THR))
-
-    print("  -> Trainiere Random Forest...")
-    model_rf = train_random_forest(train, n_estimators=100, max_depth=10)
-    model_results.append(test_model_with_equity("Random Forest", model_rf, test, P_ENTRY_THR, P_EXIT_THR))
-
-    print("  -> Trainiere Gradient Boosting...")
-    model_gb = train_gradient_boosting(train, n_estimators=100, max_depth=5)
-    model_results.append(test_model_with_equity("Gradient Boosting", model_gb, test, P_ENTRY_THR, P_EXIT_THR))
+    print("  -> Trainiere Logistic Regression, Random Forest, Gradient Boosting...")
+    models = {
+        "Logistic Regression": get_registry().get_or_train("logreg", train),
+        "Random Forest": get_registry().get_or_train("random_forest", train, n_estimators=100, max_depth=10),
+        "Gradient Boosting": get_registry().get_or_train("gradient_boosting", train, n_estimators=100, max_depth=5),
+    }
+    # Eine Feature-Matrix und ein Scaler-Durchlauf für alle Modelle
+    proba = infer_proba_multi(models, test)
+    base = test[["Open", "Close"] + POLICY_COLUMNS]
+    for name in models:
+        model_results.append(test_model_with_equity(name, base.assign(p_up=proba[name]), P_ENTRY_THR, P_EXIT_THR))
 
     plot_model_comparison(model_results)
 
@@ -244,8 +240,10 @@ def main():
     from sklearn.linear_model import LogisticRegression
 
     print("  -> Teste Basis-Features...")
-    model_base = train_logreg(train)
-    feature_results.append(test_model_with_equity("Basis (8 Features)", model_base, test, P_ENTRY_THR, P_EXIT_THR))
+    # Basis-Modell = Logistic Regression aus dem Modell-Vergleich
+    feature_results.append(test_model_with_equity(
+        "Basis (8 Features)", base.assign(p_up=proba["Logistic Regression"]), P_ENTRY_THR, P_EXIT_THR
+    ))
 
     print("  -> Teste mit Volumen-Features...")
     X_train = train_vol[FEATURES_WITH_VOLUME].values
@@ -270,7 +268,7 @@ def main():
         "name": "Mit Volumen (11 Features)",
         "equity": equity_vol,
         "returns": ret_vol,
-        "sharpe": sharpe(ret_vol, periods=252),
+        "sharpe": sharpe(ret_vol),
         "cagr": cagr(equity_vol) * 100,
         "maxdd": max_drawdown(equity_vol) * 100
     })
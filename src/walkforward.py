@@ -0,0 +1,203 @@
+"""
+Walk-Forward-Retraining mit inkrementellen Modell-Updates.
+
+Statt eines festen Splits wird das Modell alle `step` Bars auf einem
+wachsenden (expanding) oder rollenden (rolling) Fenster aktualisiert und
+jeweils auf dem folgenden Block out-of-sample ausgewertet. Im Modus
+"incremental" werden die Scaler-Statistiken (Mittelwert und Summe der
+quadrierten Abweichungen) blockweise fortgeschrieben (neue Zeilen
+hinzufügen, herausfallende entfernen) und ein SGD-Klassifikator per
+partial_fit nur mit den neuen Zeilen aktualisiert. Der Klassifikator kann
+keine Zeilen vergessen: im rollenden Fenster folgt nur der Scaler dem
+Fenster, alte Zeilen verlieren im Modell lediglich über weitere Updates an
+Gewicht (siehe n_seen im Report).
+Der Modus "refit" trainiert zum Vergleich bei jedem Schritt train_logreg
+komplett neu.
+
+Verwendung:
+    python -m src.walkforward
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+
+from src.config import FEATURES
+from src.model import train_logreg
+
+
+class RunningScaler:
+    """
+    Standardisierung mit laufenden Statistiken über ein (rollendes) Fenster.
+
+    Entspricht StandardScaler auf den aktuell enthaltenen Zeilen; Zeilen
+    können blockweise hinzugefügt und wieder entfernt werden. Mittelwert und
+    M2 (Summe der quadrierten Abweichungen) werden nach Chan et al.
+    kombiniert statt über sumsq/n - mean², das bei grossem Mittelwert
+    relativ zur Streuung durch Auslöschung ungenau wird.
+    """
+
+    def __init__(self, n_features):
+        self.n = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+
+    def add(self, X):
+        if len(X) == 0:
+            return
+        n_b = len(X)
+        mean_b = X.mean(axis=0)
+        m2_b = ((X - mean_b) ** 2).sum(axis=0)
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.m2 = self.m2 + m2_b + delta ** 2 * self.n * n_b / n
+        self.mean = self.mean + delta * n_b / n
+        self.n = n
+
+    def remove(self, X):
+        if len(X) == 0:
+            return
+        n_b = len(X)
+        if n_b >= self.n:
+            self.__init__(len(self.mean))
+            return
+        mean_b = X.mean(axis=0)
+        m2_b = ((X - mean_b) ** 2).sum(axis=0)
+        n = self.n - n_b
+        mean = (self.n * self.mean - n_b * mean_b) / n
+        delta = mean_b - mean
+        self.m2 = np.maximum(self.m2 - m2_b - delta ** 2 * n * n_b / self.n, 0.0)
+        self.mean = mean
+        self.n = n
+
+    @property
+    def mean_(self):
+        return self.mean
+
+    @property
+    def scale_(self):
+        std = np.sqrt(self.m2 / self.n)
+        return np.where(std == 0, 1.0, std)
+
+    def transform(self, X):
+        return (X - self.mean_) / self.scale_
+
+
+def make_sgd(random_state=42):
+    """Logistische Regression via SGD (partial_fit-fähig)."""
+    return SGDClassifier(loss="log_loss", alpha=1e-4, random_state=random_state)
+
+
+def walk_forward(df: pd.DataFrame, features=FEATURES, train_size=500, step=30, window="expanding",
+                 mode="incremental", gap=0, initial_epochs=5, epochs=1, estimator=None):
+    """
+    Walk-Forward-Prognose mit periodischem Retraining.
+
+    Args:
+        df: DataFrame mit Features und Label 'y' (z.B. aus make_label)
+        features: Feature-Spalten (default: FEATURES)
+        train_size: Bars im ersten Trainings-Fenster bzw. Länge des rollenden Fensters (default: 500)
+        step: Bars pro Out-of-Sample-Block = Retraining-Intervall (default: 30)
+        window: "expanding" oder "rolling" (default: "expanding")
+        mode: "incremental" (RunningScaler + partial_fit) oder "refit" (train_logreg pro Schritt)
+        gap: Bars zwischen Trainings-Ende und Test-Beginn, z.B. forward_days - 1 (default: 0)
+        initial_epochs: partial_fit-Durchläufe über das erste Fenster (default: 5)
+        epochs: partial_fit-Durchläufe über die neuen Zeilen pro Schritt (default: 1)
+        estimator: Optionaler Klassifikator mit partial_fit (default: make_sgd())
+
+    Returns:
+        Tuple (pred, report):
+        - pred: Out-of-Sample-Zeilen von df mit zusätzlicher Spalte p_up
+        - report: DataFrame pro Schritt mit test_start, test_end, n_train (Zeilen im
+          Trainings-Fenster), n_seen (Zeilen, mit denen das Modell insgesamt trainiert
+          wurde; im Modus "incremental" mit rollendem Fenster grösser als n_train,
+          weil partial_fit nichts vergisst) und fit_seconds
+    """
+    if window not in ("expanding", "rolling"):
+        raise ValueError(f"Unbekanntes Fenster: {window}")
+    if mode not in ("incremental", "refit"):
+        raise ValueError(f"Unbekannter Modus: {mode}")
+
+    X = df[features].to_numpy(dtype=float)
+    y = df["y"].to_numpy()
+    n = len(df)
+    classes = np.array([0, 1])
+
+    clf = estimator if estimator is not None else make_sgd()
+    scaler = RunningScaler(X.shape[1])
+    lo = hi = 0   # Zeilen [lo, hi) sind im Scaler
+    seen = 0      # Zeilen, die der SGD-Klassifikator bisher gesehen hat
+
+    p_up = np.full(n, np.nan)
+    rows = []
+    for test_start in range(train_size + gap, n, step):
+        test_end = min(test_start + step, n)
+        train_end = test_start - gap
+        train_start = max(0, train_end - train_size) if window == "rolling" else 0
+
+        t0 = time.perf_counter()
+        if mode == "refit":
+            model = train_logreg(df.iloc[train_start:train_end], features=features)
+            seen = train_end - train_start
+            p_up[test_start:test_end] = model.predict_proba(X[test_start:test_end])[:, 1]
+        else:
+            new = slice(hi, train_end)
+            scaler.add(X[new])
+            if train_start > lo:
+                scaler.remove(X[lo:train_start])
+            lo, hi = train_start, train_end
+            seen += new.stop - new.start
+
+            passes = initial_epochs if new.start == 0 else epochs
+            Xs = scaler.transform(X[new])
+            for _ in range(passes):
+                clf.partial_fit(Xs, y[new], classes=classes)
+            p_up[test_start:test_end] = clf.predict_proba(scaler.transform(X[test_start:test_end]))[:, 1]
+        fit_seconds = time.perf_counter() - t0
+
+        rows.append({
+            "test_start": df.index[test_start],
+            "test_end": df.index[test_end - 1],
+            "n_train": train_end - train_start,
+            "n_seen": seen,
+            "fit_seconds": fit_seconds,
+        })
+
+    oos = ~np.isnan(p_up)
+    pred = df.loc[oos].copy()
+    pred["p_up"] = p_up[oos]
+    return pred, pd.DataFrame(rows)
+
+
+def main():
+    from src.data import download_ohlcv
+    from src.cache import get_cache
+    from src.policy import ml_policy
+    from src.backtest import SimpleBacktester
+    from src.eval import equity_metrics
+    from src.config import P_ENTRY_THR, P_EXIT_THR, POLICY_COLUMNS, TIMEFRAME
+
+    print("=" * 70)
+    print("WALK-FORWARD RETRAINING")
+    print("=" * 70)
+
+    df = download_ohlcv("ETH-USD", timeframe=TIMEFRAME, start="2019-01-01")
+    lab = get_cache().labeled(df, fee_buffer=0.0025, columns=FEATURES + POLICY_COLUMNS, timeframe=TIMEFRAME)
+
+    for window in ["expanding", "rolling"]:
+        for mode in ["incremental", "refit"]:
+            pred, report = walk_forward(lab, window=window, mode=mode)
+            signals = ml_policy(pred, p_entry_thr=P_ENTRY_THR, p_exit_thr=P_EXIT_THR)
+            equity = SimpleBacktester(pred).run(signals[["entry_long", "exit_long"]].astype(int))
+            metrics = equity_metrics(equity, timeframe=TIMEFRAME).iloc[0]
+            print(f"\n{window:9s} / {mode:11s}: {len(report)} Schritte, "
+                  f"Fit-Zeit {report['fit_seconds'].sum() * 1000:.1f} ms "
+                  f"(Ø {report['fit_seconds'].mean() * 1000:.2f} ms/Schritt)")
+            print(f"  Sharpe: {metrics['sharpe']:.3f} | CAGR: {metrics['cagr'] * 100:.2f}% | "
+                  f"MaxDD: {metrics['maxdd'] * 100:.2f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""Gemeinsame Test-Daten für die Test-Module."""
+
+import numpy as np
+import pandas as pd
+
+
+def make_ohlcv(n=600, seed=0):
+    """Synthetische OHLCV-Daten (Random Walk)."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, n)))
+    return pd.DataFrame({
+        "Open": close * np.exp(rng.normal(0, 0.01, n)),
+        "High": close * (1 + rng.uniform(0.0, 0.04, n)),
+        "Low": close * (1 - rng.uniform(0.0, 0.04, n)),
+        "Close": close,
+        "Volume": rng.integers(1000, 5000, n).astype(float)
+    }, index=pd.date_range("2019-01-01", periods=n, freq="D"))
@@ -1,7 +1,7 @@
 import unittest
 import pandas as pd
 import numpy as np
-from src.backtest import SimpleBacktester
+from src.backtest import SimpleBacktester, LongShortBacktester
 
 
 class TestSimpleBacktester(unittest.TestCase):
@@ -171,5 +171,131 @@ class TestSimpleBacktester(unittest.TestCase):
         self.assertGreater(equity.iloc[-1], 1.0)
 
 
+class TestNumpyEngine(unittest.TestCase):
+    """Vergleicht die vektorisierte Engine mit dem Referenz-Loop."""
+
+    def make_random(self, n=400, seed=0):
+        rng = np.random.default_rng(seed)
+        dates = pd.date_range("2020-01-01", periods=n, freq="D")
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, n)))
+        df = pd.DataFrame({
+            "Open": close * np.exp(rng.normal(0, 0.01, n)),
+            "High": close * 1.02,
+            "Low": close * 0.98,
+            "Close": close,
+            "Volume": [1000] * n
+        }, index=dates)
+        signals = pd.DataFrame({
+            "entry_long": rng.random(n) < 0.15,
+            "exit_long": rng.random(n) < 0.2
+        }, index=dates)
+        return df, signals
+
+    def test_matches_loop_exactly(self):
+        for seed in range(5):
+            df, signals = self.make_random(seed=seed)
+            bt = SimpleBacktester(df, fees_bps=20, slippage_bps=5)
+            ref = bt.run(signals, engine="loop")
+            fast = bt.run(signals, engine="numpy")
+            np.testing.assert_array_equal(fast.values, ref.values)
+            self.assertTrue(fast.index.equals(ref.index))
+
+    def test_int_signals_and_same_bar_exit(self):
+        """Entry und Exit am selben Signal-Tag → Round-Trip am nächsten Open."""
+        df, _ = self.make_random(n=6)
+        signals = pd.DataFrame({
+            "entry_long": [0, 1, 0, 0, 1, 0],
+            "exit_long": [0, 1, 0, 0, 0, 0]
+        }, index=df.index)
+        bt = SimpleBacktester(df)
+        np.testing.assert_array_equal(
+            bt.run(signals, engine="numpy").values,
+            bt.run(signals, engine="loop").values
+        )
+
+    def test_unknown_engine(self):
+        df, signals = self.make_random(n=10)
+        with self.assertRaises(ValueError):
+            SimpleBacktester(df).run(signals, engine="numba")
+
+
+class TestLongShortNumpyEngine(unittest.TestCase):
+    """Vergleicht die vektorisierte Long/Short-Engine mit dem Referenz-Loop."""
+
+    def make_random(self, n=400, seed=0, p_long=0.2, p_short=0.2):
+        rng = np.random.default_rng(seed)
+        dates = pd.date_range("2020-01-01", periods=n, freq="D")
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, n)))
+        df = pd.DataFrame({
+            "Open": close * np.exp(rng.normal(0, 0.01, n)),
+            "Close": close
+        }, index=dates)
+        entry_long = rng.random(n) < p_long
+        entry_short = rng.random(n) < p_short
+        signals = pd.DataFrame({
+            "entry_long": entry_long,
+            "entry_short": entry_short,
+            "exit_long": entry_short,
+            "exit_short": entry_long
+        }, index=dates)
+        return df, signals
+
+    def test_matches_loop(self):
+        for seed in range(5):
+            df, signals = self.make_random(seed=seed)
+            bt = LongShortBacktester(df, fees_bps=20, slippage_bps=5)
+            ref = bt.run(signals, engine="loop")
+            fast = bt.run(signals, engine="numpy")
+            np.testing.assert_allclose(fast.values, ref.values, rtol=1e-12)
+
+    def test_simultaneous_signals_toggle(self):
+        """Long- und Short-Signal gleichzeitig → Position wird gewechselt."""
+        df, signals = self.make_random(n=300, seed=7, p_long=0.6, p_short=0.6)
+        bt = LongShortBacktester(df)
+        np.testing.assert_allclose(
+            bt.run(signals, engine="numpy").values,
+            bt.run(signals, engine="loop").values,
+            rtol=1e-12
+        )
+
+    def test_flat_until_first_signal(self):
+        df, signals = self.make_random(n=10, p_long=0.0, p_short=0.0)
+        equity = LongShortBacktester(df).run(signals)
+        np.testing.assert_array_equal(equity.values, np.ones(10))
+
+
+class TestRunBatch(unittest.TestCase):
+    """Batch-Backtests müssen spaltenweise mit run() übereinstimmen."""
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        n, k = 300, 12
+        dates = pd.date_range("2021-01-01", periods=n, freq="D")
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, n)))
+        self.df = pd.DataFrame({"Open": close * 1.001, "Close": close}, index=dates)
+        self.entry = pd.DataFrame(rng.random((n, k)) < 0.2, index=dates)
+        self.exit = pd.DataFrame(rng.random((n, k)) < 0.2, index=dates)
+
+    def test_long_only_batch_matches_run(self):
+        bt = SimpleBacktester(self.df)
+        batch = bt.run_batch(self.entry, self.exit)
+        self.assertEqual(batch.shape, self.entry.shape)
+        for col in self.entry.columns:
+            signals = pd.DataFrame({"entry_long": self.entry[col], "exit_long": self.exit[col]})
+            np.testing.assert_array_equal(batch[col].values, bt.run(signals).values)
+
+    def test_long_short_batch_matches_run(self):
+        bt = LongShortBacktester(self.df)
+        batch = bt.run_batch(self.entry.values, self.exit.values)
+        for col in self.entry.columns:
+            signals = pd.DataFrame({"entry_long": self.entry[col], "entry_short": self.exit[col]})
+            np.testing.assert_array_equal(batch[col].values, bt.run(signals).values)
+
+    def test_shape_mismatch(self):
+        bt = SimpleBacktester(self.df)
+        with self.assertRaises(ValueError):
+            bt.run_batch(self.entry.values, self.exit.values[:, :3])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,107 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+import pandas as pd
+from src.cache import FeatureCache
+from src.features import add_features
+from src.label import make_label
+from tests.helpers import make_ohlcv
+
+COLUMNS = ["ema200", "rsi14", "atr_pct", "vol_ratio", "regime_bull"]
+
+
+class TestFeatureCache(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = FeatureCache(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def manifest(self):
+        with open(f"{self.tmp.name}/manifest.json", encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_hit_returns_same_frame(self):
+        df = make_ohlcv(n=500)
+        first = self.cache.labeled(df, fee_buffer=0.0025, columns=COLUMNS)
+        second = self.cache.labeled(df, fee_buffer=0.0025, columns=COLUMNS)
+        ref = make_label(add_features(df, columns=COLUMNS), fee_buffer=0.0025)
+        pd.testing.assert_frame_equal(first, ref, check_freq=False)
+        pd.testing.assert_frame_equal(second, ref, check_freq=False)
+        self.assertEqual(len(self.manifest()), 2)  # Features + Labels
+
+    def test_label_params_are_part_of_key(self):
+        df = make_ohlcv(n=400)
+        one = self.cache.labeled(df, forward_days=1, columns=COLUMNS)
+        five = self.cache.labeled(df, forward_days=5, columns=COLUMNS)
+        self.assertEqual(len(one) - len(five), 4)
+
+    def test_incremental_extension(self):
+        df = make_ohlcv(n=600)
+        self.cache.features(df.iloc[:500], columns=COLUMNS)
+
+        # Letzter Bar revidiert + neue Bars angehängt
+        revised = df.iloc[:560].copy()
+        extended = self.cache.features(revised, columns=COLUMNS)
+        ref = add_features(revised, columns=COLUMNS)
+        pd.testing.assert_frame_equal(extended, ref, rtol=1e-9, check_freq=False)
+        self.assertTrue(any(e["state"] for e in self.manifest().values()))
+
+        # Zweite Erweiterung nutzt den gespeicherten Engine-Zustand
+        extended = self.cache.features(df, columns=COLUMNS)
+        pd.testing.assert_frame_equal(extended, add_features(df, columns=COLUMNS),
+                                      rtol=1e-9, check_freq=False)
+
+    def test_lru_eviction(self):
+        cache = FeatureCache(self.tmp.name, max_entries=2)
+        df = make_ohlcv(n=300)
+        for n in [250, 260, 270]:
+            cache.features(df.iloc[:n] * 1.0 + n, columns=["ema50"])
+        manifest = self.manifest()
+        self.assertEqual(len(manifest), 2)
+        self.assertEqual(sorted(e["n_bars"] for e in manifest.values()), [260, 270])
+
+    def test_read_does_not_rewrite_manifest(self):
+        df = make_ohlcv(n=300)
+        self.cache.features(df, columns=COLUMNS)
+        before = os.stat(f"{self.tmp.name}/manifest.json").st_mtime_ns
+        self.cache.features(df, columns=COLUMNS)
+        self.assertEqual(os.stat(f"{self.tmp.name}/manifest.json").st_mtime_ns, before)
+
+    def test_lru_counts_reads(self):
+        cache = FeatureCache(self.tmp.name, max_entries=2)
+        df = make_ohlcv(n=300)
+        frames = [df.iloc[:n] * 1.0 + n for n in [250, 260, 270]]
+        cache.features(frames[0], columns=["ema50"])
+        cache.features(frames[1], columns=["ema50"])
+        time.sleep(0.01)
+        cache.features(frames[0], columns=["ema50"])   # Treffer -> zuletzt genutzt
+        cache.features(frames[2], columns=["ema50"])
+        self.assertEqual(sorted(e["n_bars"] for e in self.manifest().values()), [250, 270])
+
+    def test_timeframe_is_part_of_key(self):
+        df = make_ohlcv(n=600)
+        df.index = pd.date_range("2019-01-01", periods=len(df), freq="h")
+        daily = self.cache.features(df, columns=["rsi14"])
+        hourly = self.cache.features(df, columns=["rsi14"], timeframe="1h")
+        self.assertEqual(len(self.manifest()), 2)
+        pd.testing.assert_frame_equal(hourly, add_features(df, columns=["rsi14"], timeframe="1h"),
+                                      check_freq=False)
+        self.assertGreater(len(daily), len(hourly))
+
+    def test_incremental_extension_with_timeframe(self):
+        df = make_ohlcv(n=900)
+        df.index = pd.date_range("2019-01-01", periods=len(df), freq="12h")
+        self.cache.features(df.iloc[:800], columns=COLUMNS, timeframe="12h")
+        extended = self.cache.features(df, columns=COLUMNS, timeframe="12h")
+        pd.testing.assert_frame_equal(extended, add_features(df, columns=COLUMNS, timeframe="12h"),
+                                      rtol=1e-9, check_freq=False)
+        self.assertTrue(any(e["state"] for e in self.manifest().values()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+from src.compiled import LinearPredictor, TreeEnsemblePredictor, compile_model, load_predictor
+from src.config import FEATURES
+from src.features import add_features
+from src.label import make_label
+from src.model import infer_proba, train_gradient_boosting, train_logreg, train_random_forest
+from tests.helpers import make_ohlcv
+
+
+class TestLinearPredictor(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.lab = make_label(add_features(make_ohlcv(n=600, seed=12)))
+        cls.model = train_logreg(cls.lab.iloc[:300])
+        cls.predictor = compile_model(cls.model)
+
+    def test_matches_pipeline_for_batch_and_single_row(self):
+        test = self.lab.iloc[300:]
+        ref = infer_proba(self.model, test)["p_up"].to_numpy()
+        X = test[FEATURES].to_numpy()
+        np.testing.assert_allclose(self.predictor.predict_proba(X), ref, rtol=1e-10)
+
+        p = self.predictor.predict_proba(X[-1])
+        self.assertIsInstance(p, float)
+        self.assertAlmostEqual(p, ref[-1], places=12)
+        self.assertAlmostEqual(self.predictor.predict_row(test.iloc[-1]), ref[-1], places=12)
+        self.assertAlmostEqual(self.predictor.predict_row(test.iloc[-1].to_dict()), ref[-1], places=12)
+
+    def test_extreme_scores_stay_finite(self):
+        p = LinearPredictor(np.ones(2), 0.0, ["a", "b"]).predict_proba(np.array([[1e4, 1e4], [-1e4, -1e4]]))
+        np.testing.assert_array_equal(p, [1.0, 0.0])
+
+    def test_non_linear_model_is_rejected(self):
+        model = train_random_forest(self.lab.iloc[:300], n_estimators=5, max_depth=2, n_jobs=1)
+        with self.assertRaises(TypeError):
+            LinearPredictor.from_pipeline(model)
+
+
+class TestTreeEnsemblePredictor(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        lab = make_label(add_features(make_ohlcv(n=600, seed=13)))
+        cls.train, cls.test = lab.iloc[:300], lab.iloc[300:]
+        cls.models = {
+            "random_forest": train_random_forest(cls.train, n_estimators=20, max_depth=6, n_jobs=1),
+            "gradient_boosting": train_gradient_boosting(cls.train, n_estimators=30, max_depth=3),
+        }
+
+    def test_matches_predict_proba(self):
+        X = self.test[FEATURES].to_numpy()
+        for name, model in self.models.items():
+            predictor = compile_model(model)
+            self.assertIsInstance(predictor, TreeEnsemblePredictor)
+            ref = model.predict_proba(X)[:, 1]
+            np.testing.assert_allclose(predictor.predict_proba(X), ref, atol=1e-12, err_msg=name)
+            # Kleine Chunks ändern nichts am Ergebnis
+            np.testing.assert_array_equal(predictor.leaves(X, chunk_size=7), predictor.leaves(X))
+            self.assertAlmostEqual(predictor.predict_row(self.test.iloc[0]), ref[0], places=12)
+
+    def test_bundle_loads_without_sklearn(self):
+        X = self.test[FEATURES].to_numpy()
+        models = {**self.models, "logreg": train_logreg(self.train)}
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, model in models.items():
+                path = os.path.join(tmp, f"{name}.npz")
+                compile_model(model).save(path)
+                ref = model.predict_proba(X)[:, 1]
+                np.testing.assert_allclose(load_predictor(path).predict_proba(X), ref, atol=1e-12, err_msg=name)
+                np.save(os.path.join(tmp, f"{name}_ref.npy"), ref)
+            np.save(os.path.join(tmp, "X.npy"), X)
+
+            # Frischer Prozess, in dem jeder sklearn-Import fehlschlägt
+            script = (
+                "import sys; sys.modules['sklearn'] = None\n"
+                "import numpy as np\n"
+                "from src.compiled import load_predictor\n"
+                f"X = np.load({os.path.join(tmp, 'X.npy')!r})\n"
+                "for name in ['logreg', 'random_forest', 'gradient_boosting']:\n"
+                f"    p = load_predictor({tmp!r} + f'/{{name}}.npz')\n"
+                f"    ref = np.load({tmp!r} + f'/{{name}}_ref.npy')\n"
+                "    np.testing.assert_allclose(p.predict_proba(X), ref, atol=1e-12)\n"
+            )
+            root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+            result = subprocess.run([sys.executable, "-c", script], cwd=root, capture_output=True, text=True)
+            self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
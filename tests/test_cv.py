@@ -0,0 +1,63 @@
+import unittest
+
+import pandas as pd
+
+from src.cv import cross_validate, evaluate_fold, run_folds, walk_forward_folds, worker_params
+from src.features import add_features
+from src.label import make_label
+from src.rules import RuleSet
+from tests.helpers import make_ohlcv
+
+
+class TestCrossValidate(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.lab = make_label(add_features(make_ohlcv(n=1000, seed=11)))
+
+    def test_folds_are_walk_forward(self):
+        folds = walk_forward_folds(600, n_folds=4, test_size=100, train_size=150, gap=2)
+        self.assertEqual([f[1].start for f in folds], [200, 300, 400, 500])
+        self.assertEqual(folds[-1][1].stop, 600)
+        for train, test in folds:
+            self.assertEqual(train.stop, test.start - 2)
+            self.assertLessEqual(train.stop - train.start, 150)
+
+    def test_parallel_matches_sequential(self):
+        folds = walk_forward_folds(len(self.lab), n_folds=3)
+        seq, _ = cross_validate(self.lab, folds=folds, n_jobs=1)
+        par, summary = cross_validate(self.lab, folds=folds, n_jobs=2)
+        cols = ["test_start", "n_train", "sharpe", "cagr", "maxdd", "trades"]
+        pd.testing.assert_frame_equal(par[cols], seq[cols])
+        self.assertAlmostEqual(summary["sharpe"], seq["sharpe"].mean())
+
+        # Einzelner Fold direkt
+        row = evaluate_fold(self.lab, folds[0])
+        self.assertAlmostEqual(row["sharpe"], seq["sharpe"].iloc[0])
+
+    def test_random_forest_runs_single_threaded_in_workers(self):
+        folds = walk_forward_folds(len(self.lab), n_folds=2)
+        kwargs = dict(model_type="random_forest",
+                      params=worker_params("random_forest", {"n_estimators": 10, "max_depth": 3}),
+                      return_model=True)
+        rows = list(run_folds(self.lab, [(fold, kwargs) for fold in folds], n_jobs=2))
+        self.assertEqual(len(rows), 2)
+        for row in rows:
+            self.assertEqual(row["model"][-1].n_jobs, 1)
+            self.assertEqual(row["model"][-1].n_estimators, 10)
+
+    def test_rules_reach_policy_and_backtest(self):
+        folds = walk_forward_folds(len(self.lab), n_folds=2)
+        # vol_ratio ist weder Feature noch Policy-Spalte: muss für die Regel in den Worker-Frame
+        rules = RuleSet([("ATR_pct < 1.5", "skip"), ("vol_ratio > 1.2", "half_position"),
+                         ("after_loss", "cooldown_2bars")])
+        seq, _ = cross_validate(self.lab, folds=folds, n_jobs=1, rules=rules)
+        par, _ = cross_validate(self.lab, folds=folds, n_jobs=2, rules=rules)
+        plain, _ = cross_validate(self.lab, folds=folds, n_jobs=1)
+        cols = ["sharpe", "cagr", "maxdd", "trades"]
+        pd.testing.assert_frame_equal(par[cols], seq[cols])
+        self.assertFalse(seq[cols].equals(plain[cols]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+import unittest
+import pandas as pd
+import numpy as np
+from src.backtest import SimpleBacktester
+from src.eval import (
+    returns_from_equity, sharpe, max_drawdown, cagr,
+    equity_metrics, sweep_threshold, sweep_threshold_exhaustive
+)
+
+
+def make_pred_frame(n=400, seed=0):
+    """Synthetische Preis-/Feature-Daten mit p_up-Prognose."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, n)))
+    return pd.DataFrame({
+        "Open": close * np.exp(rng.normal(0, 0.01, n)),
+        "Close": close,
+        "p_up": rng.random(n).round(2),
+        "atr_pct": rng.uniform(0, 7, n),
+        "ema50": close * rng.uniform(0.9, 1.1, n),
+        "rsi14": rng.uniform(20, 80, n)
+    }, index=pd.date_range("2021-01-01", periods=n, freq="D"))
+
+
+class TestExhaustiveSweep(unittest.TestCase):
+
+    def test_walk_matches_batch_backtests(self):
+        """Inkrementeller Durchlauf == ein vollständiger Backtest pro Threshold."""
+        from src.rules import RuleSet
+
+        skip_only = RuleSet([("ATR_pct < 1.5", "skip"), ("rsi14 > 75", "skip")])
+        for seed in range(4):
+            df = make_pred_frame(n=300, seed=seed)
+            if seed % 2:
+                df["p_up"] = np.random.default_rng(seed).random(len(df))   # alle Werte distinkt
+            for p_exit, rules in [(0.2, None), (0.45, None), (0.3, skip_only)]:
+                walk = sweep_threshold_exhaustive(df, p_exit_thr=p_exit, rules=rules)
+                batch = sweep_threshold_exhaustive(df, p_exit_thr=p_exit, rules=rules, engine="batch")
+                np.testing.assert_array_equal(walk["p_entry_thr"], batch["p_entry_thr"])
+                np.testing.assert_array_equal(walk["n_entries"], batch["n_entries"])
+                for col in ("sharpe", "cagr", "maxdd"):
+                    np.testing.assert_allclose(walk[col], batch[col], rtol=1e-9, atol=1e-12)
+
+    def test_matches_grid_sweep(self):
+        df = make_pred_frame()
+        exact = sweep_threshold_exhaustive(df, p_exit_thr=0.3, chunk_size=16)
+        self.assertTrue(exact["p_entry_thr"].is_monotonic_increasing)
+
+        thresholds = exact["p_entry_thr"].iloc[1::7].tolist()
+        grid = sweep_threshold(df, thresholds, p_exit_thr=0.3).set_index("p_entry_thr")
+        exact = exact.set_index("p_entry_thr")
+        for t in thresholds:
+            self.assertAlmostEqual(exact.loc[t, "sharpe"], grid.loc[t, "sharpe"], places=10)
+            self.assertAlmostEqual(exact.loc[t, "cagr"], grid.loc[t, "cagr"], places=10)
+            self.assertAlmostEqual(exact.loc[t, "maxdd"], grid.loc[t, "maxdd"], places=10)
+
+    def test_grid_points_fall_on_frontier(self):
+        """Ein beliebiger Grid-Threshold entspricht dem nächstkleineren Frontier-Punkt."""
+        df = make_pred_frame(seed=1)
+        exact = sweep_threshold_exhaustive(df)
+        grid = sweep_threshold(df, [0.555]).iloc[0]
+        row = exact[exact["p_entry_thr"] <= 0.555].iloc[-1]
+        self.assertAlmostEqual(row["sharpe"], grid["sharpe"], places=10)
+
+
+class TestEquityMetrics(unittest.TestCase):
+
+    def test_matches_single_curve_functions(self):
+        rng = np.random.default_rng(5)
+        equity = pd.DataFrame(
+            np.exp(np.cumsum(rng.normal(0, 0.02, (300, 4)), axis=0)),
+            index=pd.date_range("2021-01-01", periods=300, freq="D")
+        )
+        metrics = equity_metrics(equity)
+        self.assertEqual(list(metrics.index), list(equity.columns))
+        for col in equity.columns:
+            ret = returns_from_equity(equity[col])
+            self.assertAlmostEqual(metrics.loc[col, "sharpe"], sharpe(ret), places=10)
+            self.assertAlmostEqual(metrics.loc[col, "cagr"], cagr(equity[col]), places=10)
+            self.assertAlmostEqual(metrics.loc[col, "maxdd"], max_drawdown(equity[col]), places=10)
+        self.assertTrue(metrics["trades"].isna().all())
+
+    def test_trades_and_win_rate(self):
+        """Zwei Trades: einer mit Gewinn, einer mit Verlust."""
+        dates = pd.date_range("2023-01-01", periods=8, freq="D")
+        df = pd.DataFrame({
+            "Open":  [100, 100, 110, 110, 110, 110, 100, 100],
+            "Close": [100, 105, 110, 110, 110, 105, 100, 100]
+        }, index=dates)
+        entry = np.array([1, 0, 0, 0, 1, 0, 0, 0], dtype=bool)
+        exit_ = np.array([0, 1, 0, 0, 0, 1, 0, 0], dtype=bool)
+
+        equity, position = SimpleBacktester(df, fees_bps=0, slippage_bps=0).run_batch(
+            entry[:, None], exit_[:, None], return_positions=True
+        )
+        metrics = equity_metrics(equity, position).iloc[0]
+        self.assertEqual(metrics["trades"], 2)
+        self.assertAlmostEqual(metrics["win_rate"], 0.5)
+        self.assertAlmostEqual(metrics["exposure"], 2 / 8)
+
+    def test_same_bar_round_trip_is_not_counted_as_trade(self):
+        """Entry und Exit am selben Bar: Verlust in der Equity, aber kein Trade in der Position."""
+        dates = pd.date_range("2023-01-01", periods=5, freq="D")
+        df = pd.DataFrame({"Open": [100.0] * 5, "Close": [100.0] * 5}, index=dates)
+        signal = np.array([0, 1, 0, 0, 0], dtype=bool)
+
+        equity, position = SimpleBacktester(df).run_batch(signal[:, None], signal[:, None],
+                                                          return_positions=True)
+        self.assertFalse(position.to_numpy().any())
+        self.assertLess(equity.iloc[-1, 0], 1.0)
+        metrics = equity_metrics(equity, position).iloc[0]
+        self.assertEqual(metrics["trades"], 0)
+        self.assertTrue(np.isnan(metrics["win_rate"]))
+        self.assertEqual(metrics["exposure"], 0)
+        self.assertLess(metrics["cagr"], 0)
+
+    def test_trade_starting_at_first_bar(self):
+        """Trade ab Bar 0 nutzt 1.0 als Basis, nicht den letzten Bar."""
+        equity = np.array([1.05, 1.1, 1.1, 1.5])
+        position = np.array([1, 1, 0, 1])
+        metrics = equity_metrics(equity, position).iloc[0]
+        self.assertEqual(metrics["trades"], 2)
+        self.assertAlmostEqual(metrics["win_rate"], 1.0)
+
+    def test_flat_equity(self):
+        metrics = equity_metrics(pd.Series(np.ones(10), name="flat"))
+        self.assertEqual(metrics.loc["flat", "sharpe"], 0.0)
+        self.assertEqual(metrics.loc["flat", "calmar"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
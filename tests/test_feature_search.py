@@ -0,0 +1,66 @@
+import unittest
+
+from src.backtest import SimpleBacktester
+from src.config import FEATURES_WITH_VOLUME
+from src.eval import equity_metrics
+from src.feature_search import feature_subset_search
+from src.features import add_features
+from src.label import make_label
+from src.policy import ml_policy
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from tests.helpers import make_ohlcv
+
+CANDIDATES = ["rsi14", "macd_diff", "atr_pct", "ret1", "mfi"]
+
+
+def reference_metrics(train, val, features):
+    """Pipeline wie train_logreg auf einer Teilmenge, bewertet wie ml_policy + run."""
+    model = Pipeline([("scaler", StandardScaler()), ("clf", LogisticRegression(max_iter=300))])
+    model.fit(train[features].to_numpy(), train["y"].to_numpy())
+    pred = val.copy()
+    pred["p_up"] = model.predict_proba(val[features].to_numpy())[:, 1]
+    signals = ml_policy(pred, p_entry_thr=0.55, p_exit_thr=0.1)
+    equity = SimpleBacktester(pred).run(signals[["entry_long", "exit_long"]].astype(int))
+    return equity_metrics(equity).iloc[0]
+
+
+class TestFeatureSubsetSearch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        lab = make_label(add_features(make_ohlcv(n=900, seed=16), include_volume=True))
+        cls.train, cls.val = lab.iloc[:450], lab.iloc[450:]
+
+    def test_exhaustive_covers_all_subsets_and_matches_pipeline(self):
+        ranking = feature_subset_search(self.train, self.val, CANDIDATES, n_jobs=1)
+        self.assertEqual(len(ranking), 2 ** len(CANDIDATES) - 1)
+        self.assertEqual(len(set(ranking["features"])), len(ranking))
+        self.assertTrue(ranking["sharpe"].is_monotonic_decreasing)
+
+        for features in [("rsi14",), ("macd_diff", "atr_pct", "mfi"), tuple(CANDIDATES)]:
+            row = ranking[ranking["features"] == features].iloc[0]
+            ref = reference_metrics(self.train, self.val, list(features))
+            self.assertAlmostEqual(row["sharpe"], ref["sharpe"], places=4)
+            self.assertAlmostEqual(row["maxdd"], ref["maxdd"], places=4)
+
+    def test_beam_and_parallel(self):
+        seq = feature_subset_search(self.train, self.val, FEATURES_WITH_VOLUME, mode="beam",
+                                    beam_width=2, max_features=3, n_jobs=1)
+        k = len(FEATURES_WITH_VOLUME)
+        self.assertEqual((seq["n_features"] == 1).sum(), k)
+        self.assertLessEqual((seq["n_features"] == 2).sum(), 2 * (k - 1))
+        self.assertEqual(seq["n_features"].max(), 3)
+
+        par = feature_subset_search(self.train, self.val, FEATURES_WITH_VOLUME, mode="beam",
+                                    beam_width=2, max_features=3, n_jobs=2)
+        self.assertEqual(list(par["features"]), list(seq["features"]))
+        self.assertEqual(list(par["sharpe"]), list(seq["sharpe"]))
+
+        with self.assertRaises(ValueError):
+            feature_subset_search(self.train, self.val, CANDIDATES, mode="greedy")
+
+
+if __name__ == "__main__":
+    unittest.main()
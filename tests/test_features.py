@@ -0,0 +1,77 @@
+import unittest
+import pandas as pd
+import numpy as np
+from src import indicators
+from src.features import add_features, resolve_features
+from tests.helpers import make_ohlcv
+
+
+class TestNumpyIndicatorEngine(unittest.TestCase):
+    """Die NumPy-Kernels müssen die ta-Ergebnisse reproduzieren."""
+
+    def test_matches_ta_engine(self):
+        for seed in range(3):
+            df = make_ohlcv(n=1500, seed=seed)
+            ref = add_features(df, engine="ta")
+            fast = add_features(df, engine="numpy")
+            self.assertTrue(fast.index.equals(ref.index))
+            self.assertEqual(list(fast.columns), list(ref.columns))
+            for col in ref.columns:
+                np.testing.assert_allclose(fast[col], ref[col], rtol=1e-8, atol=1e-10, err_msg=col)
+
+    def test_without_volume(self):
+        df = make_ohlcv(n=400)
+        ref = add_features(df, include_volume=False, engine="ta")
+        fast = add_features(df, include_volume=False)
+        self.assertNotIn("obv", fast.columns)
+        pd.testing.assert_frame_equal(fast, ref, rtol=1e-8, atol=1e-10)
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            add_features(make_ohlcv(n=50), engine="talib")
+
+    def test_ewm_kernels_skip_nan_gaps(self):
+        """NaN-Lücken im Close: EMA/RSI/MACD wie ta, ewm_mean wie pandas."""
+        import ta
+
+        close = make_ohlcv(n=300, seed=4)["Close"].reset_index(drop=True)
+        close[[0, 1, 120, 299]] = np.nan
+        close[50:57] = np.nan
+        c = close.to_numpy()
+        np.testing.assert_allclose(indicators.ema(c, 50), ta.trend.EMAIndicator(close, 50).ema_indicator(),
+                                   rtol=1e-10)
+        np.testing.assert_allclose(indicators.rsi(c, 14), ta.momentum.RSIIndicator(close, 14).rsi(), rtol=1e-9)
+        np.testing.assert_allclose(indicators.macd_diff(c), ta.trend.MACD(close).macd_diff(),
+                                   rtol=1e-8, atol=1e-12)
+        np.testing.assert_allclose(indicators.ewm_mean(c, 20), close.ewm(span=20).mean(), rtol=1e-10)
+
+
+class TestSelectiveFeatures(unittest.TestCase):
+    """Nur angeforderte Spalten und ihre Voraussetzungen werden berechnet."""
+
+    def test_resolve_order(self):
+        nodes = resolve_features(["atr_pct", "regime_bull"])
+        self.assertLess(nodes.index("_tr"), nodes.index("atr"))
+        self.assertLess(nodes.index("atr"), nodes.index("atr_pct"))
+        self.assertLess(nodes.index("ema200"), nodes.index("regime_bull"))
+        self.assertNotIn("rsi14", nodes)
+
+    def test_subset_matches_full_computation(self):
+        df = make_ohlcv(n=500)
+        full = add_features(df)
+        for engine in ["numpy", "ta"]:
+            subset = add_features(df, engine=engine, columns=["ema200", "vol_ratio"])
+            self.assertEqual(
+                list(subset.columns),
+                list(df.columns) + ["ema200", "vol_sma20", "vol_ratio"]
+            )
+            self.assertTrue(subset.index.equals(full.index))
+            np.testing.assert_allclose(subset["vol_ratio"], full["vol_ratio"])
+
+    def test_unknown_feature(self):
+        with self.assertRaises(ValueError):
+            add_features(make_ohlcv(n=50), columns=["ema999"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.features import add_features
+from src.ingest import aggregate_trades, ingest_trades, write_trades_binary
+
+
+def make_trades(n=20_000, days=3, seed=0):
+    """Synthetische Trades (ms-Zeitstempel, zeitlich sortiert)."""
+    rng = np.random.default_rng(seed)
+    ts_ms = np.sort(rng.integers(0, days * 86_400_000, n))
+    price = 2000 * np.exp(np.cumsum(rng.normal(0, 1e-3, n)))
+    size = rng.exponential(0.5, n)
+    return pd.DataFrame({"timestamp": ts_ms, "price": price, "amount": size})
+
+
+def reference_bars(trades, interval):
+    """OHLCV per pandas resample als Referenz."""
+    s = trades.set_index(pd.to_datetime(trades["timestamp"], unit="ms"))
+    bars = pd.DataFrame({
+        "Open": s["price"].resample(interval).first(),
+        "High": s["price"].resample(interval).max(),
+        "Low": s["price"].resample(interval).min(),
+        "Close": s["price"].resample(interval).last(),
+        "Volume": s["amount"].resample(interval).sum(),
+    }).dropna()
+    bars.index.name = "Date"
+    return bars
+
+
+class TestIngest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.trades = make_trades()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def assert_bars_equal(self, bars, ref):
+        np.testing.assert_array_equal(bars.index.as_unit("ns").asi8, ref.index.as_unit("ns").asi8)
+        for col in ["Open", "High", "Low", "Close", "Volume"]:
+            # Summen in anderer Reihenfolge → Rundung
+            np.testing.assert_allclose(bars[col], ref[col], rtol=1e-12, err_msg=col)
+
+    def test_csv_chunks_match_resample(self):
+        path = os.path.join(self.tmp.name, "trades.csv")
+        self.trades.to_csv(path, index=False)
+        self.trades = pd.read_csv(path)
+        for interval in ["1min", "1h", "4h", "1D"]:
+            bars = ingest_trades(path, interval=interval, chunk_size=777)
+            self.assert_bars_equal(bars, reference_bars(self.trades, interval))
+
+    def test_out_of_order_chunks(self):
+        # Trades gemischt: Chunks überlappen zeitlich beliebig
+        shuffled = self.trades.sample(frac=1.0, random_state=1)
+        ts_ns = shuffled["timestamp"].to_numpy() * 1_000_000
+        chunks = [
+            (ts_ns[i:i + 1000], shuffled["price"].to_numpy()[i:i + 1000], shuffled["amount"].to_numpy()[i:i + 1000])
+            for i in range(0, len(shuffled), 1000)
+        ]
+        bars = aggregate_trades(chunks, interval="1h", compact_every=3)
+        self.assert_bars_equal(bars, reference_bars(self.trades, "1h"))
+
+    def test_binary_file_feeds_add_features(self):
+        path = os.path.join(self.tmp.name, "trades.bin")
+        write_trades_binary(path, self.trades["timestamp"].to_numpy() * 1_000_000,
+                            self.trades["price"].to_numpy(), self.trades["amount"].to_numpy())
+        bars = ingest_trades(path, interval="5min", chunk_size=4096)
+        self.assert_bars_equal(bars, reference_bars(self.trades, "5min"))
+
+        feat = add_features(bars)
+        self.assertGreater(len(feat), 0)
+        self.assertIn("rsi14", feat.columns)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.label import apply_label, make_label, make_label_matrix, triple_barrier_labels
+from tests.helpers import make_ohlcv
+
+
+def triple_barrier_loop(df, take_profit, stop_loss, horizon):
+    """Referenz-Implementierung mit Python-Loop."""
+    high, low, close = df["High"].to_numpy(), df["Low"].to_numpy(), df["Close"].to_numpy()
+    n = len(close)
+    out = np.full((n, 3), np.nan)
+    for t in range(n):
+        for k in range(1, horizon + 1):
+            if t + k >= n:
+                break
+            if low[t + k] <= close[t] * (1 - stop_loss):
+                out[t] = (-1, -stop_loss, k)
+                break
+            if high[t + k] >= close[t] * (1 + take_profit):
+                out[t] = (1, take_profit, k)
+                break
+        else:
+            out[t] = (0, close[t + horizon] / close[t] - 1, horizon)
+    return out
+
+
+class TestLabelMatrix(unittest.TestCase):
+
+    def test_matrix_matches_make_label_per_horizon(self):
+        df = make_ohlcv(n=300, seed=6)
+        labels = make_label_matrix(df, horizons=(1, 3, 5))
+        self.assertEqual(labels["y_1"].dtype, np.int8)
+
+        for h in (1, 3, 5):
+            ref = make_label(df, fee_buffer=0.0025, forward_days=h)
+            got = apply_label(df, labels, forward_days=h)
+            pd.testing.assert_frame_equal(got, ref)
+
+    def test_apply_label_on_split_does_not_leak(self):
+        df = make_ohlcv(n=300, seed=7)
+        labels = make_label_matrix(df, horizons=(1, 5))
+        train, test = df.iloc[:200], df.iloc[200:]
+        for part in (train, test):
+            pd.testing.assert_frame_equal(apply_label(part, labels, forward_days=5),
+                                          make_label(part, forward_days=5))
+
+
+class TestTripleBarrier(unittest.TestCase):
+
+    def test_matches_loop_reference(self):
+        df = make_ohlcv(n=400, seed=8)
+        got = triple_barrier_labels(df, take_profit=0.12, stop_loss=0.08, max_holding=5, chunk_size=64)
+        ref = triple_barrier_loop(df, 0.12, 0.08, 5)
+        np.testing.assert_allclose(got[["tb_label", "tb_ret", "tb_bars"]].to_numpy(), ref)
+        # Alle drei Ausgänge kommen vor
+        self.assertEqual(set(got["tb_label"].dropna().unique()), {-1.0, 0.0, 1.0})
+
+    def test_chunk_size_from_memory_budget(self):
+        """Blockgrösse aus max_cells // Horizont, auch wenn der Horizont grösser als das Budget ist."""
+        df = make_ohlcv(n=200, seed=9)
+        ref = triple_barrier_labels(df, max_holding=5)
+        for max_cells in (1, 7, 50):
+            pd.testing.assert_frame_equal(triple_barrier_labels(df, max_holding=5, max_cells=max_cells), ref)
+
+
+if __name__ == "__main__":
+    unittest.main()
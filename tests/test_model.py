@@ -0,0 +1,65 @@
+import unittest
+from unittest import mock
+
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+from src.features import add_features
+from src.label import make_label
+from src.model import (infer_proba, infer_proba_multi, train_gradient_boosting, train_logreg,
+                       train_random_forest)
+from tests.helpers import make_ohlcv
+
+
+class TestInferProbaMulti(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        lab = make_label(add_features(make_ohlcv(n=600, seed=14)))
+        cls.train, cls.test = lab.iloc[:300], lab.iloc[300:]
+        cls.models = {
+            "lr": train_logreg(cls.train),
+            "rf": train_random_forest(cls.train, n_estimators=10, max_depth=4, n_jobs=1),
+            "gb": train_gradient_boosting(cls.train, n_estimators=10, max_depth=2),
+        }
+
+    def test_matches_infer_proba_per_model(self):
+        proba = infer_proba_multi(self.models, self.test, ensemble=True)
+        self.assertEqual(list(proba.columns), ["lr", "rf", "gb", "ensemble"])
+        self.assertTrue(proba.index.equals(self.test.index))
+        for name, model in self.models.items():
+            np.testing.assert_allclose(proba[name], infer_proba(model, self.test)["p_up"])
+        np.testing.assert_allclose(proba["ensemble"], proba[["lr", "rf", "gb"]].mean(axis=1))
+
+    def test_shared_scaler_is_applied_once(self):
+        # Alle drei Modelle wurden auf demselben Fenster trainiert -> ein Scaler-Durchlauf
+        with mock.patch.object(StandardScaler, "transform", autospec=True,
+                               side_effect=StandardScaler.transform) as transform:
+            infer_proba_multi(self.models, self.test)
+        self.assertEqual(transform.call_count, 1)
+
+        other = train_logreg(self.train.iloc[:200])
+        with mock.patch.object(StandardScaler, "transform", autospec=True,
+                               side_effect=StandardScaler.transform) as transform:
+            proba = infer_proba_multi([self.models["lr"], other], self.test)
+        self.assertEqual(transform.call_count, 2)
+        self.assertEqual(list(proba.columns), [0, 1])
+
+    def test_other_preprocessing_is_not_shared_across_models(self):
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import MinMaxScaler
+
+        from src.config import FEATURES
+
+        # Gleiche Labels, aber Scaler auf unterschiedlich skalierten Daten gefittet
+        X, y = self.train[FEATURES].values, self.train["y"]
+        models = [Pipeline([("scaler", MinMaxScaler()), ("clf", LogisticRegression())]).fit(X * scale, y)
+                  for scale in (1.0, 3.0)]
+        proba = infer_proba_multi(models, self.test)
+        for j, model in enumerate(models):
+            np.testing.assert_allclose(proba[j], infer_proba(model, self.test)["p_up"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+import numpy as np
+from src.features import add_features
+from src.online import OnlineFeatureEngine
+from tests.helpers import make_ohlcv
+
+
+class TestOnlineFeatureEngine(unittest.TestCase):
+
+    def test_matches_add_features_after_warmup(self):
+        df = make_ohlcv()
+        ref = add_features(df)
+        online = OnlineFeatureEngine().extend(df).dropna()
+        self.assertTrue(online.index.equals(ref.index))
+        for col in ref.columns:
+            np.testing.assert_allclose(online[col], ref[col], rtol=1e-9, err_msg=col)
+
+    def test_incremental_extend_equals_full_run(self):
+        df = make_ohlcv(n=400, seed=1)
+        full = OnlineFeatureEngine().extend(df)
+
+        engine = OnlineFeatureEngine.from_frame(df.iloc[:300])
+        tail = engine.extend(df)  # nur Bars nach dem letzten Zeitstempel
+        self.assertEqual(len(tail), 100)
+        self.assertEqual(len(engine.extend(df)), 0)
+        pd.testing.assert_frame_equal(tail, full.iloc[300:], check_dtype=False)
+
+    def test_from_frame_matches_per_bar_warm_up(self):
+        """Vektorisierter Warm-up = update() für jeden Bar, auch vor Ende der Warm-up-Phase."""
+        df = make_ohlcv(n=260, seed=5)
+        for n in [1, 10, 14, 30, 220]:
+            engine = OnlineFeatureEngine()
+            engine.extend(df.iloc[:n])
+            tail = OnlineFeatureEngine.from_frame(df.iloc[:n]).extend(df)
+            pd.testing.assert_frame_equal(tail, engine.extend(df), rtol=1e-10, check_dtype=False)
+
+    def test_timeframe_scales_windows(self):
+        """12h-Bars: Fenster in Tagen wie add_features(..., timeframe="12h")."""
+        df = make_ohlcv(n=600, seed=6)
+        df.index = pd.date_range("2019-01-01", periods=len(df), freq="12h")
+        ref = add_features(df, timeframe="12h")
+        online = OnlineFeatureEngine(timeframe="12h").extend(df).dropna()
+        self.assertTrue(online.index.equals(ref.index))
+        for col in ref.columns:
+            np.testing.assert_allclose(online[col], ref[col], rtol=1e-9, err_msg=col)
+
+        engine = OnlineFeatureEngine.from_frame(df.iloc[:450], timeframe="12h")
+        tail = engine.extend(df)
+        pd.testing.assert_frame_equal(tail.loc[ref.index[-100:]], online.iloc[-100:], rtol=1e-9,
+                                      check_dtype=False)
+
+    def test_preview_does_not_change_state(self):
+        df = make_ohlcv(n=300, seed=2)
+        engine = OnlineFeatureEngine.from_frame(df.iloc[:-1])
+        preview = engine.preview(df.iloc[-1])
+        self.assertEqual(engine.n_bars, 299)
+        row = engine.update(df.iloc[-1])
+        self.assertEqual(preview, row)
+
+    def test_save_and_load(self):
+        df = make_ohlcv(n=250, seed=3)
+        engine = OnlineFeatureEngine.from_frame(df.iloc[:-1])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "state.joblib")
+            engine.save(path)
+            loaded = OnlineFeatureEngine.load(path)
+        self.assertEqual(loaded.last_timestamp, engine.last_timestamp)
+        self.assertEqual(loaded.preview(df.iloc[-1]), engine.preview(df.iloc[-1]))
+
+    def test_latest_features_cold_start_uses_vectorized_warm_up(self):
+        from src.predict_now import latest_features
+
+        df = make_ohlcv(n=400, seed=4)
+        ref = add_features(df).iloc[-1]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "state.joblib"
+            with mock.patch.object(OnlineFeatureEngine, "extend") as extend:
+                cold = latest_features(df.iloc[:-1], state_path=path)
+            extend.assert_not_called()
+            self.assertTrue(path.exists())
+
+            # Mit gespeichertem Zustand: nur der neue Bar wird nachgezogen
+            warm = latest_features(df, state_path=path)
+        self.assertEqual(cold.index[0], df.index[-2])
+        for col in ["ema200", "rsi14", "atr_pct", "obv_ema"]:
+            self.assertAlmostEqual(warm[col].iloc[0], ref[col], places=8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import pandas as pd
+import numpy as np
+from src.policy import ml_policy, ml_policy_grid, ml_policy_matrix
+from src.rules import RuleSet
+
+
+class TestMlPolicyGrid(unittest.TestCase):
+    """Grid-Policy muss für jedes Threshold-Paar ml_policy entsprechen."""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        n = 200
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, n)))
+        self.df = pd.DataFrame({
+            "Close": close,
+            "p_up": rng.random(n),
+            "atr_pct": rng.uniform(0, 7, n),
+            "ema50": close * rng.uniform(0.9, 1.1, n),
+            "rsi14": rng.uniform(20, 80, n)
+        }, index=pd.date_range("2022-01-01", periods=n, freq="D"))
+
+    def test_matches_ml_policy(self):
+        entry_grid = [0.3, 0.45, 0.55, 0.7]
+        exit_grid = [0.1, 0.2, 0.4]
+        entry, exit_ = ml_policy_grid(self.df, entry_grid, exit_grid)
+        self.assertEqual(entry.shape, (len(self.df), 4, 3))
+        self.assertEqual(exit_.shape, (len(self.df), 4, 3))
+
+        for i, p_entry in enumerate(entry_grid):
+            for j, p_exit in enumerate(exit_grid):
+                ref = ml_policy(self.df, p_entry_thr=p_entry, p_exit_thr=p_exit)
+                np.testing.assert_array_equal(entry[:, i, j], ref["entry_long"].values)
+                np.testing.assert_array_equal(exit_[:, i, j], ref["exit_long"].values)
+
+    def test_matrix_matches_ml_policy_per_column(self):
+        p_up = np.random.default_rng(1).random((len(self.df), 3))
+        entry, exit_ = ml_policy_matrix(self.df, p_up, p_entry_thr=0.55, p_exit_thr=0.2)
+        for j in range(3):
+            ref = ml_policy(self.df.assign(p_up=p_up[:, j]), p_entry_thr=0.55, p_exit_thr=0.2)
+            np.testing.assert_array_equal(entry[:, j], ref["entry_long"].values)
+            np.testing.assert_array_equal(exit_[:, j], ref["exit_long"].values)
+
+    def test_grid_and_matrix_with_rules(self):
+        df = self.df.copy()
+        df.iloc[::17, df.columns.get_loc("atr_pct")] = np.nan
+        rules = RuleSet([("ATR_pct < 2", "skip"), ("rsi14 > 70", "skip"),
+                         ("price_below_EMA50", "half_position"), ("after_loss", "cooldown_2bars")])
+        entry, exit_ = ml_policy_grid(df, [0.3, 0.6], [0.2], rules=rules)
+        p_up = np.random.default_rng(2).random((len(df), 2))
+        entry_m, _ = ml_policy_matrix(df, p_up, p_entry_thr=0.4, rules=rules.compile(df))
+        for i, p_entry in enumerate([0.3, 0.6]):
+            ref = ml_policy(df, p_entry_thr=p_entry, p_exit_thr=0.2, rules=rules)
+            np.testing.assert_array_equal(entry[:, i, 0], ref["entry_long"].values)
+            np.testing.assert_array_equal(exit_[:, i, 0], ref["exit_long"].values)
+            # Regeln ersetzen das ATR-Band: andere Entries als ohne Regeln
+            self.assertFalse(np.array_equal(entry[:, i, 0], ml_policy_grid(df, [p_entry], [0.2])[0][:, 0, 0]))
+        for j in range(2):
+            ref = ml_policy(df.assign(p_up=p_up[:, j]), p_entry_thr=0.4, rules=rules)
+            np.testing.assert_array_equal(entry_m[:, j], ref["entry_long"].values)
+        with self.assertRaises(ValueError):
+            ml_policy_grid(df.iloc[:10], [0.5], [0.2], rules=rules.compile(df))
+
+
+if __name__ == "__main__":
+    unittest.main()
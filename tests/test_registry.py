@@ -0,0 +1,87 @@
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from src.config import FEATURES
+from src.features import add_features
+from src.label import make_label
+from src.model import infer_proba
+from src.registry import ModelRegistry
+from tests.helpers import make_ohlcv
+
+
+class TestModelRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.registry = ModelRegistry(self.tmp.name, max_age_days=30, max_models=3)
+        self.lab = make_label(add_features(make_ohlcv(n=800, seed=9)))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def artifacts(self):
+        return sorted(p for p in os.listdir(self.tmp.name) if p.endswith(".joblib"))
+
+    def test_reuses_model_for_same_key(self):
+        train = self.lab.iloc[:300]
+        first = self.registry.get_or_train("logreg", train)
+        second = self.registry.get_or_train("logreg", train)
+        self.assertIsNot(first, second)   # zweites Mal geladen
+        self.assertEqual(len(self.artifacts()), 1)
+        X = train[FEATURES].values
+        np.testing.assert_array_equal(first.predict_proba(X), second.predict_proba(X))
+
+        # Andere Daten oder Parameter → neuer Schlüssel
+        self.registry.get_or_train("logreg", self.lab.iloc[:301])
+        self.registry.get_or_train("random_forest", train, n_estimators=5, max_depth=3)
+        self.assertEqual(len(self.artifacts()), 3)
+        self.assertNotEqual(self.registry.key("random_forest", train, n_estimators=5),
+                            self.registry.key("random_forest", train, n_estimators=6))
+
+    def test_key_includes_default_params(self):
+        train = self.lab.iloc[:300]
+        self.assertEqual(self.registry.key("gradient_boosting", train),
+                         self.registry.key("gradient_boosting", train, learning_rate=0.1))
+        self.assertNotEqual(self.registry.key("gradient_boosting", train),
+                            self.registry.key("gradient_boosting", train, learning_rate=0.05))
+        with self.assertRaises(TypeError):
+            self.registry.key("logreg", train, learning_rate=0.1)
+
+    def test_n_jobs_is_not_part_of_key(self):
+        train = self.lab.iloc[:300]
+        self.assertEqual(self.registry.key("random_forest", train, n_estimators=5, n_jobs=1),
+                         self.registry.key("random_forest", train, n_estimators=5, n_jobs=-1))
+        self.registry.get_or_train("random_forest", train, n_estimators=5, max_depth=3, n_jobs=-1)
+        self.registry.get_or_train("random_forest", train, n_estimators=5, max_depth=3, n_jobs=1)
+        self.assertEqual(len(self.artifacts()), 1)
+
+    def test_features_are_passed_to_trainer(self):
+        train = self.lab.iloc[:300]
+        features = ["rsi14", "atr_pct", "ret1"]
+        model = self.registry.get_or_train("logreg", train, features=features)
+        self.assertEqual(model.n_features_in_, 3)
+        np.testing.assert_array_equal(model.predict_proba(train[features].values)[:, 1],
+                                      infer_proba(model, train, features)["p_up"])
+        self.assertNotEqual(self.registry.key("logreg", train, features),
+                            self.registry.key("logreg", train))
+
+    def test_gc_by_count_and_age(self):
+        for n in range(300, 305):
+            self.registry.get_or_train("logreg", self.lab.iloc[:n])
+        self.assertEqual(len(self.artifacts()), 3)
+
+        # Ein Artefakt künstlich altern lassen
+        old = os.path.join(self.tmp.name, self.artifacts()[0])
+        past = time.time() - 40 * 86400
+        os.utime(old, (past, past))
+        removed = self.registry.gc()
+        self.assertEqual(removed, [os.path.basename(old)[:-len(".joblib")]])
+        self.assertEqual(len(self.artifacts()), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,136 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src.backtest import SimpleBacktester
+from src.policy import ml_policy
+from src.rules import Rule, RuleSet, load_rules
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_frame(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2021-01-01", periods=n, freq="D")
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.03, n)))
+    return pd.DataFrame({
+        "Open": close * np.exp(rng.normal(0, 0.01, n)),
+        "Close": close,
+        "p_up": rng.random(n),
+        "atr_pct": rng.uniform(0, 7, n),
+        "ema50": close * rng.uniform(0.9, 1.1, n),
+        "ema200": close * rng.uniform(0.9, 1.1, n),
+        "rsi14": rng.uniform(20, 80, n),
+    }, index=dates)
+
+
+class TestRuleParsing(unittest.TestCase):
+
+    def test_repo_rules_file_utf16(self):
+        rules = load_rules(os.path.join(ROOT, "rules", "risk_rules.csv"))
+        self.assertEqual([(r.condition, r.action) for r in rules.rules], [
+            ("ATR_pct < 0.8", "skip"),
+            ("ATR_pct > 6.0", "skip"),
+            ("price_below_EMA200", "half_position"),
+            ("after_loss", "cooldown_1bar"),
+        ])
+        self.assertEqual(rules.cooldown, 1)
+
+    def test_utf8_file_and_invalid_rules(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "rules.csv")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("condition,action\r\nrsi14 >= 70,size_0.25\r\n\r\nafter_loss,cooldown_3bars\r\n")
+            rules = RuleSet.from_csv(path)
+        self.assertEqual(len(rules), 2)
+        self.assertEqual(rules.rules[0].size, 0.25)
+        self.assertEqual(rules.cooldown, 3)
+
+        for condition, action in [("ATR_pct ~ 1", "skip"), ("ATR_pct < 1", "double"), ("after_loss", "skip")]:
+            with self.assertRaises(ValueError):
+                Rule(condition, action)
+
+
+class TestCompiledRules(unittest.TestCase):
+
+    def setUp(self):
+        self.df = make_frame()
+        self.rules = load_rules(os.path.join(ROOT, "rules", "risk_rules.csv"))
+
+    def test_masks_and_size(self):
+        compiled = self.rules.compile(self.df)
+        np.testing.assert_array_equal(compiled.allow, self.df["atr_pct"].between(0.8, 6.0).to_numpy())
+        np.testing.assert_array_equal(compiled.size, np.where(self.df["Close"] < self.df["ema200"], 0.5, 1.0))
+        with self.assertRaises(KeyError):
+            RuleSet([("vol_ratio > 2", "skip")]).compile(self.df)
+
+    def test_ml_policy_with_rules_matches_hard_coded_atr_band(self):
+        pd.testing.assert_frame_equal(ml_policy(self.df, 0.55, 0.1, rules=self.rules),
+                                      ml_policy(self.df, 0.55, 0.1))
+
+    def test_nan_counts_as_met_only_for_skip(self):
+        df = self.df.copy()
+        df.iloc[::7, df.columns.get_loc("atr_pct")] = np.nan
+        df.iloc[::11, df.columns.get_loc("ema200")] = np.nan
+        nan_atr = df["atr_pct"].isna().to_numpy()
+        np.testing.assert_array_equal(Rule("ATR_pct < 0.8", "skip").mask(df)[nan_atr], True)
+        np.testing.assert_array_equal(Rule("ATR_pct < 0.8", "half_position").mask(df)[nan_atr], False)
+        nan_ema = df["ema200"].isna().to_numpy()
+        np.testing.assert_array_equal(Rule("price_below_EMA200", "skip").mask(df)[nan_ema], True)
+        np.testing.assert_array_equal(Rule("price_below_EMA200", "size_0.5").mask(df)[nan_ema], False)
+
+        # Ohne gültigen ATR kein Entry, wie beim fest eingebauten Band
+        pd.testing.assert_frame_equal(ml_policy(df, 0.3, 0.1, rules=self.rules), ml_policy(df, 0.3, 0.1))
+        self.assertEqual(self.rules.columns(df), ["atr_pct", "Close", "ema200"])
+
+    def test_sweep_grid_applies_size_and_cooldown(self):
+        from src.eval import equity_metrics, sweep_grid
+
+        compiled = self.rules.compile(self.df)
+        result = sweep_grid(self.df, [0.5], [0.3], min_entries=0, rules=self.rules).iloc[0]
+        signals = ml_policy(self.df, 0.5, 0.3, rules=compiled)
+        equity = SimpleBacktester(self.df).run_batch(signals[["entry_long"]], signals[["exit_long"]],
+                                                     **compiled.backtest_kwargs())
+        ref = equity_metrics(equity).iloc[0]
+        self.assertAlmostEqual(result["sharpe"], ref["sharpe"], places=10)
+        self.assertAlmostEqual(result["cagr"], ref["cagr"], places=10)
+        plain = sweep_grid(self.df, [0.5], [0.3], min_entries=0).iloc[0]
+        self.assertNotAlmostEqual(result["cagr"], plain["cagr"], places=6)
+
+    def test_backtest_with_size_and_cooldown_matches_loop(self):
+        for seed in range(3):
+            df = make_frame(seed=seed)
+            compiled = self.rules.compile(df)
+            signals = ml_policy(df, 0.5, 0.3, rules=compiled).astype(int)
+            bt = SimpleBacktester(df)
+            for cooldown in (0, 1, 5):
+                kwargs = dict(size=pd.Series(compiled.size, index=df.index), cooldown=cooldown)
+                ref = bt.run(signals, engine="loop", **kwargs)
+                np.testing.assert_array_equal(bt.run(signals, **kwargs).values, ref.values)
+                batch = bt.run_batch(signals[["entry_long"]], signals[["exit_long"]], **kwargs)
+                np.testing.assert_array_equal(batch.iloc[:, 0].values, ref.values)
+
+    def test_cooldown_blocks_entry_after_loss(self):
+        dates = pd.date_range("2023-01-01", periods=8, freq="D")
+        df = pd.DataFrame({"Open": [100, 100, 90, 90, 90, 90, 90, 90.0],
+                           "Close": [100, 100, 90, 90, 90, 90, 90, 90.0]}, index=dates)
+        # Verlust-Trade: Entry Tag 1, Exit Tag 2; neues Entry-Signal an Tag 2 und 3
+        signals = pd.DataFrame({"entry_long": [1, 0, 1, 1, 0, 0, 0, 0],
+                                "exit_long": [0, 1, 0, 0, 0, 0, 0, 0]}, index=dates)
+        bt = SimpleBacktester(df, fees_bps=0, slippage_bps=0)
+        _, pos = bt.run_batch(signals[["entry_long"]], signals[["exit_long"]], return_positions=True)
+        _, pos_cd = bt.run_batch(signals[["entry_long"]], signals[["exit_long"]],
+                                 return_positions=True, cooldown=1)
+        self.assertEqual(pos.iloc[:, 0].tolist(), [0, 1, 0, 1, 1, 1, 1, 1])
+        self.assertEqual(pos_cd.iloc[:, 0].tolist(), [0, 1, 0, 0, 1, 1, 1, 1])
+
+        # Halbe Position: halber Verlust
+        equity = bt.run(signals, size=np.full(8, 0.5))
+        self.assertAlmostEqual(equity.iloc[2], 0.95)
+
+
+if __name__ == "__main__":
+    unittest.main()
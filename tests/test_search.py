@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from src import search
+from src.features import add_features
+from src.label import make_label
+from src.rules import RuleSet
+from src.search import param_candidates, successive_halving
+from tests.helpers import make_ohlcv
+
+
+class TestSuccessiveHalving(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.lab = make_label(add_features(make_ohlcv(n=1000, seed=15)))
+        cls.grid = {"C": [0.001, 0.01, 0.1, 1.0]}
+
+    def test_param_candidates(self):
+        grid = {"b": [1, 2], "a": [0.1, 0.2, 0.3]}
+        self.assertEqual(len(param_candidates(grid)), 6)
+        self.assertEqual(param_candidates(grid)[0], {"a": 0.1, "b": 1})
+        sample = param_candidates(grid, max_candidates=4)
+        self.assertEqual(len(sample), 4)
+        self.assertEqual(sample, param_candidates(grid, max_candidates=4))
+
+    def test_halving_keeps_best_and_grows_window(self):
+        best, history = successive_halving(self.lab, "logreg", grid=self.grid, min_train=60,
+                                           eta=2, n_folds=2, forward_days=1, n_jobs=1)
+        per_rung = history.groupby("rung").agg(n=("params", "size"), train_size=("train_size", "first"))
+        self.assertEqual(per_rung["n"].tolist(), [4, 2, 1][:len(per_rung)])
+        self.assertTrue(per_rung["train_size"].is_monotonic_increasing)
+        # Die Überlebenden einer Runde sind die Besten der vorherigen
+        first = history[history["rung"] == 0].sort_values("sharpe", ascending=False)
+        second = history[history["rung"] == 1]
+        self.assertEqual(sorted(map(str, second["params"])), sorted(map(str, first["params"].iloc[:2])))
+        self.assertEqual(best, history[history["rung"] == history["rung"].max()]
+                         .sort_values("sharpe", ascending=False)["params"].iloc[0])
+
+    def test_resume_from_log_skips_finished_folds(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = os.path.join(tmp, "search.jsonl")
+            kwargs = dict(grid=self.grid, min_train=60, eta=2, n_folds=2, n_jobs=1, log_path=log)
+            best, history = successive_halving(self.lab, "logreg", **kwargs)
+            with open(log) as f:
+                n_lines = len(f.readlines())
+            # Abgebrochene letzte Zeile wird ignoriert
+            with open(log, "a") as f:
+                f.write('{"key": "abgebro')
+
+            with mock.patch.object(search, "run_folds", wraps=search.run_folds) as run_folds:
+                best2, history2 = successive_halving(self.lab, "logreg", **kwargs)
+            run_folds.assert_not_called()
+            self.assertEqual(best2, best)
+            self.assertEqual(history2["sharpe"].tolist(), history["sharpe"].tolist())
+
+            # Andere Daten -> andere Schlüssel, es wird neu bewertet
+            with mock.patch.object(search, "run_folds", wraps=search.run_folds) as run_folds:
+                successive_halving(self.lab.iloc[10:], "logreg", **kwargs)
+            run_folds.assert_called()
+            with open(log) as f:
+                self.assertGreater(len(f.readlines()), n_lines)
+
+    def test_thresholds_and_prices_are_part_of_key(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            log = os.path.join(tmp, "search.jsonl")
+            kwargs = dict(grid=self.grid, min_train=60, eta=2, n_folds=2, n_jobs=1, log_path=log)
+            successive_halving(self.lab, "logreg", **kwargs)
+            n_done = len(search._read_log(log))
+            with open(log, "a") as f:
+                f.write('{"key": "abgebro')
+
+            # Andere Thresholds bzw. andere Preise bei gleichen Features -> neu bewerten
+            with mock.patch.object(search, "run_folds", wraps=search.run_folds) as run_folds:
+                successive_halving(self.lab, "logreg", p_entry_thr=0.6, **kwargs)
+            run_folds.assert_called()
+            shifted = self.lab.assign(Open=self.lab["Open"] * 1.01)
+            with mock.patch.object(search, "run_folds", wraps=search.run_folds) as run_folds:
+                successive_halving(shifted, "logreg", **kwargs)
+            run_folds.assert_called()
+            rules = RuleSet([("ATR_pct < 1.5", "skip")])
+            with mock.patch.object(search, "run_folds", wraps=search.run_folds) as run_folds:
+                successive_halving(self.lab, "logreg", rules=rules, **kwargs)
+            run_folds.assert_called()
+
+            # Neue Zeilen nach der abgeschnittenen Zeile bleiben lesbar
+            self.assertEqual(len(search._read_log(log)), 4 * n_done)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,184 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.backtest import SimpleBacktester
+from src.data import download_eth_1d, download_ohlcv
+from src.features import add_features, feature_arrays, valid_mask
+from src.label import make_label, label_arrays
+from src.store import CsvSource, OhlcvStore
+from tests.helpers import make_ohlcv
+
+
+class CountingSource(CsvSource):
+    """CsvSource, die die Anfragen mitschreibt."""
+
+    def __init__(self, root):
+        super().__init__(root)
+        self.calls = []
+
+    def fetch(self, ticker, interval, start, end=None):
+        self.calls.append(pd.Timestamp(start))
+        return super().fetch(ticker, interval, start, end)
+
+
+class TestOhlcvStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        self.full = make_ohlcv(n=300, seed=3)
+        self.full.index.name = "Date"
+        self.source = CountingSource(self.root / "src")
+        self.source.root.mkdir()
+        self.store = OhlcvStore(self.root / "store", source=self.source)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def publish(self, n):
+        """Die Quelle kennt die ersten n Bars."""
+        self.full.iloc[:n].to_csv(self.source.path("ETH-USD", "1d"))
+
+    def test_tail_refresh_fetches_only_new_bars(self):
+        self.publish(200)
+        now = self.full.index[199] + pd.Timedelta(hours=1)
+        first = self.store.load("ETH-USD", start="2019-01-01", now=now)
+        pd.testing.assert_frame_equal(first, self.full.iloc[:200], check_freq=False)
+
+        self.publish(250)
+        now = self.full.index[249] + pd.Timedelta(hours=1)
+        second = self.store.load("ETH-USD", start="2019-01-01", now=now)
+        pd.testing.assert_frame_equal(second, self.full.iloc[:250], check_freq=False)
+        # Zweite Anfrage startet beim letzten gespeicherten Bar
+        self.assertEqual(self.source.calls, [pd.Timestamp("2019-01-01"), self.full.index[199]])
+
+    def test_revised_last_bar_is_replaced(self):
+        self.publish(100)
+        self.store.load("ETH-USD", now=self.full.index[99] + pd.Timedelta(hours=1))
+
+        self.full.iloc[99, self.full.columns.get_loc("Close")] *= 1.1
+        self.publish(101)
+        df = self.store.load("ETH-USD", now=self.full.index[100] + pd.Timedelta(hours=1))
+        self.assertEqual(len(df), 101)
+        self.assertEqual(df["Close"].iloc[99], self.full["Close"].iloc[99])
+
+    def test_current_store_works_offline(self):
+        self.publish(100)
+        now = self.full.index[99] + pd.Timedelta(minutes=10)
+        self.store.load("ETH-USD", now=now)
+
+        self.source.path("ETH-USD", "1d").unlink()   # Quelle nicht mehr erreichbar
+        df = self.store.load("ETH-USD", now=now + pd.Timedelta(minutes=10))
+        self.assertEqual(len(df), 100)
+        self.assertEqual(len(self.source.calls), 1)
+
+        offline = OhlcvStore(self.store.root, source=self.source)
+        df = offline.load("ETH-USD", end="2019-02-01", refresh=False)
+        self.assertEqual(df.index[-1], pd.Timestamp("2019-01-31"))
+
+    def test_download_eth_1d_uses_store(self):
+        self.publish(120)
+        df = download_eth_1d(start="2019-02-01", end="2019-03-01", store=self.store)
+        self.assertEqual(df.index[0], pd.Timestamp("2019-02-01"))
+        self.assertEqual(df.index[-1], pd.Timestamp("2019-02-28"))
+        np.testing.assert_allclose(df["Close"], self.full.loc["2019-02-01":"2019-02-28", "Close"])
+
+    def test_tz_aware_source_is_stored_as_naive_utc(self):
+        """yfinance liefert Intraday-Bars mit Zeitzone; start/end bleiben naiv."""
+        hourly = make_ohlcv(n=100, seed=4)
+        hourly.index = pd.date_range("2019-01-01", periods=100, freq="h", tz="UTC", name="Date")
+        source = TzSource(hourly)
+        store = OhlcvStore(self.root / "tz", source=source)
+
+        source.n = 60
+        first = store.load("ETH-USD", interval="1h", now=pd.Timestamp("2019-01-03 12:30", tz="UTC"))
+        self.assertIsNone(first.index.tz)
+        self.assertEqual(first.index[-1], pd.Timestamp("2019-01-03 11:00"))
+
+        source.n = 100
+        df = download_ohlcv("ETH-USD", timeframe="1h", start="2019-01-02", end="2019-01-05", store=store)
+        self.assertEqual(len(source.calls), 2)
+        self.assertEqual(df.index[0], pd.Timestamp("2019-01-02"))
+        self.assertEqual(df.index[-1], pd.Timestamp("2019-01-04 23:00"))
+        np.testing.assert_allclose(df["Close"], hourly["Close"].iloc[24:96])
+
+    def test_empty_store_is_refetched(self):
+        self.publish(50)
+        empty = self.full.iloc[:0]
+        self.store.write("ETH-USD", "1d", empty, start="2019-01-01", fetched_at=self.full.index[0])
+        df = self.store.load("ETH-USD", now=self.full.index[49] + pd.Timedelta(hours=1))
+        self.assertEqual(len(df), 50)
+
+
+class TzSource:
+    """Quelle mit UTC-Index wie yfinance bei Intraday-Intervallen; liefert die ersten n Bars."""
+
+    def __init__(self, df):
+        self.df = df
+        self.n = len(df)
+        self.calls = []
+
+    def fetch(self, ticker, interval, start, end=None):
+        self.calls.append(start)
+        df = self.df.iloc[:self.n]
+        return df.loc[df.index >= pd.Timestamp(start, tz="UTC")]
+
+
+class TestMemoryMappedArrays(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = OhlcvStore(self.tmp.name, source=None)
+        self.df = make_ohlcv(n=500, seed=4)
+        self.df.index.name = "Date"
+        self.store.write_arrays(
+            "ETH-USD", "1m", self.df.index.to_numpy(),
+            {col: self.df[col].to_numpy() for col in self.df.columns}
+        )
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_open_arrays_is_memory_mapped(self):
+        bars = self.store.open_arrays("ETH-USD", "1m")
+        self.assertIsInstance(bars["Close"], np.memmap)
+        self.assertEqual(len(bars), 500)
+        pd.testing.assert_frame_equal(bars.to_frame(), self.df, check_freq=False)
+
+        part = bars.slice("2019-02-01", "2019-03-01")
+        self.assertIsInstance(part["Close"], np.memmap)
+        self.assertEqual(len(part), 28)
+
+    def test_features_and_labels_match_dataframe_path(self):
+        bars = self.store.open_arrays("ETH-USD", "1m")
+        feats = feature_arrays(bars)
+        ret_fwd, y = label_arrays(bars["Close"], fee_buffer=0.0025)
+        mask = valid_mask(feats) & ~np.isnan(ret_fwd)
+
+        ref = make_label(add_features(self.df), fee_buffer=0.0025)
+        self.assertEqual(mask.sum(), len(ref))
+        for col, values in feats.items():
+            np.testing.assert_allclose(values[mask], ref[col], err_msg=col)
+        np.testing.assert_allclose(ret_fwd[mask], ref["ret_fwd"])
+        np.testing.assert_array_equal(y[mask], ref["y"])
+
+    def test_backtester_consumes_arrays(self):
+        bars = self.store.open_arrays("ETH-USD", "1m")
+        rng = np.random.default_rng(0)
+        signals = {"entry_long": rng.random(len(bars)) < 0.1, "exit_long": rng.random(len(bars)) < 0.1}
+
+        eq = SimpleBacktester(bars).run(signals)
+        ref = SimpleBacktester(self.df).run(pd.DataFrame(signals, index=self.df.index))
+        np.testing.assert_array_equal(eq.to_numpy(), ref.to_numpy())
+
+        batch = SimpleBacktester(bars).run_batch(np.column_stack([signals["entry_long"]] * 2),
+                                                 np.column_stack([signals["exit_long"]] * 2))
+        np.testing.assert_array_equal(batch[1].to_numpy(), ref.to_numpy())
+
+
+if __name__ == "__main__":
+    unittest.main()
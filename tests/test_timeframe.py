@@ -0,0 +1,59 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from src import indicators
+from src.eval import cagr, equity_metrics, sharpe
+from src.features import add_features
+from src.label import make_label
+from src.timeframe import Timeframe, get_timeframe
+from tests.helpers import make_ohlcv
+
+
+class TestTimeframe(unittest.TestCase):
+
+    def test_periods_and_windows(self):
+        self.assertEqual(Timeframe("1d").periods_per_year, 365)
+        self.assertEqual(Timeframe("1h").periods_per_year, 8760)
+        self.assertEqual(Timeframe("1m").periods_per_year, 525600)
+        self.assertEqual(Timeframe("4h").window(14), 84)
+        self.assertEqual(Timeframe("1h").bars("5D"), 120)
+        self.assertEqual(Timeframe("1wk").window(14), 2)
+        self.assertEqual(get_timeframe(None), Timeframe("1d"))
+
+        index = pd.date_range("2024-01-01", periods=10, freq="h")
+        self.assertEqual(Timeframe.from_index(index), Timeframe("1h"))
+
+    def test_annualization_follows_timeframe(self):
+        ret = np.random.default_rng(0).normal(0.001, 0.02, 500)
+        base = ret.mean() / ret.std()
+        self.assertAlmostEqual(sharpe(ret), base * np.sqrt(365))
+        self.assertAlmostEqual(sharpe(ret, timeframe="1h"), base * np.sqrt(8760))
+        self.assertAlmostEqual(sharpe(ret, periods=252), base * np.sqrt(252))
+
+        equity = pd.Series(np.cumprod(1 + ret))
+        metrics = equity_metrics(equity, timeframe="1h").iloc[0]
+        self.assertAlmostEqual(metrics["cagr"], cagr(equity, timeframe="1h"))
+
+    def test_hourly_features_and_labels_scale_windows(self):
+        df = make_ohlcv(n=6000, seed=5)
+        df.index = pd.date_range("2024-01-01", periods=len(df), freq="h")
+
+        # Tages-Timeframe entspricht dem bisherigen Verhalten
+        pd.testing.assert_frame_equal(add_features(df, timeframe="1d"), add_features(df))
+
+        feat = add_features(df, timeframe="1h", columns=["ema50", "rsi14", "ret1"])
+        close = df["Close"].to_numpy()
+        rows = df.index.get_indexer(feat.index)
+        np.testing.assert_allclose(feat["ema50"], indicators.ema(close, 1200)[rows])
+        np.testing.assert_allclose(feat["rsi14"], indicators.rsi(close, 336)[rows])
+        np.testing.assert_allclose(feat["ret1"], np.log(close[rows] / close[rows - 24]))
+
+        lab = make_label(feat, forward_days=1, timeframe="1h")
+        expected = feat["Close"].shift(-24) / feat["Close"] - 1
+        np.testing.assert_allclose(lab["ret_fwd"], expected.dropna())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,69 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from src.features import add_features
+from src.label import make_label
+from src.store import CsvSource, OhlcvStore
+from src.universe import build_ticker_frame, load_universe
+from tests.helpers import make_ohlcv
+
+
+class TestLoadUniverse(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        root = Path(self.tmp.name)
+        source = CsvSource(root / "csv")
+        source.root.mkdir()
+        # Unterschiedliche Historien-Längen pro Ticker
+        for seed, (ticker, n) in enumerate([("ETH-USD", 500), ("BTC-USD", 450), ("SOL-USD", 400)]):
+            df = make_ohlcv(n=n, seed=seed)
+            df.index = df.index + pd.Timedelta(days=500 - n)
+            df.to_csv(source.path(ticker, "1d"), index_label="Date")
+        self.store = OhlcvStore(root / "store", source=source)
+        self.tickers = ["ETH-USD", "BTC-USD", "SOL-USD"]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parallel_panel_matches_per_ticker(self):
+        panel = load_universe(self.tickers, store=self.store, n_jobs=2)
+        self.assertEqual(list(panel.columns.get_level_values(0).unique()), self.tickers)
+
+        for ticker in self.tickers:
+            ref = build_ticker_frame(ticker, self.store)
+            got = panel[ticker].dropna(how="all")
+            pd.testing.assert_frame_equal(got, ref, check_freq=False, check_dtype=False)
+
+    def test_inner_join_and_missing_ticker(self):
+        panel = load_universe(self.tickers + ["DOGE-USD"], store=self.store, n_jobs=1, join="inner",
+                              columns=["rsi14", "ema200"], fee_buffer=None)
+        self.assertEqual(list(panel.columns.get_level_values(0).unique()), self.tickers)
+        self.assertFalse(panel.isna().any().any())
+        self.assertEqual(panel.index[0], build_ticker_frame("SOL-USD", self.store, fee_buffer=None,
+                                                            columns=["ema200"]).index[0])
+
+    def test_intraday_interval_scales_windows_and_horizon(self):
+        df = make_ohlcv(n=1200, seed=5)
+        df.index = pd.date_range("2019-01-01", periods=len(df), freq="12h")
+        df.to_csv(self.store.source.path("ETH-USD", "12h"), index_label="Date")
+
+        got = build_ticker_frame("ETH-USD", self.store, interval="12h", columns=["rsi14", "ema50"],
+                                 forward_days=2)
+        loaded = self.store.load("ETH-USD", interval="12h", start="2019-01-01")
+        ref = make_label(add_features(loaded, columns=["rsi14", "ema50"], timeframe="12h"),
+                         forward_days=2, timeframe="12h")
+        pd.testing.assert_frame_equal(got, ref, check_freq=False)
+        # EMA50 über 50 Tage = 100 Bars, Label 2 Tage = 4 Bars voraus
+        self.assertEqual(got.index[0], loaded.index[99])
+        self.assertEqual(got.index[-1], loaded.index[-5])
+
+    def test_empty_ticker_list(self):
+        self.assertTrue(load_universe([], store=self.store, n_jobs=2).empty)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+
+import numpy as np
+from sklearn.preprocessing import StandardScaler
+
+from src.features import add_features
+from src.label import make_label
+from src.walkforward import RunningScaler, walk_forward
+from tests.helpers import make_ohlcv
+
+
+class TestWalkForward(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.lab = make_label(add_features(make_ohlcv(n=900, seed=10)))
+
+    def test_running_scaler_matches_standard_scaler_on_window(self):
+        X = np.random.default_rng(0).normal(5, 3, (400, 4))
+        scaler = RunningScaler(4)
+        scaler.add(X[:200])
+        scaler.add(X[200:250])
+        scaler.remove(X[:50])
+        ref = StandardScaler().fit(X[50:250])
+        np.testing.assert_allclose(scaler.mean_, ref.mean_)
+        np.testing.assert_allclose(scaler.scale_, ref.scale_)
+        np.testing.assert_allclose(scaler.transform(X[300:]), ref.transform(X[300:]))
+
+    def test_running_scaler_large_offset(self):
+        """Grosser Mittelwert bei kleiner Streuung: keine Auslöschung wie bei sumsq/n - mean²."""
+        X = np.random.default_rng(1).normal(1e8, 1e-2, (3000, 3))
+        scaler = RunningScaler(3)
+        scaler.add(X[:1000])
+        scaler.add(X[1000:2000])
+        scaler.remove(X[:500])
+        scaler.add(X[2000:])
+        scaler.remove(X[500:1500])
+        ref = StandardScaler().fit(X[1500:])
+        np.testing.assert_allclose(scaler.mean_, ref.mean_, rtol=1e-12)
+        np.testing.assert_allclose(scaler.scale_, ref.scale_, rtol=1e-5)
+
+    def test_out_of_sample_predictions_are_stitched(self):
+        for window in ["expanding", "rolling"]:
+            pred, report = walk_forward(self.lab, train_size=300, step=50, window=window)
+            self.assertTrue(pred.index.equals(self.lab.index[300:]))
+            self.assertTrue(((pred["p_up"] >= 0) & (pred["p_up"] <= 1)).all())
+            self.assertEqual(len(report), int(np.ceil((len(self.lab) - 300) / 50)))
+            self.assertTrue((report["fit_seconds"] >= 0).all())
+            expected = 300 if window == "rolling" else 300 + 50 * (len(report) - 1)
+            self.assertEqual(report["n_train"].iloc[-1], expected)
+            # partial_fit vergisst nichts: das Modell hat alle bisherigen Zeilen gesehen
+            self.assertEqual(report["n_seen"].iloc[-1], 300 + 50 * (len(report) - 1))
+
+    def test_refit_mode_and_gap(self):
+        pred, report = walk_forward(self.lab, train_size=300, step=100, mode="refit", gap=4)
+        self.assertEqual(pred.index[0], self.lab.index[304])
+        self.assertEqual(report["n_train"].iloc[0], 300)
+        with self.assertRaises(ValueError):
+            walk_forward(self.lab, mode="batch")
+
+
+if __name__ == "__main__":
+    unittest.main()